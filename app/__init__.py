@@ -2,6 +2,7 @@
 # ===============
 # Application factory - creates and configures the Flask app
 
+import os
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
@@ -12,15 +13,33 @@ db = SQLAlchemy()
 login_manager = LoginManager()
 # Tracking who is logged in , managing sessions, protecting routes that require login
 
-def create_app():
+def create_app(config=None):
 
     app = Flask(__name__)
     
     # Configuration
     app.config['SECRET_KEY'] = 'grpwoubg421fweqfqegwrg'  
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///bank.db'
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///bank.db')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
+    # Template cache: compiled templates are kept on disk between restarts
+    app.config['TEMPLATE_CACHE_DIR'] = os.environ.get(
+        'TEMPLATE_CACHE_DIR', os.path.join(app.instance_path, 'jinja_cache'))
+    # Compile all templates when a worker boots instead of on first request
+    app.config['TEMPLATE_WARMUP'] = os.environ.get('TEMPLATE_WARMUP', '0') == '1'
+    # Per-endpoint latency and SQL statement metrics (/admin/metrics)
+    app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '1') == '1'
+    # Statements slower than this are written to instance/slow_queries.log
+    app.config['SLOW_QUERY_THRESHOLD_MS'] = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100))
+    # Per-account rate and amount limits on withdrawals and transfers
+    app.config['VELOCITY_ENABLED'] = os.environ.get('VELOCITY_ENABLED', '1') == '1'
+    # Whole months older than this are moved to archive tables by `flask ledger archive`
+    app.config['TRANSACTION_RETENTION_DAYS'] = int(os.environ.get('TRANSACTION_RETENTION_DAYS', 365))
+    
+    # Overrides (e.g. tests) must be applied before extensions bind the engine
+    if config:
+        app.config.from_mapping(config)
+    
     # Initialize extensions with app
     db.init_app(app)
     login_manager.init_app(app)
@@ -41,10 +60,42 @@ def create_app():
     app.register_blueprint(transactions_bp)
     app.register_blueprint(admin_bp)
     
+    # Request/SQL metrics (registered first so its timing includes compression)
+    from app.utils.metrics import init_metrics
+    init_metrics(app, db)
+    
+    # Slow-query log with query plans (/admin/slow-queries)
+    from app.utils.slow_queries import init_slow_query_log
+    init_slow_query_log(app, db)
+    
+    # Response compression and fingerprinted static assets
+    from app.utils.compression import init_compression
+    from app.utils.assets import init_assets
+    init_compression(app)
+    init_assets(app)
+    
+    # CLI commands
+    from app.cli import register_commands
+    register_commands(app)
+    
     # Create database tables
     with app.app_context():
         db.create_all()
     
+    # Velocity counters, warmed from recent transactions
+    from app.utils.velocity import init_velocity
+    init_velocity(app)
+    
+    # Monthly spending rollup, kept up to date with each posting
+    from app.services.spending import init_spending
+    init_spending(app)
+    
+    # Template bytecode cache and optional warmup
+    from app.utils.templates import init_template_cache, precompile_templates
+    init_template_cache(app)
+    if app.config['TEMPLATE_WARMUP']:
+        precompile_templates(app)
+    
     return app
 
 @login_manager.user_loader
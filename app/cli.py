@@ -0,0 +1,289 @@
+# app/cli.py
+# ==========
+# Flask CLI commands (run with: flask --app run <group> <command>)
+
+import os
+import time
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+
+templates_cli = AppGroup('templates', help='Template cache commands.')
+
+
+@templates_cli.command('precompile')
+def precompile_command():
+    """Compile all templates into the bytecode cache."""
+    from app.utils.templates import precompile_templates
+
+    if current_app.jinja_env.bytecode_cache is None:
+        click.echo('Warning: TEMPLATE_CACHE_DIR is not set, nothing is written to disk.')
+
+    start = time.perf_counter()
+    names = precompile_templates(current_app)
+    elapsed = time.perf_counter() - start
+
+    click.echo(f'Compiled {len(names)} templates in {elapsed * 1000:.1f} ms')
+    click.echo(f"Cache directory: {current_app.config.get('TEMPLATE_CACHE_DIR')}")
+
+
+assets_cli = AppGroup('assets', help='Static asset commands.')
+
+
+@assets_cli.command('build-icons')
+@click.argument('sprite', type=click.Path(exists=True, dir_okay=False))
+def build_icons_command(sprite):
+    """Regenerate the bootstrap-icons subset from an SVG sprite.
+
+    SPRITE is bootstrap-icons.svg from the bootstrap-icons release. Only
+    the icons referenced by the templates are written.
+    """
+    from app.utils.assets import find_used_icons, build_icon_css
+
+    with open(sprite, encoding='utf-8') as f:
+        sprite_text = f.read()
+
+    names = find_used_icons(os.path.join(current_app.root_path, 'templates'))
+    css, missing = build_icon_css(sprite_text, names)
+
+    target = os.path.join(current_app.static_folder, 'vendor', 'bootstrap-icons', 'bootstrap-icons.css')
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'w', encoding='utf-8') as f:
+        f.write(css)
+
+    click.echo(f'Wrote {len(names) - len(missing)} icons to {target} ({len(css)} bytes)')
+    if missing:
+        click.echo(f"Not found in sprite: {', '.join(missing)}")
+
+
+@assets_cli.command('manifest')
+def manifest_command():
+    """List static assets and their fingerprinted names."""
+    manifest = current_app.extensions['asset_manifest']
+    for name, hashed_name in sorted(manifest.hashed.items()):
+        click.echo(f'{name} -> {hashed_name}')
+
+
+interest_cli = AppGroup('interest', help='Interest accrual commands.')
+
+
+@interest_cli.command('accrue')
+@click.option('--date', 'accrual_date', type=click.DateTime(formats=['%Y-%m-%d']),
+              help='Day to accrue (default: yesterday, UTC). Re-running a date resumes or skips it.')
+@click.option('--chunk-size', type=int, default=None, help='Accounts read and written per batch.')
+def accrue_command(accrual_date, chunk_size):
+    """Accrue one day's interest on all eligible accounts."""
+    from datetime import datetime, timedelta
+    from app.services.interest import CHUNK_SIZE, accrue_interest
+
+    # Postings are dated at the end of the accrual day (UTC), so only a
+    # finished day is accrued by default
+    accrual_date = accrual_date.date() if accrual_date else datetime.utcnow().date() - timedelta(days=1)
+
+    start = time.perf_counter()
+    job = accrue_interest(accrual_date, chunk_size=chunk_size or CHUNK_SIZE)
+    elapsed = time.perf_counter() - start
+
+    click.echo(f'{accrual_date}: {job.accounts} accounts credited, '
+               f'${job.total_interest:,.2f} total ({elapsed:.2f}s)')
+
+
+statements_cli = AppGroup('statements', help='Month-end statement commands.')
+
+
+@statements_cli.command('generate')
+@click.option('--period', help='Month to produce, YYYY-MM (default: last month).')
+@click.option('--workers', type=int, default=os.cpu_count() or 1, show_default=True,
+              help='Worker processes.')
+@click.option('--output', 'output_dir', type=click.Path(file_okay=False),
+              help='Directory for statement files (default: instance/statements).')
+@click.option('--batch-size', type=int, default=None, help='Accounts per batch.')
+@click.option('--restart', is_flag=True, help='Discard progress for the period and start over.')
+def generate_statements_command(period, workers, output_dir, batch_size, restart):
+    """Write a statement file for every active account.
+
+    Progress is recorded per batch; running the same period again after a
+    crash resumes with the batches that were not finished.
+    """
+    from datetime import date, timedelta
+    from app.services.statements import BATCH_SIZE, delete_run, generate_statements, period_bounds
+
+    if period is None:
+        period = (date.today().replace(day=1) - timedelta(days=1)).strftime('%Y-%m')
+    try:
+        period_bounds(period)
+    except ValueError:
+        raise click.BadParameter('expected YYYY-MM', param_hint='--period')
+    if restart:
+        delete_run(period)
+
+    def progress(done, total):
+        click.echo(f'\r{done}/{total} batches', nl=done == total)
+
+    summary = generate_statements(period, output_dir or os.path.join(current_app.instance_path, 'statements'),
+                                  workers=workers, batch_size=batch_size or BATCH_SIZE, progress=progress)
+
+    if summary['skipped_batches']:
+        click.echo(f"Resumed: {summary['skipped_batches']} batches were already done")
+    click.echo(f"{summary['accounts']} statements, {summary['transactions']} transactions "
+               f"in {summary['seconds']:.2f}s with {summary['workers']} workers "
+               f"({summary['accounts_per_second']:,.0f} accounts/s, "
+               f"{summary['transactions_per_second']:,.0f} transactions/s)")
+    click.echo(f"Written to {summary['output_dir']}")
+
+
+ledger_cli = AppGroup('ledger', help='Ledger commands.')
+
+
+@ledger_cli.command('reconcile')
+@click.option('--full', is_flag=True, help='Check every account, not only those changed since the last run.')
+@click.option('--workers', type=int, default=os.cpu_count() or 1, show_default=True,
+              help='Worker processes.')
+@click.option('--output', 'output_dir', type=click.Path(file_okay=False),
+              help='Directory for discrepancy reports (default: instance/reconciliation).')
+@click.option('--range-size', type=int, default=None, help='Account ids per task in a full run.')
+def reconcile_command(full, workers, output_dir, range_size):
+    """Check account balances against their transactions.
+
+    Exits with status 1 when any account is out of balance.
+    """
+    from app.services.reconciliation import RANGE_SIZE, reconcile
+
+    def progress(done, total):
+        click.echo(f'\r{done}/{total} ranges', nl=done == total)
+
+    start = time.perf_counter()
+    run = reconcile(output_dir or os.path.join(current_app.instance_path, 'reconciliation'),
+                    full=full, workers=workers, range_size=range_size or RANGE_SIZE, progress=progress)
+    elapsed = time.perf_counter() - start
+
+    click.echo(f'{run.mode.capitalize()} run: {run.accounts:,} accounts, {run.transactions:,} transactions '
+               f'in {elapsed:.2f}s with {run.workers} workers')
+    click.echo(f'{run.discrepancy_count} discrepancies, report: {run.report_path}')
+    if run.discrepancy_count:
+        raise SystemExit(1)
+
+
+@ledger_cli.command('archive')
+@click.option('--retention-days', type=int, default=None,
+              help='Keep this many days hot (default: TRANSACTION_RETENTION_DAYS, 365).')
+@click.option('--chunk-size', type=int, default=None, help='Transactions moved per database transaction.')
+def archive_command(retention_days, chunk_size):
+    """Move whole months of old transactions into per-month archive tables.
+
+    History, search, statements and reconciliation still read archived
+    months; re-running continues an interrupted job.
+    """
+    from app.services.archive import CHUNK_SIZE, archive_cutoff, archive_transactions
+
+    cutoff = archive_cutoff(retention_days)
+    click.echo(f'Archiving transactions before {cutoff:%Y-%m-%d}')
+
+    start = time.perf_counter()
+    results = archive_transactions(retention_days, chunk_size=chunk_size or CHUNK_SIZE,
+                                   progress=lambda month, rows: click.echo(f'  {month}: {rows:,} transactions'))
+    elapsed = time.perf_counter() - start
+
+    total = sum(rows for _, rows in results)
+    click.echo(f'Archived {total:,} transactions from {len(results)} months in {elapsed:.2f}s')
+
+
+@ledger_cli.command('export')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'parquet']), default='csv', show_default=True)
+@click.option('--output', type=click.Path(dir_okay=False),
+              help='File to write (default: instance/exports/transactions-<time>.<format>).')
+@click.option('--start', default='', help='First day, YYYY-MM-DD.')
+@click.option('--end', default='', help='Last day, YYYY-MM-DD (inclusive).')
+@click.option('--type', 'transaction_type', default='', help='Transaction type, e.g. withdrawal.')
+@click.option('--account', 'account_number', default='', help='Account number.')
+@click.option('--status', default='', help='Transaction status, e.g. flagged.')
+@click.option('--chunk-size', type=int, default=None, help='Rows fetched and encoded at a time.')
+def export_command(fmt, output, start, end, transaction_type, account_number, status, chunk_size):
+    """Export transactions to CSV or Parquet, streaming in chunks."""
+    from app.services.export import CHUNK_SIZE, ExportFilters, export_chunks, export_filename
+
+    try:
+        filters = ExportFilters.from_strings(start, end, transaction_type, account_number, status)
+        rows = 0
+
+        def progress(count):
+            nonlocal rows
+            rows = count
+
+        chunks = export_chunks(filters, fmt, chunk_size or CHUNK_SIZE, progress)
+    except (ValueError, RuntimeError) as e:
+        raise click.UsageError(str(e))
+
+    output = output or os.path.join(current_app.instance_path, 'exports', export_filename(fmt))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    start_time = time.perf_counter()
+    # Written to a temporary name first so a failed export leaves no partial file
+    with open(output + '.tmp', 'wb') as f:
+        for data in chunks:
+            f.write(data)
+    os.replace(output + '.tmp', output)
+    elapsed = time.perf_counter() - start_time
+
+    click.echo(f'{rows:,} transactions in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:,.0f} rows/s)')
+    click.echo(f'Written to {output} ({os.path.getsize(output) / 1e6:.1f} MB)')
+
+
+@ledger_cli.command('rebuild-spending')
+def rebuild_spending_command():
+    """Recompute the monthly spending rollup from all transactions.
+
+    Postings keep the rollup up to date; rebuild after loading
+    transactions outside the application.
+    """
+    from app.services.spending import rebuild_rollup
+
+    start = time.perf_counter()
+    rows = rebuild_rollup(progress=lambda month, count: click.echo(f'  {month}: {count:,} rollup rows'))
+    click.echo(f'Rebuilt {rows:,} rollup rows in {time.perf_counter() - start:.2f}s')
+
+
+scheduler_cli = AppGroup('scheduler', help='Scheduled transfer commands.')
+
+
+@scheduler_cli.command('run')
+@click.option('--interval', type=float, default=5.0, show_default=True,
+              help='Seconds between ticks (one indexed query each).')
+@click.option('--lookahead', type=int, default=None, help='Seconds ahead to load into the heap.')
+@click.option('--batch-size', type=int, default=None, help='Transfers executed per transaction.')
+@click.option('--once', is_flag=True, help='Run a single tick and exit (e.g. from cron).')
+def run_scheduler_command(interval, lookahead, batch_size, once):
+    """Execute scheduled and recurring transfers as they fall due."""
+    import logging
+    from datetime import timedelta
+    from app.services.scheduler import BATCH_SIZE, LOOKAHEAD, TransferScheduler
+
+    scheduler = TransferScheduler(
+        lookahead=timedelta(seconds=lookahead) if lookahead is not None else LOOKAHEAD,
+        batch_size=batch_size or BATCH_SIZE)
+
+    if once:
+        start = time.perf_counter()
+        outcomes = scheduler.tick()
+        elapsed = time.perf_counter() - start
+        summary = ', '.join(f'{count} {outcome}' for outcome, count in sorted(outcomes.items()))
+        click.echo(f"{summary or 'Nothing due'} ({elapsed * 1000:.1f} ms)")
+        return
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(message)s')
+    click.echo(f'Scheduler running, tick every {interval:g}s (Ctrl+C to stop)')
+    try:
+        scheduler.run(interval=interval)
+    except KeyboardInterrupt:
+        click.echo('Scheduler stopped')
+
+
+def register_commands(app):
+    """Register all CLI command groups with the app"""
+    app.cli.add_command(templates_cli)
+    app.cli.add_command(assets_cli)
+    app.cli.add_command(interest_cli)
+    app.cli.add_command(statements_cli)
+    app.cli.add_command(scheduler_cli)
+    app.cli.add_command(ledger_cli)
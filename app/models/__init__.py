@@ -5,3 +5,10 @@
 from app.models.user import User
 from app.models.account import Account
 from app.models.transaction import Transaction
+from app.models.interest import InterestAccrual
+from app.models.statement import StatementRun, StatementBatch
+from app.models.limits import DailyLimitUsage, LimitOverride
+from app.models.scheduled_transfer import ScheduledTransfer
+from app.models.reconciliation import ReconciliationRun, ReconciliationDiscrepancy
+from app.models.archive import TransactionArchive
+from app.models.spending import SpendingRollup
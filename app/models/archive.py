@@ -0,0 +1,34 @@
+from app import db
+from datetime import datetime
+
+
+class TransactionArchive(db.Model):
+
+    """
+    TransactionArchive Model
+    ------------------------
+    One month of transactions moved out of the transactions table into its
+    own archive table (transactions_archive_YYYY_MM).
+
+    Readers use the [start, end) range to decide which archive tables a
+    date range needs; see app/services/archive.py.
+    """
+    __tablename__ = 'transaction_archives'
+
+    id = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.String(7), unique=True, nullable=False)  # YYYY-MM
+    table_name = db.Column(db.String(64), unique=True, nullable=False)
+    start = db.Column(db.DateTime, nullable=False, index=True)
+    end = db.Column(db.DateTime, nullable=False)
+    rows = db.Column(db.Integer, default=0, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __init__(self, month, table_name, start, end):
+        self.month = month
+        self.table_name = table_name
+        self.start = start
+        self.end = end
+        self.rows = 0
+
+    def __repr__(self):
+        return f'<TransactionArchive {self.month} ({self.rows} rows)>'
@@ -0,0 +1,32 @@
+from app import db
+from datetime import datetime
+
+
+class InterestAccrual(db.Model):
+
+    """
+    InterestAccrual Model
+    ---------------------
+    One daily interest accrual job.
+
+    Accounts are processed in id order and last_account_id is committed
+    with each chunk, so an interrupted job resumes where it stopped.
+    """
+    __tablename__ = 'interest_accruals'
+
+    id = db.Column(db.Integer, primary_key=True)
+    accrual_date = db.Column(db.Date, unique=True, nullable=False)
+    last_account_id = db.Column(db.Integer, default=0, nullable=False)
+    accounts = db.Column(db.Integer, default=0, nullable=False)
+    total_interest = db.Column(db.Float, default=0.0, nullable=False)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime)
+
+    def __init__(self, accrual_date):
+        self.accrual_date = accrual_date
+        self.last_account_id = 0
+        self.accounts = 0
+        self.total_interest = 0.0
+
+    def __repr__(self):
+        return f'<InterestAccrual {self.accrual_date}>'
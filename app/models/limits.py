@@ -0,0 +1,69 @@
+from app import db
+from datetime import datetime
+
+
+class DailyLimitUsage(db.Model):
+
+    """
+    DailyLimitUsage Model
+    ---------------------
+    Running totals of an account's withdrawals and outgoing transfers for
+    one (UTC) day, updated in the same transaction as each posting.
+    """
+    __tablename__ = 'daily_limit_usage'
+    __table_args__ = (
+        db.UniqueConstraint('account_id', 'day', name='uq_daily_limit_usage_account_day'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    withdrawal = db.Column(db.Float, default=0.0, nullable=False)
+    transfer = db.Column(db.Float, default=0.0, nullable=False)
+
+    def __init__(self, account_id, day):
+        self.account_id = account_id
+        self.day = day
+        self.withdrawal = 0.0
+        self.transfer = 0.0
+
+    def __repr__(self):
+        return f'<DailyLimitUsage {self.account_id} {self.day}>'
+
+
+class LimitOverride(db.Model):
+
+    """
+    LimitOverride Model
+    -------------------
+    Daily limits set by an admin for one account, replacing the defaults
+    for its type and owner's role until valid_until (inclusive, or forever).
+    A None limit keeps the default for that kind of posting.
+    """
+    __tablename__ = 'limit_overrides'
+
+    id = db.Column(db.Integer, primary_key=True)
+    account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), unique=True, nullable=False)
+    withdrawal_limit = db.Column(db.Float)
+    transfer_limit = db.Column(db.Float)
+    valid_until = db.Column(db.Date)
+    reason = db.Column(db.String(255))
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __init__(self, account_id, created_by=None):
+        self.account_id = account_id
+        self.created_by = created_by
+
+    def to_dict(self):
+        return {
+            'withdrawal_limit': self.withdrawal_limit,
+            'transfer_limit': self.transfer_limit,
+            'valid_until': self.valid_until.isoformat() if self.valid_until else None,
+            'reason': self.reason,
+            'created_by': self.created_by,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+
+    def __repr__(self):
+        return f'<LimitOverride {self.account_id}>'
@@ -0,0 +1,75 @@
+from app import db
+from datetime import datetime
+
+
+class ReconciliationRun(db.Model):
+
+    """
+    ReconciliationRun Model
+    -----------------------
+    One check of Account.balance against the signed sum of the account's
+    transactions.
+
+    A completed run is the checkpoint for the next incremental run, which
+    only checks accounts updated since started_at, accounts with
+    transactions after max_transaction_id, and accounts that were out of
+    balance last time.
+    """
+    __tablename__ = 'reconciliation_runs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    mode = db.Column(db.String(20), nullable=False)  # full, incremental
+    started_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    completed_at = db.Column(db.DateTime)
+    max_transaction_id = db.Column(db.Integer, default=0, nullable=False)
+    workers = db.Column(db.Integer, default=1, nullable=False)
+    accounts = db.Column(db.Integer, default=0, nullable=False)
+    transactions = db.Column(db.Integer, default=0, nullable=False)
+    discrepancy_count = db.Column(db.Integer, default=0, nullable=False)
+    report_path = db.Column(db.String(500))
+
+    discrepancies = db.relationship('ReconciliationDiscrepancy', backref='run', lazy=True,
+                                    cascade='all, delete-orphan')
+
+    def __init__(self, mode, max_transaction_id, workers=1):
+        self.mode = mode
+        self.max_transaction_id = max_transaction_id
+        self.workers = workers
+        self.started_at = datetime.utcnow()
+        self.accounts = 0
+        self.transactions = 0
+        self.discrepancy_count = 0
+
+    def __repr__(self):
+        return f'<ReconciliationRun {self.id} {self.mode}>'
+
+
+class ReconciliationDiscrepancy(db.Model):
+
+    """
+    ReconciliationDiscrepancy Model
+    -------------------------------
+    An account whose stored balance differs from its ledger in a run.
+    """
+    __tablename__ = 'reconciliation_discrepancies'
+
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey('reconciliation_runs.id'), nullable=False, index=True)
+    account_id = db.Column(db.Integer, nullable=False)
+    account_number = db.Column(db.String(12))
+    balance = db.Column(db.Float, nullable=False)
+    ledger_balance = db.Column(db.Float, nullable=False)
+    difference = db.Column(db.Float, nullable=False)
+    transactions = db.Column(db.Integer, default=0, nullable=False)
+
+    def __init__(self, run_id, account_id, account_number, balance, ledger_balance, transactions):
+        self.run_id = run_id
+        self.account_id = account_id
+        self.account_number = account_number
+        self.balance = balance
+        self.ledger_balance = ledger_balance
+        self.difference = round(balance - ledger_balance, 2)
+        self.transactions = transactions
+
+    def __repr__(self):
+        return f'<ReconciliationDiscrepancy {self.account_number} {self.difference}>'
@@ -0,0 +1,61 @@
+from app import db
+from datetime import datetime
+
+
+class ScheduledTransfer(db.Model):
+
+    """
+    ScheduledTransfer Model
+    -----------------------
+    A one-off or recurring transfer (standing order) to another account.
+
+    due_at is the occurrence being paid and next_run_at when the scheduler
+    should (re)try it; they differ only while a failed attempt waits for a
+    retry. The scheduler finds work with one range scan of
+    ix_scheduled_transfers_due, so only active rows due soon are read.
+    """
+    __tablename__ = 'scheduled_transfers'
+    __table_args__ = (
+        db.Index('ix_scheduled_transfers_due', 'status', 'next_run_at'),
+    )
+
+    FREQUENCIES = ('once', 'daily', 'weekly', 'monthly')
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    from_account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), nullable=False)
+    to_account_number = db.Column(db.String(12), nullable=False)
+    amount = db.Column(db.Float, nullable=False)
+    description = db.Column(db.String(255))
+    frequency = db.Column(db.String(10), nullable=False, default='once')
+    start_at = db.Column(db.DateTime, nullable=False)
+    end_date = db.Column(db.Date)
+    due_at = db.Column(db.DateTime)
+    next_run_at = db.Column(db.DateTime)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    runs = db.Column(db.Integer, default=0, nullable=False)
+    status = db.Column(db.String(20), default='active', nullable=False)  # active, completed, failed, cancelled
+    last_run_at = db.Column(db.DateTime)
+    last_result = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    from_account = db.relationship('Account')
+
+    def __init__(self, user_id, from_account_id, to_account_number, amount, start_at,
+                 frequency='once', end_date=None, description=None):
+        self.user_id = user_id
+        self.from_account_id = from_account_id
+        self.to_account_number = to_account_number
+        self.amount = amount
+        self.frequency = frequency
+        self.start_at = start_at
+        self.end_date = end_date
+        self.description = description
+        self.due_at = start_at
+        self.next_run_at = start_at
+        self.attempts = 0
+        self.runs = 0
+        self.status = 'active'
+
+    def __repr__(self):
+        return f'<ScheduledTransfer {self.id} {self.frequency} {self.amount}>'
@@ -0,0 +1,39 @@
+from app import db
+
+
+class SpendingRollup(db.Model):
+
+    """
+    SpendingRollup Model
+    --------------------
+    Money in and out of one account for one month (UTC, 'YYYY-MM') and
+    transaction type, updated in the same transaction as each posting.
+    user_id is the account owner's, so a user's totals are read without
+    touching accounts or transactions.
+    """
+    __tablename__ = 'spending_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('account_id', 'month', 'transaction_type', name='uq_spending_rollups_account_month_type'),
+        db.Index('ix_spending_rollups_user_month', 'user_id', 'month'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), nullable=False)
+    month = db.Column(db.String(7), nullable=False)
+    transaction_type = db.Column(db.String(20), nullable=False)
+    money_in = db.Column(db.Float, default=0.0, nullable=False)
+    money_out = db.Column(db.Float, default=0.0, nullable=False)
+    count = db.Column(db.Integer, default=0, nullable=False)
+
+    def __init__(self, user_id, account_id, month, transaction_type):
+        self.user_id = user_id
+        self.account_id = account_id
+        self.month = month
+        self.transaction_type = transaction_type
+        self.money_in = 0.0
+        self.money_out = 0.0
+        self.count = 0
+
+    def __repr__(self):
+        return f'<SpendingRollup {self.account_id} {self.month} {self.transaction_type}>'
@@ -0,0 +1,61 @@
+from app import db
+from datetime import datetime
+
+
+class StatementRun(db.Model):
+
+    """
+    StatementRun Model
+    ------------------
+    Month-end statement generation for one period (YYYY-MM).
+
+    Active accounts are split into StatementBatch rows when the run is
+    created; a batch is marked done once all its files are written, so a
+    run restarted after a crash only processes the remaining batches.
+    """
+    __tablename__ = 'statement_runs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    period = db.Column(db.String(7), unique=True, nullable=False)
+    output_dir = db.Column(db.String(500), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime)
+
+    batches = db.relationship('StatementBatch', backref='run', lazy=True,
+                              cascade='all, delete-orphan', order_by='StatementBatch.id')
+
+    def __init__(self, period, output_dir):
+        self.period = period
+        self.output_dir = output_dir
+
+    def __repr__(self):
+        return f'<StatementRun {self.period}>'
+
+
+class StatementBatch(db.Model):
+
+    """
+    StatementBatch Model
+    --------------------
+    A contiguous range of account ids processed by one worker.
+    """
+    __tablename__ = 'statement_batches'
+
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey('statement_runs.id'), nullable=False, index=True)
+    first_account_id = db.Column(db.Integer, nullable=False)
+    last_account_id = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), default='pending', nullable=False)  # pending, done
+    accounts = db.Column(db.Integer, default=0)
+    transactions = db.Column(db.Integer, default=0)
+    duration = db.Column(db.Float)
+    completed_at = db.Column(db.DateTime)
+
+    def __init__(self, run_id, first_account_id, last_account_id):
+        self.run_id = run_id
+        self.first_account_id = first_account_id
+        self.last_account_id = last_account_id
+        self.status = 'pending'
+
+    def __repr__(self):
+        return f'<StatementBatch {self.first_account_id}-{self.last_account_id} {self.status}>'
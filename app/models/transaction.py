@@ -1,9 +1,15 @@
 from app import db
 from datetime import datetime
+from sqlalchemy import case
+from sqlalchemy.ext.hybrid import hybrid_property
 import uuid
 
 class Transaction(db.Model):
     __tablename__ = 'transactions'
+    __table_args__ = (
+        # Per-account history in time order (statements, history pages)
+        db.Index('ix_transactions_account_timestamp', 'account_id', 'timestamp'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), nullable=False)
@@ -25,6 +31,15 @@ class Transaction(db.Model):
         self.reference_number = reference_number or self.generate_reference()
         self.status = status
     
+    @hybrid_property
+    def balance_change(self):
+        """Effect on the account balance; withdrawals are stored as positive amounts"""
+        return -self.amount if self.transaction_type == 'withdrawal' else self.amount
+    
+    @balance_change.expression
+    def balance_change(cls):
+        return case((cls.transaction_type == 'withdrawal', -cls.amount), else_=cls.amount)
+    
     @staticmethod
     def generate_reference():
         """Generate a unique reference number"""
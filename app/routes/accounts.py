@@ -3,6 +3,7 @@ from flask_login import login_required, current_user
 from app import db
 from app.models.account import Account
 from app.models.transaction import Transaction
+from app.services.limits import remaining_today
 
 # WHAT IS A DECORATOR? A function that wraps another function to add behavior.
 
@@ -76,7 +77,8 @@ def view_account(account_id):
     
     return render_template('accounts/view.html', 
                           account=account, 
-                          transactions=transactions)
+                          transactions=transactions,
+                          limits=remaining_today(account))
 
 @accounts_bp.route('/<int:account_id>/close', methods=['POST'])
 @login_required
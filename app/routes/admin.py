@@ -1,10 +1,11 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app, Response, jsonify, stream_with_context
 from flask_login import login_required, current_user
 from functools import wraps
 from app import db
 from app.models.user import User
 from app.models.account import Account
 from app.models.transaction import Transaction
+from app.services.archive import archive_cutoff, transaction_source
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
@@ -122,15 +123,75 @@ def toggle_account_status(account_id):
     db.session.commit()
     return redirect(url_for('admin.list_accounts'))
 
+@admin_bp.route('/api/accounts/<int:account_id>/limits')
+@login_required
+@admin_required
+def account_limits(account_id):
+    """Daily limits, today's usage and any override for an account"""
+    from app.services.limits import active_override, remaining_today
+    
+    account = Account.query.get_or_404(account_id)
+    override = active_override(account.id)
+    return jsonify({
+        'account_id': account.id,
+        'limits': remaining_today(account),
+        'override': override.to_dict() if override else None,
+    })
+
+@admin_bp.route('/api/accounts/<int:account_id>/limits/override', methods=['PUT', 'DELETE'])
+@login_required
+@admin_required
+def account_limit_override(account_id):
+    """Set (PUT) or remove (DELETE) an account's daily limit override"""
+    from app.services.limits import remove_override, set_override
+    
+    account = Account.query.get_or_404(account_id)
+    if request.method == 'DELETE':
+        removed = remove_override(account.id)
+        db.session.commit()
+        return jsonify({'account_id': account.id, 'removed': removed})
+    
+    try:
+        override = set_override(account.id, request.get_json(silent=True) or {}, current_user.id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    db.session.commit()
+    return jsonify({'account_id': account.id, 'override': override.to_dict()})
+
 @admin_bp.route('/transactions')
 @login_required
 @admin_required
 def list_transactions():
     page = request.args.get('page', 1, type=int)
-    transactions = Transaction.query.order_by(
+    status = request.args.get('status', '')
+    query = Transaction.query
+    if status:
+        query = query.filter(Transaction.status == status)
+    transactions = query.order_by(
         Transaction.timestamp.desc()
     ).paginate(page=page, per_page=20, error_out=False)
-    return render_template('admin/transactions.html', transactions=transactions)
+    return render_template('admin/transactions.html', transactions=transactions, status=status)
+
+@admin_bp.route('/transactions/export')
+@login_required
+@admin_required
+def export_transactions():
+    """Stream the transactions matching the filters as CSV or Parquet"""
+    from app.services.export import FORMATS, ExportFilters, export_chunks, export_filename
+    
+    fmt = request.args.get('format', 'csv')
+    try:
+        filters = ExportFilters.from_strings(request.args.get('start', ''), request.args.get('end', ''),
+                                             request.args.get('type', ''), request.args.get('account', ''),
+                                             request.args.get('status', ''))
+        chunks = export_chunks(filters, fmt)
+    except (ValueError, RuntimeError) as e:
+        flash(str(e), 'danger')
+        return redirect(url_for('admin.list_transactions'))
+    
+    response = Response(stream_with_context(chunks), mimetype=FORMATS[fmt][0])
+    response.headers['Content-Disposition'] = f'attachment; filename={export_filename(fmt)}'
+    return response
 
 @admin_bp.route('/search')
 @login_required
@@ -138,6 +199,7 @@ def list_transactions():
 def search():
     query = request.args.get('q', '')
     search_type = request.args.get('type', 'users')
+    archived = request.args.get('archived') == '1'
     results = []
     
     if query:
@@ -151,11 +213,40 @@ def search():
                 Account.account_number.contains(query)
             ).all()
         elif search_type == 'transactions':
-            results = Transaction.query.filter(
-                Transaction.reference_number.contains(query)
-            ).all()
+            # Archived months only when asked for; otherwise the hot table alone
+            since = None if archived else archive_cutoff()
+            source = transaction_source(since)
+            transactions_query = db.session.query(source).filter(
+                source.reference_number.contains(query)
+            )
+            if since:
+                transactions_query = transactions_query.filter(source.timestamp >= since)
+            results = transactions_query.all()
     
     return render_template('admin/search.html', 
                           results=results, 
                           query=query, 
-                          search_type=search_type)
\ No newline at end of file
+                          search_type=search_type,
+                          archived=archived)
+
+@admin_bp.route('/metrics')
+@login_required
+@admin_required
+def metrics():
+    """Request and SQL metrics in Prometheus text format"""
+    body = current_app.extensions['metrics'].render()
+    return Response(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@admin_bp.route('/slow-queries')
+@login_required
+@admin_required
+def slow_queries():
+    """Slowest statements from the slow-query log, grouped by normalized SQL"""
+    from app.utils.slow_queries import read_slow_query_log, top_offenders
+    
+    entries = read_slow_query_log(current_app.config['SLOW_QUERY_LOG'],
+                                  current_app.config['SLOW_QUERY_LOG_BACKUPS'])
+    offenders = top_offenders(entries, limit=request.args.get('limit', 20, type=int))
+    return render_template('admin/slow_queries.html',
+                          offenders=offenders,
+                          threshold=current_app.config['SLOW_QUERY_THRESHOLD_MS'])
@@ -1,7 +1,8 @@
-from flask import Blueprint, render_template
+from flask import Blueprint, render_template, request, jsonify, abort
 from flask_login import login_required, current_user
 from app.models.account import Account
 from app.models.transaction import Transaction
+from app.services.spending import MONTHS, monthly_spending
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
@@ -20,7 +21,27 @@ def index():
         Transaction.account_id.in_(account_ids)
     ).order_by(Transaction.timestamp.desc()).limit(5).all()
     
+    # Monthly in/out totals, from the spending rollup
+    spending = monthly_spending(current_user.id)
+    
     return render_template('dashboard/index.html',
                           accounts=accounts,
                           total_balance=total_balance,
-                          recent_transactions=recent_transactions)
\ No newline at end of file
+                          recent_transactions=recent_transactions,
+                          spending=spending)
+
+@dashboard_bp.route('/api/spending')
+@login_required
+def spending_api():
+    """Monthly in/out totals by transaction type, optionally for one account"""
+    months = min(max(request.args.get('months', MONTHS, type=int), 1), 24)
+    account_id = request.args.get('account', type=int)
+    if account_id is not None:
+        account = Account.query.get_or_404(account_id)
+        if account.user_id != current_user.id:
+            abort(404)
+    
+    return jsonify({
+        'months': monthly_spending(current_user.id, months, account_id),
+        'account_id': account_id,
+    })
@@ -1,8 +1,13 @@
+from datetime import datetime, timedelta
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
 from app import db
 from app.models.account import Account
+from app.models.scheduled_transfer import ScheduledTransfer
 from app.models.transaction import Transaction
+from app.services.archive import archive_cutoff, transaction_source
+from app.services.limits import remaining_today, reserve
+from app.utils.velocity import release_posting, reserve_posting
 
 transactions_bp = Blueprint('transactions', __name__, url_prefix='/transactions')
 
@@ -91,6 +96,17 @@ def withdraw():
             flash('Insufficient funds.', 'danger')
             return render_template('transactions/withdraw.html', accounts=accounts)
         
+        velocity = reserve_posting(account.id, amount)
+        if velocity.blocked:
+            flash(velocity.message, 'danger')
+            return render_template('transactions/withdraw.html', accounts=accounts)
+        
+        if not reserve(account, 'withdrawal', amount):
+            release_posting(account.id, amount, velocity)
+            remaining = remaining_today(account)['withdrawal']['remaining']
+            flash(f'This exceeds your daily withdrawal limit. Remaining today: ${remaining:,.2f}.', 'danger')
+            return render_template('transactions/withdraw.html', accounts=accounts)
+        
         # Perform withdrawal
         account.balance -= amount
         
@@ -99,11 +115,16 @@ def withdraw():
             transaction_type='withdrawal',
             amount=amount,
             description=description,
-            reference_number=Transaction.generate_reference()
+            reference_number=Transaction.generate_reference(),
+            status='flagged' if velocity.flagged else 'completed'
         )
         
         db.session.add(transaction)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except Exception:
+            release_posting(account.id, amount, velocity)
+            raise
         
         flash(f'Successfully withdrew ${amount:.2f}', 'success')
         return redirect(url_for('accounts.view_account', account_id=account_id))
@@ -161,6 +182,17 @@ def transfer():
             flash('Cannot transfer to the same account.', 'danger')
             return render_template('transactions/transfer.html', accounts=accounts)
         
+        velocity = reserve_posting(from_account.id, amount)
+        if velocity.blocked:
+            flash(velocity.message, 'danger')
+            return render_template('transactions/transfer.html', accounts=accounts)
+        
+        if not reserve(from_account, 'transfer', amount):
+            release_posting(from_account.id, amount, velocity)
+            remaining = remaining_today(from_account)['transfer']['remaining']
+            flash(f'This exceeds your daily transfer limit. Remaining today: ${remaining:,.2f}.', 'danger')
+            return render_template('transactions/transfer.html', accounts=accounts)
+        
         # Perform transfer
         reference = Transaction.generate_reference()
         
@@ -174,7 +206,8 @@ def transfer():
             amount=-amount,
             description=f'Transfer to {to_account_number}: {description}',
             recipient_account=to_account_number,
-            reference_number=reference
+            reference_number=reference,
+            status='flagged' if velocity.flagged else 'completed'
         )
         
         # Incoming transaction
@@ -189,54 +222,181 @@ def transfer():
         
         db.session.add(outgoing)
         db.session.add(incoming)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except Exception:
+            release_posting(from_account.id, amount, velocity)
+            raise
         
         flash(f'Successfully transferred ${amount:.2f}', 'success')
         return redirect(url_for('accounts.view_account', account_id=from_account_id))
     
     return render_template('transactions/transfer.html', accounts=accounts)
 
+@transactions_bp.route('/scheduled', methods=['GET', 'POST'])
+@login_required
+def scheduled():
+    accounts = Account.query.filter_by(
+        user_id=current_user.id, 
+        status='active'
+    ).all()
+    
+    def render():
+        schedules = ScheduledTransfer.query.filter_by(user_id=current_user.id)\
+            .order_by(ScheduledTransfer.status, ScheduledTransfer.next_run_at).all()
+        return render_template('transactions/scheduled.html', accounts=accounts, schedules=schedules,
+                               frequencies=ScheduledTransfer.FREQUENCIES, today=datetime.utcnow().date())
+    
+    if request.method == 'POST':
+        from_account_id = request.form.get('from_account_id')
+        to_account_number = request.form.get('to_account_number', '').strip()
+        amount = request.form.get('amount')
+        frequency = request.form.get('frequency', 'once')
+        description = request.form.get('description') or None
+        
+        try:
+            from_account_id = int(from_account_id)
+            amount = float(amount)
+            start_date = datetime.strptime(request.form.get('start_date', ''), '%Y-%m-%d').date()
+            end_date = request.form.get('end_date')
+            end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+        except (ValueError, TypeError):
+            flash('Invalid input.', 'danger')
+            return render()
+        
+        from_account = Account.query.get(from_account_id)
+        to_account = Account.query.filter_by(account_number=to_account_number).first()
+        now = datetime.utcnow()
+        
+        if not from_account or from_account.user_id != current_user.id or from_account.status != 'active':
+            flash('Invalid source account.', 'danger')
+        elif not to_account or to_account.status != 'active':
+            flash('Recipient account not found.', 'danger')
+        elif from_account.id == to_account.id:
+            flash('Cannot transfer to the same account.', 'danger')
+        elif amount <= 0:
+            flash('Amount must be positive.', 'danger')
+        elif frequency not in ScheduledTransfer.FREQUENCIES:
+            flash('Invalid frequency.', 'danger')
+        elif start_date < now.date():
+            flash('Start date cannot be in the past.', 'danger')
+        elif end_date and end_date < start_date:
+            flash('End date must be on or after the start date.', 'danger')
+        else:
+            # Today means as soon as the scheduler's next tick; dates are UTC
+            start_at = now if start_date == now.date() else datetime.combine(start_date, datetime.min.time())
+            schedule = ScheduledTransfer(current_user.id, from_account.id, to_account_number, amount, start_at,
+                                         frequency=frequency, end_date=end_date, description=description)
+            db.session.add(schedule)
+            db.session.commit()
+            flash(f'Scheduled a {frequency} transfer of ${amount:.2f}.', 'success')
+            return redirect(url_for('transactions.scheduled'))
+        return render()
+    
+    return render()
+
+@transactions_bp.route('/scheduled/<int:schedule_id>/cancel', methods=['POST'])
+@login_required
+def cancel_scheduled(schedule_id):
+    schedule = ScheduledTransfer.query.get_or_404(schedule_id)
+    
+    if schedule.user_id != current_user.id:
+        flash('Access denied.', 'danger')
+    elif schedule.status != 'active':
+        flash('This transfer is no longer active.', 'warning')
+    else:
+        schedule.status = 'cancelled'
+        schedule.next_run_at = None
+        db.session.commit()
+        flash('Scheduled transfer cancelled.', 'success')
+    return redirect(url_for('transactions.scheduled'))
+
+def date_range_args():
+    """Optional ?start=YYYY-MM-DD&end=YYYY-MM-DD (inclusive) as (start, end exclusive, start text, end text)"""
+    start_text = request.args.get('start', '')
+    end_text = request.args.get('end', '')
+    try:
+        start = datetime.strptime(start_text, '%Y-%m-%d') if start_text else None
+        end = datetime.strptime(end_text, '%Y-%m-%d') + timedelta(days=1) if end_text else None
+    except ValueError:
+        flash('Invalid date.', 'danger')
+        return None, None, '', ''
+    return start, end, start_text, end_text
+
+def default_window(start, end):
+    """With no range, read only the months that are not archived; since is that default start"""
+    if start is None and end is None:
+        since = archive_cutoff()
+        return since, None, since
+    return start, end, None
+
+def older_args(start):
+    """?start=&end= for the year before start (the "Older transactions" link)"""
+    if start is None:
+        return None
+    older_start = datetime(start.year - 1, start.month, 1)
+    return {'start': older_start.strftime('%Y-%m-%d'), 'end': (start - timedelta(days=1)).strftime('%Y-%m-%d')}
+
+def filter_dates(source, query, start, end):
+    if start:
+        query = query.filter(source.timestamp >= start)
+    if end:
+        query = query.filter(source.timestamp < end)
+    return query
+
 @transactions_bp.route('/history')
 @login_required
 def history():
+    start, end, start_text, end_text = date_range_args()
+    start, end, since = default_window(start, end)
+    
     # Get all user's account IDs
     account_ids = [a.id for a in current_user.accounts]
     
-    # Get all transactions
-    transactions = Transaction.query.filter(
-        Transaction.account_id.in_(account_ids)
-    ).order_by(Transaction.timestamp.desc()).all()
+    # Get the range's transactions, including archived months it reaches
+    source = transaction_source(start, end)
+    transactions = filter_dates(source, db.session.query(source).filter(
+        source.account_id.in_(account_ids)
+    ), start, end).order_by(source.timestamp.desc()).all()
     
-    return render_template('transactions/history.html', transactions=transactions)
+    return render_template('transactions/history.html', transactions=transactions,
+                          start=start_text, end=end_text, since=since, older=older_args(start))
 
 @transactions_bp.route('/search')
 @login_required
 def search():
     query = request.args.get('q', '')
     transaction_type = request.args.get('type', '')
+    start, end, start_text, end_text = date_range_args()
+    start, end, since = default_window(start, end)
     
     account_ids = [a.id for a in current_user.accounts]
     
-    transactions_query = Transaction.query.filter(
-        Transaction.account_id.in_(account_ids)
-    )
+    source = transaction_source(start, end)
+    transactions_query = filter_dates(source, db.session.query(source).filter(
+        source.account_id.in_(account_ids)
+    ), start, end)
     
     if query:
         transactions_query = transactions_query.filter(
-            (Transaction.reference_number.contains(query)) |
-            (Transaction.description.contains(query))
+            (source.reference_number.contains(query)) |
+            (source.description.contains(query))
         )
     
     if transaction_type:
         transactions_query = transactions_query.filter(
-            Transaction.transaction_type == transaction_type
+            source.transaction_type == transaction_type
         )
     
     transactions = transactions_query.order_by(
-        Transaction.timestamp.desc()
+        source.timestamp.desc()
     ).all()
     
     return render_template('transactions/search.html', 
                           transactions=transactions, 
                           query=query,
-                          transaction_type=transaction_type)
\ No newline at end of file
+                          transaction_type=transaction_type,
+                          start=start_text,
+                          end=end_text,
+                          since=since,
+                          older=older_args(start))
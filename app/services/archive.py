@@ -0,0 +1,136 @@
+# app/services/archive.py
+# =======================
+# Transaction archival
+#
+# Whole months older than TRANSACTION_RETENTION_DAYS are moved out of the
+# transactions table into one table per month (transactions_archive_YYYY_MM,
+# same columns and ids, indexed on account and time) and registered in
+# transaction_archives. Moving is done in id chunks, each copied and then
+# deleted in one transaction, so an interrupted job loses or duplicates
+# nothing and simply continues on the next run.
+#
+# Readers call transaction_source(start, end) instead of using Transaction
+# directly: with no archive in the range it is Transaction itself, otherwise
+# an alias of Transaction over the hot table UNION ALL the archive months the
+# range overlaps. Queries on recent dates therefore only touch the hot table.
+
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import Column, Index, MetaData, Table, func, select, union_all
+from sqlalchemy.orm import aliased
+
+from app import db
+from app.models.archive import TransactionArchive
+from app.models.transaction import Transaction
+
+RETENTION_DAYS = 365
+CHUNK_SIZE = 50_000
+
+# Archive tables are created by the archive job, not by db.create_all()
+archive_metadata = MetaData()
+
+
+def month_start(moment):
+    return datetime(moment.year, moment.month, 1)
+
+
+def next_month(start):
+    return start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+
+
+def archive_table(name):
+    """The Table for an archive, with the same columns as transactions"""
+    table = archive_metadata.tables.get(name)
+    if table is None:
+        columns = [Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+                   for c in Transaction.__table__.columns]
+        table = Table(name, archive_metadata, *columns,
+                      Index(f'ix_{name}_account_timestamp', 'account_id', 'timestamp'))
+    return table
+
+
+def archives_for(start=None, end=None):
+    """Archived months overlapping [start, end); None leaves that side open"""
+    query = TransactionArchive.query
+    if start is not None:
+        query = query.filter(TransactionArchive.end > start)
+    if end is not None:
+        query = query.filter(TransactionArchive.start < end)
+    return query.order_by(TransactionArchive.start).all()
+
+
+def transaction_source(start=None, end=None):
+    """
+    Transaction, or an alias of it that also reads the archives overlapping
+    [start, end). Callers still filter on timestamp themselves.
+    """
+    archives = archives_for(start, end)
+    if not archives:
+        return Transaction
+    hot = Transaction.__table__
+    parts = [select(hot)]
+    for archive in archives:
+        table = archive_table(archive.table_name)
+        parts.append(select(*[table.c[c.name] for c in hot.columns]))
+    return aliased(Transaction, union_all(*parts).subquery('transactions_all'))
+
+
+def archive_cutoff(retention_days=None, now=None):
+    """Start of the oldest month that stays hot"""
+    if retention_days is None:
+        retention_days = current_app.config.get('TRANSACTION_RETENTION_DAYS', RETENTION_DAYS)
+    return month_start((now or datetime.utcnow()) - timedelta(days=retention_days))
+
+
+def archive_month(start, chunk_size=CHUNK_SIZE):
+    """Move one month of transactions into its archive table; returns rows moved"""
+    end = next_month(start)
+    hot = Transaction.__table__
+    in_month = (hot.c.timestamp >= start) & (hot.c.timestamp < end)
+    archive = table = None
+    moved = 0
+
+    while True:
+        ids = db.session.execute(
+            select(hot.c.id).where(in_month).order_by(hot.c.id).limit(chunk_size)).scalars().all()
+        if not ids:
+            break
+        if archive is None:
+            archive = TransactionArchive.query.filter_by(month=start.strftime('%Y-%m')).first()
+            if archive is None:
+                archive = TransactionArchive(start.strftime('%Y-%m'), f'transactions_archive_{start:%Y_%m}',
+                                             start, end)
+                db.session.add(archive)
+            table = archive_table(archive.table_name)
+            table.create(db.session.connection(), checkfirst=True)
+
+        chunk = in_month & hot.c.id.between(ids[0], ids[-1])
+        db.session.execute(table.insert().from_select([c.name for c in hot.columns], select(hot).where(chunk)))
+        # Delete exactly the rows that were copied
+        count = db.session.execute(hot.delete().where(
+            hot.c.id.in_(select(table.c.id).where(table.c.id.between(ids[0], ids[-1]))))).rowcount
+        archive.rows += count
+        db.session.commit()
+        moved += count
+    return moved
+
+
+def archive_transactions(retention_days=None, chunk_size=CHUNK_SIZE, now=None, progress=None):
+    """
+    Archive every whole month older than the retention period.
+    Returns [(month, rows moved)]; progress is called with each of them.
+    """
+    cutoff = archive_cutoff(retention_days, now)
+    oldest = db.session.query(func.min(Transaction.timestamp)).filter(Transaction.timestamp < cutoff).scalar()
+    results = []
+    month = month_start(oldest) if oldest else cutoff
+    while month < cutoff:
+        moved = archive_month(month, chunk_size)
+        if moved:
+            results.append((month.strftime('%Y-%m'), moved))
+            if progress:
+                progress(month.strftime('%Y-%m'), moved)
+        month = next_month(month)
+    db.session.commit()
+    return results
@@ -0,0 +1,192 @@
+# app/services/export.py
+# ======================
+# Streaming transaction export (CSV or Parquet)
+#
+# Rows are read with a streaming cursor (server-side where the driver has
+# one) in chunks of CHUNK_SIZE, and each chunk is encoded and handed on
+# before the next is fetched, so memory stays bounded by the chunk size
+# whatever the size of the export. Parquet output writes one row group per
+# chunk and needs pyarrow (pip install pyarrow); CSV has no dependencies.
+# Archived months are included when the date range reaches them.
+
+import csv
+import io
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app import db
+from app.models.account import Account
+from app.services.archive import transaction_source
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+CHUNK_SIZE = 10_000
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+COLUMNS = ('id', 'timestamp', 'account_number', 'account_id', 'transaction_type', 'amount',
+           'balance_change', 'status', 'reference_number', 'recipient_account', 'description')
+
+
+class ExportFilters:
+    """Validated export filters; dates are inclusive days (UTC)"""
+
+    def __init__(self, start=None, end=None, transaction_type=None, account_number=None, status=None):
+        self.start = start
+        self.end = end
+        self.transaction_type = transaction_type or None
+        self.account_number = account_number or None
+        self.status = status or None
+
+    @classmethod
+    def from_strings(cls, start='', end='', transaction_type='', account_number='', status=''):
+        """Build filters from request or CLI text; raises ValueError on a bad date"""
+        try:
+            start = datetime.strptime(start, '%Y-%m-%d').date() if start else None
+            end = datetime.strptime(end, '%Y-%m-%d').date() if end else None
+        except ValueError:
+            raise ValueError('Dates must be YYYY-MM-DD')
+        if start and end and end < start:
+            raise ValueError('The end date is before the start date')
+        return cls(start, end, transaction_type, account_number, status)
+
+    @property
+    def start_at(self):
+        return datetime.combine(self.start, datetime.min.time()) if self.start else None
+
+    @property
+    def end_before(self):
+        return datetime.combine(self.end, datetime.min.time()) + timedelta(days=1) if self.end else None
+
+
+def export_statement(filters):
+    source = transaction_source(filters.start_at, filters.end_before)
+    statement = select(
+        source.id, source.timestamp, Account.account_number, source.account_id, source.transaction_type,
+        source.amount, source.balance_change, source.status, source.reference_number,
+        source.recipient_account, source.description
+    ).join(Account, Account.id == source.account_id)
+    if filters.start_at:
+        statement = statement.where(source.timestamp >= filters.start_at)
+    if filters.end_before:
+        statement = statement.where(source.timestamp < filters.end_before)
+    if filters.transaction_type:
+        statement = statement.where(source.transaction_type == filters.transaction_type)
+    if filters.account_number:
+        statement = statement.where(Account.account_number == filters.account_number)
+    if filters.status:
+        statement = statement.where(source.status == filters.status)
+    return statement.order_by(source.timestamp, source.id)
+
+
+def iter_chunks(filters, chunk_size=CHUNK_SIZE, progress=None):
+    """Lists of up to chunk_size row tuples, fetched one chunk at a time"""
+    result = db.session.execute(export_statement(filters).execution_options(
+        stream_results=True, yield_per=chunk_size))
+    rows = 0
+    try:
+        for partition in result.partitions(chunk_size):
+            yield partition
+            rows += len(partition)
+            if progress:
+                progress(rows)
+    finally:
+        result.close()
+
+
+def csv_chunks(chunks):
+    """Encoded CSV (header first), one bytes object per chunk"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for rows in chunks:
+        writer.writerows((row[0], row[1].strftime('%Y-%m-%d %H:%M:%S') if row[1] else '', *row[2:])
+                         for row in rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def parquet_schema():
+    return pyarrow.schema([
+        ('id', pyarrow.int64()),
+        ('timestamp', pyarrow.timestamp('us')),
+        ('account_number', pyarrow.string()),
+        ('account_id', pyarrow.int64()),
+        ('transaction_type', pyarrow.dictionary(pyarrow.int8(), pyarrow.string())),
+        ('amount', pyarrow.float64()),
+        ('balance_change', pyarrow.float64()),
+        ('status', pyarrow.dictionary(pyarrow.int8(), pyarrow.string())),
+        ('reference_number', pyarrow.string()),
+        ('recipient_account', pyarrow.string()),
+        ('description', pyarrow.string()),
+    ])
+
+
+class _ChunkSink:
+    """Write-only file object whose contents are taken out after each row group"""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def parquet_chunks(chunks):
+    """A Parquet file, one row group per chunk, yielded as it is written"""
+    schema = parquet_schema()
+    sink = _ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        for rows in chunks:
+            columns = list(zip(*rows))
+            table = pyarrow.Table.from_arrays(
+                [pyarrow.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema)
+            writer.write_table(table)
+            data = sink.take()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+def export_chunks(filters, fmt='csv', chunk_size=CHUNK_SIZE, progress=None):
+    """The encoded export as a generator of bytes; progress is called with the rows exported so far"""
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown export format {fmt!r}')
+    if fmt == 'parquet' and pyarrow is None:
+        raise RuntimeError('Parquet export needs pyarrow (pip install pyarrow)')
+    encode = parquet_chunks if fmt == 'parquet' else csv_chunks
+    return encode(iter_chunks(filters, chunk_size, progress))
+
+
+def export_filename(fmt, now=None):
+    return f"transactions-{(now or datetime.utcnow()):%Y%m%d-%H%M%S}.{FORMATS[fmt][1]}"
@@ -0,0 +1,166 @@
+# app/services/interest.py
+# ========================
+# Daily interest accrual
+#
+# Eligible accounts (active, positive balance, an interest-bearing type)
+# are read in id order, CHUNK_SIZE at a time, into NumPy arrays and the
+# day's interest for the whole chunk is computed with array operations.
+# Each chunk is written with one executemany UPDATE of balances and one
+# executemany INSERT of 'interest' transactions, passed straight to the
+# DBAPI because SQLAlchemy's per-row parameter processing costs more than
+# the writes themselves, and added to the spending rollup in bulk. Each
+# chunk is committed together with the job's checkpoint: running the job
+# again for the same date resumes after the last committed account, or
+# does nothing if it finished.
+
+from datetime import datetime, time, timedelta
+from itertools import repeat
+
+import numpy as np
+from sqlalchemy import bindparam, func, literal_column, select
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models.account import Account
+from app.models.interest import InterestAccrual
+from app.models.transaction import Transaction
+from app.services.spending import add_bulk
+
+# Annual rates per account type as marginal tiers of (balance floor, rate):
+# the part of a balance above each floor earns that tier's rate
+INTEREST_TIERS = {
+    'savings': ((0, 0.020), (10_000, 0.025), (50_000, 0.030)),
+    'checking': ((0, 0.001),),
+}
+DAYS_PER_YEAR = 365
+CHUNK_SIZE = 50_000
+
+
+def daily_interest(balances, tiers, days_per_year=DAYS_PER_YEAR):
+    """One day's interest on each balance, rounded to cents"""
+    balances = np.asarray(balances, dtype=np.float64)
+    annual = np.zeros_like(balances)
+    ceilings = [floor for floor, _ in tiers[1:]] + [np.inf]
+    for (floor, rate), ceiling in zip(tiers, ceilings):
+        annual += (np.clip(balances, floor, ceiling) - floor) * rate
+    return np.round(annual / days_per_year, 2)
+
+
+def chunk_interest(account_types, balances, tiers=INTEREST_TIERS):
+    """Interest for a chunk of accounts with mixed types"""
+    interest = np.zeros(len(balances))
+    for account_type, type_tiers in tiers.items():
+        mask = account_types == account_type
+        if mask.any():
+            interest[mask] = daily_interest(balances[mask], type_tiers)
+    return interest
+
+
+def interest_references(accrual_date, account_ids):
+    """Deterministic references, so an account can never be credited twice for a day"""
+    prefix = f'INT{accrual_date:%Y%m%d}'
+    return [f'{prefix}{account_id:09d}' for account_id in account_ids]
+
+
+def execute_many(statement, count, **params):
+    """
+    executemany at the DBAPI level. Every parameter of the statement must be
+    an explicit bindparam; each keyword is a list of `count` database-ready
+    values, or a single value shared by all rows.
+    """
+    connection = db.session.connection()
+    compiled = statement.compile(dialect=connection.dialect)
+    columns = {name: value if isinstance(value, list) else repeat(value, count)
+               for name, value in params.items()}
+    if compiled.positional:
+        rows = list(zip(*(columns[name] for name in compiled.positiontup)))
+    else:
+        rows = [dict(zip(columns, row)) for row in zip(*columns.values())]
+    connection.exec_driver_sql(compiled.string, rows)
+
+
+def db_value(column, value):
+    """A value as the driver expects it for column (e.g. datetimes as text on SQLite)"""
+    dialect = db.session.connection().dialect
+    processor = column.type.dialect_impl(dialect).bind_processor(dialect)
+    return processor(value) if processor else value
+
+
+def posting_time(accrual_date):
+    """Interest for a day is posted at the last second of that day (UTC), whenever the job runs"""
+    return datetime.combine(accrual_date + timedelta(days=1), time()) - timedelta(seconds=1)
+
+
+def get_or_create_job(accrual_date):
+    job = InterestAccrual.query.filter_by(accrual_date=accrual_date).first()
+    if job is not None:
+        return job
+    try:
+        job = InterestAccrual(accrual_date)
+        db.session.add(job)
+        db.session.commit()
+        return job
+    except IntegrityError:
+        # Started concurrently by another process
+        db.session.rollback()
+        return InterestAccrual.query.filter_by(accrual_date=accrual_date).one()
+
+
+def accrue_interest(accrual_date, chunk_size=CHUNK_SIZE, tiers=INTEREST_TIERS):
+    """Accrue one day's interest on all eligible accounts. Returns the job."""
+    job = get_or_create_job(accrual_date)
+    if job.completed_at is not None:
+        return job
+
+    accounts = Account.__table__
+    transactions = Transaction.__table__
+    select_chunk = select(accounts.c.id, accounts.c.account_type, accounts.c.balance).where(
+        accounts.c.id > bindparam('last_id'),
+        accounts.c.status == 'active',
+        accounts.c.balance > 0,
+        accounts.c.account_type.in_(list(tiers))
+    ).order_by(accounts.c.id).limit(chunk_size)
+    credit = accounts.update().where(accounts.c.id == bindparam('account_id')).values(
+        balance=func.round(accounts.c.balance + bindparam('interest'), literal_column('2')),
+        updated_at=bindparam('now'))
+    post = transactions.insert().values({
+        name: bindparam(name) for name in ('account_id', 'transaction_type', 'amount', 'description',
+                                           'reference_number', 'status', 'timestamp')})
+    description = f'Interest accrued {accrual_date:%Y-%m-%d}'
+    # Backfilled or resumed dates still land in their own day, statement and rollup month
+    posted_at = posting_time(accrual_date)
+    timestamp = db_value(transactions.c.timestamp, posted_at)
+
+    while True:
+        rows = db.session.execute(select_chunk, {'last_id': job.last_account_id}).all()
+        if not rows:
+            break
+
+        ids, account_types, balances = (np.array(column) for column in zip(*rows))
+        interest = chunk_interest(account_types, balances.astype(np.float64), tiers)
+        earning = interest > 0
+        credited_ids = ids[earning].tolist()
+        amounts = interest[earning].tolist()
+
+        if credited_ids:
+            now = db_value(accounts.c.updated_at, datetime.utcnow())
+            count = len(credited_ids)
+            execute_many(credit, count, account_id=credited_ids, interest=amounts, now=now)
+            execute_many(post, count,
+                         account_id=credited_ids,
+                         transaction_type='interest',
+                         amount=amounts,
+                         description=description,
+                         reference_number=interest_references(accrual_date, credited_ids),
+                         status='completed',
+                         timestamp=timestamp)
+            add_bulk(credited_ids, 'interest', amounts, posted_at)
+
+        job.last_account_id = int(ids[-1])
+        job.accounts += len(credited_ids)
+        job.total_interest = round(job.total_interest + float(interest[earning].sum()), 2)
+        db.session.commit()
+
+    job.completed_at = datetime.utcnow()
+    db.session.commit()
+    return job
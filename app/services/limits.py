@@ -0,0 +1,165 @@
+# app/services/limits.py
+# ======================
+# Daily withdrawal and transfer limits
+#
+# Limits come from DAILY_LIMITS by the owner's role and the account type,
+# unless an admin override is in effect. Usage is kept as running totals
+# in daily_limit_usage (one row per account and UTC day): a posting
+# reserves its amount with a single conditional UPDATE in the posting's
+# own transaction, so checking a limit never sums transaction history and
+# two concurrent postings cannot both squeeze under it.
+
+from datetime import date, datetime
+
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models.limits import DailyLimitUsage, LimitOverride
+
+KINDS = ('withdrawal', 'transfer')
+
+# role -> account type -> kind -> limit per day (missing means unlimited)
+DEFAULT_DAILY_LIMITS = {
+    'customer': {
+        'savings': {'withdrawal': 1_000, 'transfer': 5_000},
+        'checking': {'withdrawal': 2_500, 'transfer': 10_000},
+    },
+    'admin': {
+        'savings': {'withdrawal': 5_000, 'transfer': 25_000},
+        'checking': {'withdrawal': 10_000, 'transfer': 50_000},
+    },
+}
+
+
+def today():
+    return datetime.utcnow().date()
+
+
+def load_overrides(account_ids):
+    """{account_id: LimitOverride} for many accounts in one query (for batch postings)"""
+    return {o.account_id: o for o in LimitOverride.query.filter(LimitOverride.account_id.in_(account_ids))}
+
+
+def active_override(account_id, day=None, overrides=None):
+    if overrides is not None:
+        override = overrides.get(account_id)
+    else:
+        override = LimitOverride.query.filter_by(account_id=account_id).first()
+    if override is None or (override.valid_until is not None and override.valid_until < (day or today())):
+        return None
+    return override
+
+
+def set_override(account_id, data, created_by=None):
+    """
+    Create or replace an account's override from a dict with withdrawal_limit,
+    transfer_limit, valid_until (YYYY-MM-DD) and reason. Raises ValueError
+    on bad input; the caller commits.
+    """
+    values = {}
+    for kind in KINDS:
+        limit = data.get(f'{kind}_limit')
+        if limit is not None:
+            if isinstance(limit, bool) or not isinstance(limit, (int, float)) or limit < 0:
+                raise ValueError(f'{kind}_limit must be a non-negative number or null')
+            limit = float(limit)
+        values[kind] = limit
+    if values['withdrawal'] is None and values['transfer'] is None:
+        raise ValueError('Set withdrawal_limit and/or transfer_limit')
+
+    valid_until = data.get('valid_until')
+    if valid_until is not None:
+        try:
+            valid_until = date.fromisoformat(valid_until)
+        except (TypeError, ValueError):
+            raise ValueError('valid_until must be a date (YYYY-MM-DD) or null')
+
+    override = LimitOverride.query.filter_by(account_id=account_id).first()
+    if override is None:
+        override = LimitOverride(account_id)
+        db.session.add(override)
+    override.withdrawal_limit = values['withdrawal']
+    override.transfer_limit = values['transfer']
+    override.valid_until = valid_until
+    override.reason = str(data.get('reason') or '')[:255] or None
+    override.created_by = created_by
+    override.created_at = datetime.utcnow()
+    return override
+
+
+def remove_override(account_id):
+    """Delete an account's override; returns whether there was one"""
+    return LimitOverride.query.filter_by(account_id=account_id).delete() > 0
+
+
+def daily_limit(account, kind, day=None, overrides=None):
+    """The account's limit for a kind of posting, or None when unlimited"""
+    override = active_override(account.id, day, overrides)
+    if override is not None and getattr(override, f'{kind}_limit') is not None:
+        return getattr(override, f'{kind}_limit')
+    limits = current_app.config.get('DAILY_LIMITS', DEFAULT_DAILY_LIMITS)
+    role = account.owner.role if account.owner else 'customer'
+    return limits.get(role, {}).get(account.account_type, {}).get(kind)
+
+
+def daily_usage(account_id, day=None):
+    """{kind: amount used} for the day"""
+    usage = DailyLimitUsage.query.filter_by(account_id=account_id, day=day or today()).first()
+    return {kind: getattr(usage, kind) if usage else 0.0 for kind in KINDS}
+
+
+def remaining_today(account):
+    """{kind: {limit, used, remaining}}; limit and remaining are None when unlimited"""
+    day = today()
+    used = daily_usage(account.id, day)
+    result = {}
+    for kind in KINDS:
+        limit = daily_limit(account, kind, day)
+        result[kind] = {
+            'limit': limit,
+            'used': round(used[kind], 2),
+            'remaining': None if limit is None else round(max(limit - used[kind], 0.0), 2),
+        }
+    return result
+
+
+def reserve(account, kind, amount, overrides=None):
+    """
+    Add amount to today's running total if it stays within the limit.
+    Returns False (changing nothing) when it would not. The caller commits
+    the reservation together with the posting. overrides is an optional
+    preloaded load_overrides() result.
+    """
+    day = today()
+    limit = daily_limit(account, kind, day, overrides)
+    table = DailyLimitUsage.__table__
+    column = table.c[kind]
+    increment = table.update().where(
+        table.c.account_id == account.id,
+        table.c.day == day
+    ).values({column: column + amount})
+    if limit is not None:
+        increment = increment.where(column + amount <= limit + 1e-9)
+
+    if db.session.execute(increment).rowcount:
+        return True
+    if limit is not None:
+        if amount > limit + 1e-9:
+            return False
+        exists = select(table.c.id).where(table.c.account_id == account.id, table.c.day == day)
+        if db.session.execute(exists).first() is not None:
+            return False  # the row exists, so the limit was reached
+
+    # First posting of the day. A Core insert under a connection savepoint
+    # does not flush or snapshot the session, which batch callers rely on.
+    connection = db.session.connection()
+    try:
+        with connection.begin_nested():
+            connection.execute(table.insert().values(
+                {'account_id': account.id, 'day': day, **{k: amount if k == kind else 0.0 for k in KINDS}}))
+        return True
+    except IntegrityError:
+        # Another posting created the row first
+        return db.session.execute(increment).rowcount == 1
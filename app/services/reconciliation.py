@@ -0,0 +1,177 @@
+# app/services/reconciliation.py
+# ==============================
+# Ledger reconciliation
+#
+# Every account's stored balance must equal the signed sum of its
+# transactions (Transaction.balance_change). A run splits the accounts into
+# id ranges; for each range a single statement joins the accounts to their
+# transactions aggregated per account, streamed in account order from
+# ix_transactions_account_timestamp. Being one statement, it reads the
+# balances and the transactions from the same snapshot, so postings
+# committed during the run cannot show up as false discrepancies. Ranges
+# run across a process pool.
+#
+# Incremental runs (the default once a full run exists) only check the
+# accounts updated since the previous run started, the accounts with
+# transactions after its high-water transaction id, and the accounts that
+# were out of balance last time. A balance changed outside the app without
+# touching updated_at is only caught by a full run.
+
+import csv
+import os
+from concurrent.futures import as_completed
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app import db
+from app.models.account import Account
+from app.models.reconciliation import ReconciliationDiscrepancy, ReconciliationRun
+from app.models.transaction import Transaction
+from app.services.archive import transaction_source
+from app.services.workers import submit, worker_pool
+
+RANGE_SIZE = 50_000     # account ids per task in a full run
+CHUNK_SIZE = 5_000      # accounts per task in an incremental run
+TOLERANCE = 0.005       # differences below half a cent are float noise
+CHECKPOINT_OVERLAP = timedelta(minutes=5)  # covers postings in flight when the last run started
+STREAM_CHUNK = 10_000
+
+REPORT_COLUMNS = ('account_id', 'account_number', 'balance', 'ledger_balance', 'difference', 'transactions')
+
+
+def check_accounts(first_id, last_id, account_ids=None):
+    """
+    Compare balances with ledgers for accounts first_id..last_id (only
+    account_ids when given). Returns (accounts, transactions, discrepancies)
+    with discrepancies as (account_id, account_number, balance, ledger, count).
+    """
+    source = transaction_source()  # including every archived month
+    in_range = source.account_id.between(first_id, last_id)
+    if account_ids is not None:
+        in_range = in_range & source.account_id.in_(account_ids)
+    ledger = select(
+        source.account_id,
+        func.sum(source.balance_change).label('total'),
+        func.count().label('count')
+    ).where(in_range).group_by(source.account_id).subquery()
+
+    statement = select(
+        Account.id, Account.account_number, Account.balance,
+        func.coalesce(ledger.c.total, 0.0), func.coalesce(ledger.c.count, 0)
+    ).outerjoin(ledger, ledger.c.account_id == Account.id).where(Account.id.between(first_id, last_id))
+    if account_ids is not None:
+        statement = statement.where(Account.id.in_(account_ids))
+
+    accounts = transactions = 0
+    discrepancies = []
+    result = db.session.execute(statement.execution_options(yield_per=STREAM_CHUNK))
+    for account_id, account_number, balance, total, count in result:
+        accounts += 1
+        transactions += count
+        if abs((balance or 0.0) - total) >= TOLERANCE:
+            discrepancies.append((account_id, account_number, balance or 0.0, round(total, 2), count))
+    db.session.commit()
+    return accounts, transactions, discrepancies
+
+
+def last_completed_run():
+    return ReconciliationRun.query.filter(ReconciliationRun.completed_at.isnot(None))\
+        .order_by(ReconciliationRun.id.desc()).first()
+
+
+def changed_accounts(previous):
+    """Sorted ids of the accounts to check after the `previous` run"""
+    since = previous.started_at - CHECKPOINT_OVERLAP
+    ids = {account_id for (account_id,) in db.session.query(Account.id).filter(Account.updated_at >= since)}
+    ids.update(account_id for (account_id,) in db.session.query(Transaction.account_id).filter(
+        Transaction.id > previous.max_transaction_id).distinct())
+    ids.update(account_id for (account_id,) in db.session.query(ReconciliationDiscrepancy.account_id).filter(
+        ReconciliationDiscrepancy.run_id == previous.id))
+    return sorted(ids)
+
+
+def plan_tasks(full, previous, range_size=RANGE_SIZE, chunk_size=CHUNK_SIZE):
+    """(first_id, last_id, account_ids or None) per task"""
+    if full:
+        first, last = db.session.query(func.min(Account.id), func.max(Account.id)).one()
+        if first is None:
+            return []
+        return [(start, min(start + range_size - 1, last), None) for start in range(first, last + 1, range_size)]
+    ids = changed_accounts(previous)
+    return [(chunk[0], chunk[-1], chunk) for chunk in
+            (ids[i:i + chunk_size] for i in range(0, len(ids), chunk_size))]
+
+
+def write_report(path, discrepancies):
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(REPORT_COLUMNS)
+        for account_id, account_number, balance, ledger, count in discrepancies:
+            writer.writerow([account_id, account_number, f'{balance:.2f}', f'{ledger:.2f}',
+                             f'{balance - ledger:.2f}', count])
+    os.replace(temp_path, path)
+
+
+def reconcile(output_dir, full=False, workers=1, range_size=RANGE_SIZE, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Run a reconciliation and write its discrepancy report (CSV) to output_dir.
+
+    The first run is always full. workers > 1 checks ranges in that many
+    processes (not with in-memory SQLite). progress is called with
+    (tasks done, tasks total). Returns the completed ReconciliationRun.
+    """
+    previous = last_completed_run()
+    full = full or previous is None
+
+    started_at = datetime.utcnow()
+    max_transaction_id = db.session.query(func.max(Transaction.id)).scalar() or 0
+    run = ReconciliationRun('full' if full else 'incremental', max_transaction_id, workers)
+    run.started_at = started_at
+    tasks = plan_tasks(full, previous, range_size, chunk_size)
+    db.session.add(run)
+    # Release the connection so workers can read SQLite
+    db.session.commit()
+
+    discrepancies = []
+    done = 0
+
+    def collect(result):
+        nonlocal done
+        accounts, transactions, found = result
+        run.accounts += accounts
+        run.transactions += transactions
+        discrepancies.extend(found)
+        done += 1
+        if progress:
+            progress(done, len(tasks))
+
+    if workers > 1 and len(tasks) > 1:
+        with worker_pool(workers) as pool:
+            for future in as_completed([submit(pool, check_accounts, *task) for task in tasks]):
+                collect(future.result())
+    else:
+        for task in tasks:
+            collect(check_accounts(*task))
+
+    discrepancies.sort()
+    os.makedirs(output_dir, exist_ok=True)
+    run.report_path = os.path.abspath(os.path.join(
+        output_dir, f"reconciliation-{run.id}-{started_at.strftime('%Y%m%d%H%M%S')}.csv"))
+    write_report(run.report_path, discrepancies)
+
+    if discrepancies:
+        db.session.execute(ReconciliationDiscrepancy.__table__.insert(), [{
+            'run_id': run.id,
+            'account_id': account_id,
+            'account_number': account_number,
+            'balance': balance,
+            'ledger_balance': ledger,
+            'difference': round(balance - ledger, 2),
+            'transactions': count,
+        } for account_id, account_number, balance, ledger, count in discrepancies])
+    run.discrepancy_count = len(discrepancies)
+    run.completed_at = datetime.utcnow()
+    db.session.commit()
+    return run
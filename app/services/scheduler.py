@@ -0,0 +1,275 @@
+# app/services/scheduler.py
+# =========================
+# Scheduled and recurring transfers
+#
+# The scheduler process keeps the transfers due within LOOKAHEAD in a heap
+# ordered by next_run_at. Each tick runs one indexed range query on
+# (status, next_run_at) to pick up rows that became due soon (new
+# schedules, retries, edits), then pops everything that is due and executes
+# it in batches, one database transaction per batch. The table is never scanned, so a tick costs the same with ten
+# schedules or ten million.
+#
+# Transfers go through the same velocity rules as transfers made in the
+# app (app/utils/velocity.py): a posting a block rule refuses is retried
+# like one over the daily limit, and a flagged one is posted for review.
+#
+# A transfer that fails for lack of funds, velocity or daily limit is retried
+# RETRY_DELAY later, up to MAX_ATTEMPTS times; after that the occurrence is
+# skipped (one-off transfers fail). A closed or missing account fails the
+# schedule for good. After an outage each overdue schedule is paid once and
+# then moves to its next future occurrence rather than catching up.
+#
+# Run a single scheduler process; it owns the heap.
+
+import calendar
+import heapq
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app import db
+from app.models.account import Account
+from app.models.scheduled_transfer import ScheduledTransfer
+from app.models.transaction import Transaction
+from app.services.limits import load_overrides, reserve
+from app.utils.velocity import release_posting, reserve_posting
+
+logger = logging.getLogger('app.scheduler')
+
+LOOKAHEAD = timedelta(minutes=5)
+BATCH_SIZE = 500
+MAX_ATTEMPTS = 3
+RETRY_DELAY = timedelta(hours=1)
+MAX_QUEUED = 200_000  # heap entries loaded per tick at most
+
+
+def add_months(moment, months, day):
+    """moment moved by whole months, on `day` or the month's last day if shorter"""
+    index = moment.month - 1 + months
+    year, month = moment.year + index // 12, index % 12 + 1
+    return moment.replace(year=year, month=month, day=min(day, calendar.monthrange(year, month)[1]))
+
+
+def next_occurrence(schedule, after):
+    """The first occurrence of a schedule strictly after `after`, or None"""
+    start = schedule.start_at
+    if schedule.frequency == 'once':
+        return None
+    if schedule.frequency in ('daily', 'weekly'):
+        step = timedelta(days=1 if schedule.frequency == 'daily' else 7)
+        if after < start:
+            return start
+        return start + step * ((after - start) // step + 1)
+    if schedule.frequency == 'monthly':
+        months = max((after.year - start.year) * 12 + after.month - start.month, 0)
+        occurrence = add_months(start, months, start.day)
+        while occurrence <= after:
+            months += 1
+            occurrence = add_months(start, months, start.day)
+        return occurrence
+    raise ValueError(f'Unknown frequency {schedule.frequency!r}')
+
+
+def advance(schedule, now):
+    """Move a schedule to its next future occurrence, completing it when there is none"""
+    occurrence = next_occurrence(schedule, max(now, schedule.due_at))
+    schedule.attempts = 0
+    if occurrence is None or (schedule.end_date is not None and occurrence.date() > schedule.end_date):
+        schedule.status = 'completed'
+        schedule.next_run_at = None
+    else:
+        schedule.due_at = schedule.next_run_at = occurrence
+
+
+def post_transfer(schedule, from_account, to_account, overrides=None, reservations=None):
+    """
+    Move the money for one occurrence. Returns None on success or
+    (reason, retryable) when nothing was posted. The velocity reservation
+    of a posted transfer is appended to `reservations`, to be released if
+    the batch is not committed.
+    """
+    if from_account is None or from_account.status != 'active':
+        return 'source account is not active', False
+    if to_account is None or to_account.status != 'active':
+        return 'recipient account is not active', False
+    if from_account.id == to_account.id:
+        return 'cannot transfer to the same account', False
+    if from_account.balance < schedule.amount:
+        return 'insufficient funds', True
+    velocity = reserve_posting(from_account.id, schedule.amount)
+    if velocity.blocked:
+        return velocity.message, True
+    if not reserve(from_account, 'transfer', schedule.amount, overrides):
+        release_posting(from_account.id, schedule.amount, velocity)
+        return 'daily transfer limit reached', True
+    if reservations is not None:
+        reservations.append((from_account.id, schedule.amount, velocity))
+
+    amount = schedule.amount
+    reference = Transaction.generate_reference()
+    description = schedule.description or 'Scheduled transfer'
+    from_account.balance -= amount
+    to_account.balance += amount
+    db.session.add_all([
+        Transaction(account_id=from_account.id, transaction_type='transfer', amount=-amount,
+                    description=f'Transfer to {to_account.account_number}: {description}',
+                    recipient_account=to_account.account_number, reference_number=reference,
+                    status='flagged' if velocity.flagged else 'completed'),
+        Transaction(account_id=to_account.id, transaction_type='transfer', amount=amount,
+                    description=f'Transfer from {from_account.account_number}: {description}',
+                    recipient_account=from_account.account_number, reference_number=reference + '-IN'),
+    ])
+    return None
+
+
+def record_outcome(schedule, failure, now, max_attempts=MAX_ATTEMPTS, retry_delay=RETRY_DELAY):
+    """Update a schedule after an attempt; returns the outcome name"""
+    schedule.last_run_at = now
+    if failure is None:
+        schedule.runs += 1
+        schedule.last_result = 'completed'
+        advance(schedule, now)
+        return 'completed'
+
+    reason, retryable = failure
+    schedule.attempts += 1
+    if retryable and schedule.attempts < max_attempts:
+        schedule.next_run_at = now + retry_delay
+        outcome = 'retrying'
+    elif retryable and schedule.frequency != 'once':
+        advance(schedule, now)
+        outcome = 'skipped'
+    else:
+        schedule.status = 'failed'
+        schedule.next_run_at = None
+        outcome = 'failed'
+    schedule.last_result = f'{outcome}: {reason}'
+    logger.info('Scheduled transfer %s: %s', schedule.id, schedule.last_result)
+    return outcome
+
+
+def execute_batch(ids, now, max_attempts=MAX_ATTEMPTS, retry_delay=RETRY_DELAY):
+    """Execute the due schedules among ids and commit. Returns a Counter of outcomes."""
+    outcomes = Counter()
+    schedules = ScheduledTransfer.query.filter(
+        ScheduledTransfer.id.in_(ids),
+        ScheduledTransfer.status == 'active',
+        ScheduledTransfer.next_run_at <= now
+    ).order_by(ScheduledTransfer.next_run_at).with_for_update().all()
+    if not schedules:
+        return outcomes
+
+    # Load every account and limit override of the batch up front
+    from_ids = {s.from_account_id for s in schedules}
+    numbers = {s.to_account_number for s in schedules}
+    accounts = Account.query.filter(Account.id.in_(from_ids) | Account.account_number.in_(numbers)).all()
+    by_id = {a.id: a for a in accounts}
+    by_number = {a.account_number: a for a in accounts}
+    overrides = load_overrides(from_ids)
+    reservations = []
+
+    def release_all():
+        for account_id, amount, velocity in reservations:
+            release_posting(account_id, amount, velocity)
+
+    for schedule in schedules:
+        try:
+            # Postings are flushed together at commit
+            with db.session.no_autoflush:
+                failure = post_transfer(schedule, by_id.get(schedule.from_account_id),
+                                        by_number.get(schedule.to_account_number), overrides, reservations)
+        except Exception:
+            # Undo the whole batch and set this schedule aside; the others
+            # are still due and are picked up again on the next tick
+            logger.exception('Scheduled transfer %s raised', schedule.id)
+            db.session.rollback()
+            release_all()
+            schedule = db.session.get(ScheduledTransfer, schedule.id)
+            outcome = record_outcome(schedule, ('error', True), now, max_attempts, retry_delay)
+            db.session.commit()
+            return Counter({outcome: 1})
+        outcomes[record_outcome(schedule, failure, now, max_attempts, retry_delay)] += 1
+
+    try:
+        db.session.commit()
+    except Exception:
+        release_all()
+        raise
+    return outcomes
+
+
+class TransferScheduler:
+    """In-memory heap of the schedules due within `lookahead`"""
+
+    def __init__(self, lookahead=LOOKAHEAD, batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS,
+                 retry_delay=RETRY_DELAY, max_queued=MAX_QUEUED):
+        self.lookahead = lookahead
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_queued = max_queued
+        self.heap = []     # (next_run_at, schedule id)
+        self.queued = {}   # schedule id -> next_run_at of its live heap entry
+
+    def refill(self, now):
+        """Queue the active schedules due before now + lookahead; returns how many were new"""
+        rows = db.session.execute(
+            select(ScheduledTransfer.id, ScheduledTransfer.next_run_at).where(
+                ScheduledTransfer.status == 'active',
+                ScheduledTransfer.next_run_at <= now + self.lookahead
+            ).order_by(ScheduledTransfer.next_run_at).limit(self.max_queued)
+        ).all()
+        added = 0
+        for schedule_id, next_run_at in rows:
+            if self.queued.get(schedule_id) != next_run_at:
+                # A changed next_run_at leaves the old entry behind; pop_due skips it
+                self.queued[schedule_id] = next_run_at
+                heapq.heappush(self.heap, (next_run_at, schedule_id))
+                added += 1
+        db.session.commit()
+        return added
+
+    def pop_due(self, now):
+        """Up to batch_size schedule ids due at `now`"""
+        ids = []
+        while self.heap and self.heap[0][0] <= now and len(ids) < self.batch_size:
+            next_run_at, schedule_id = heapq.heappop(self.heap)
+            if self.queued.get(schedule_id) == next_run_at:
+                del self.queued[schedule_id]
+                ids.append(schedule_id)
+        return ids
+
+    def next_wakeup(self):
+        return self.heap[0][0] if self.heap else None
+
+    def tick(self, now=None):
+        """Refill, then execute everything due. Returns a Counter of outcomes."""
+        now = now or datetime.utcnow()
+        self.refill(now)
+        outcomes = Counter()
+        while True:
+            ids = self.pop_due(now)
+            if not ids:
+                break
+            outcomes.update(execute_batch(ids, now, self.max_attempts, self.retry_delay))
+        return outcomes
+
+    def run(self, interval=5.0, ticks=None):
+        """Tick every `interval` seconds (sooner when something is due), forever or `ticks` times"""
+        count = 0
+        while ticks is None or count < ticks:
+            started = time.monotonic()
+            outcomes = self.tick()
+            if outcomes:
+                logger.info('Tick: %s', ', '.join(f'{k}={v}' for k, v in sorted(outcomes.items())))
+            count += 1
+            if ticks is not None and count >= ticks:
+                break
+            wait = interval - (time.monotonic() - started)
+            wakeup = self.next_wakeup()
+            if wakeup is not None:
+                wait = min(wait, (wakeup - datetime.utcnow()).total_seconds())
+            time.sleep(max(wait, 0.05))
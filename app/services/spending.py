@@ -0,0 +1,202 @@
+# app/services/spending.py
+# ========================
+# Monthly spending rollup
+#
+# spending_rollups holds money in, money out and a count per (account,
+# month, transaction type), with the owner's user_id, so the dashboard's
+# monthly totals read a handful of rollup rows instead of scanning
+# transactions. Every Transaction inserted through the ORM adds itself to
+# its row from an after_insert mapper event, on the flush's connection, so
+# the rollup commits or rolls back together with the posting. Interest
+# accrual writes transactions with bulk Core inserts and calls add_bulk()
+# for each chunk instead.
+#
+# rebuild_rollup() recomputes everything from transactions and their
+# archives, month by month (flask ledger rebuild-spending), e.g. after
+# loading data outside the ORM.
+
+from datetime import datetime
+
+from sqlalchemy import bindparam, case, event, func, literal, select
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models.account import Account
+from app.models.spending import SpendingRollup
+from app.models.transaction import Transaction
+from app.services.archive import month_start, next_month, transaction_source
+
+MONTHS = 6  # months shown on the dashboard
+
+
+def month_key(moment):
+    return f'{moment:%Y-%m}'
+
+
+def previous_month(start):
+    return start.replace(year=start.year - 1, month=12) if start.month == 1 else start.replace(month=start.month - 1)
+
+
+def _rollup_statements():
+    """(increment, insert) for one rollup row, keyed by key_account_id, key_month and key_type"""
+    table = SpendingRollup.__table__
+    increment = table.update().where(
+        table.c.account_id == bindparam('key_account_id'),
+        table.c.month == bindparam('key_month'),
+        table.c.transaction_type == bindparam('key_type')
+    ).values(money_in=table.c.money_in + bindparam('add_in'),
+             money_out=table.c.money_out + bindparam('add_out'),
+             count=table.c.count + bindparam('add_count'))
+    accounts = Account.__table__
+    insert = table.insert().values(
+        user_id=select(accounts.c.user_id).where(accounts.c.id == bindparam('key_account_id')).scalar_subquery(),
+        account_id=bindparam('key_account_id'),
+        month=bindparam('key_month'),
+        transaction_type=bindparam('key_type'),
+        money_in=bindparam('add_in'),
+        money_out=bindparam('add_out'),
+        count=bindparam('add_count'))
+    return increment, insert
+
+
+INCREMENT, INSERT = _rollup_statements()
+
+
+def add_posting(connection, account_id, transaction_type, balance_change, moment):
+    """Add one posting to its rollup row, creating the row on the month's first posting"""
+    params = {
+        'key_account_id': account_id,
+        'key_month': month_key(moment),
+        'key_type': transaction_type,
+        'add_in': max(balance_change, 0.0),
+        'add_out': max(-balance_change, 0.0),
+        'add_count': 1,
+    }
+    if connection.execute(INCREMENT, params).rowcount:
+        return
+    try:
+        with connection.begin_nested():
+            connection.execute(INSERT, params)
+    except IntegrityError:
+        # Another posting created the row first
+        connection.execute(INCREMENT, params)
+
+
+def add_bulk(account_ids, transaction_type, balance_changes, moment):
+    """
+    Add one posting per account (ids ascending, each at most once) for the
+    same type and month, with an executemany update and insert.
+    """
+    if not account_ids:
+        return
+    from app.services.interest import execute_many
+
+    table = SpendingRollup.__table__
+    month = month_key(moment)
+    existing = {account_id for (account_id,) in db.session.execute(
+        select(table.c.account_id).where(
+            table.c.month == month,
+            table.c.transaction_type == transaction_type,
+            table.c.account_id.between(account_ids[0], account_ids[-1])))}
+
+    for statement, selected in ((INCREMENT, True), (INSERT, False)):
+        rows = [(account_id, change) for account_id, change in zip(account_ids, balance_changes)
+                if (account_id in existing) == selected]
+        if rows:
+            ids, changes = (list(column) for column in zip(*rows))
+            execute_many(statement, len(rows),
+                         key_account_id=ids, key_month=month, key_type=transaction_type,
+                         add_in=[max(change, 0.0) for change in changes],
+                         add_out=[max(-change, 0.0) for change in changes],
+                         add_count=1)
+
+
+def _after_insert(mapper, connection, transaction):
+    add_posting(connection, transaction.account_id, transaction.transaction_type,
+                transaction.balance_change, transaction.timestamp or datetime.utcnow())
+
+
+def init_spending(app):
+    """Keep the rollup up to date with every Transaction inserted through the ORM"""
+    if not event.contains(Transaction, 'after_insert', _after_insert):
+        event.listen(Transaction, 'after_insert', _after_insert)
+
+
+def rebuild_rollup(progress=None):
+    """
+    Recompute the rollup from transactions and archives in one database
+    transaction. progress is called with (month, rollup rows) per month.
+    Returns the number of rollup rows.
+    """
+    table = SpendingRollup.__table__
+    db.session.execute(table.delete())
+
+    source = transaction_source()
+    first, last = db.session.query(func.min(source.timestamp), func.max(source.timestamp)).one()
+    total = 0
+    month = month_start(first) if first else None
+    while month is not None and month <= last:
+        end = next_month(month)
+        source = transaction_source(month, end)
+        change = source.balance_change
+        rows = select(
+            Account.user_id, source.account_id, literal(month_key(month)), source.transaction_type,
+            func.sum(case((change > 0, change), else_=0.0)),
+            func.sum(case((change < 0, -change), else_=0.0)),
+            func.count()
+        ).join(Account, Account.id == source.account_id).where(
+            source.timestamp >= month,
+            source.timestamp < end
+        ).group_by(Account.user_id, source.account_id, source.transaction_type)
+        inserted = db.session.execute(table.insert().from_select(
+            ['user_id', 'account_id', 'month', 'transaction_type', 'money_in', 'money_out', 'count'], rows)).rowcount
+        total += inserted
+        if progress:
+            progress(month_key(month), inserted)
+        month = end
+
+    db.session.commit()
+    return total
+
+
+def monthly_spending(user_id, months=MONTHS, account_id=None, now=None):
+    """
+    A user's last `months` months (oldest first), read from the rollup only:
+    [{month, money_in, money_out, net, count, types: {type: {money_in, money_out, count}}}]
+    """
+    start = month_start(now or datetime.utcnow())
+    for _ in range(months - 1):
+        start = previous_month(start)
+
+    summary = {}
+    month = start
+    for _ in range(months):
+        summary[month_key(month)] = {'month': month_key(month), 'money_in': 0.0, 'money_out': 0.0,
+                                     'net': 0.0, 'count': 0, 'types': {}}
+        month = next_month(month)
+
+    query = db.session.query(
+        SpendingRollup.month, SpendingRollup.transaction_type, func.sum(SpendingRollup.money_in),
+        func.sum(SpendingRollup.money_out), func.sum(SpendingRollup.count)
+    ).filter(
+        SpendingRollup.user_id == user_id,
+        SpendingRollup.month >= month_key(start)
+    )
+    if account_id is not None:
+        query = query.filter(SpendingRollup.account_id == account_id)
+    for month, transaction_type, money_in, money_out, count in query.group_by(
+            SpendingRollup.month, SpendingRollup.transaction_type):
+        entry = summary.get(month)
+        if entry is None:
+            continue  # postings dated in the future
+        entry['types'][transaction_type] = {'money_in': round(money_in, 2), 'money_out': round(money_out, 2),
+                                            'count': count}
+        entry['money_in'] += money_in
+        entry['money_out'] += money_out
+        entry['count'] += count
+
+    for entry in summary.values():
+        entry['money_in'] = round(entry['money_in'], 2)
+        entry['money_out'] = round(entry['money_out'], 2)
+        entry['net'] = round(entry['money_in'] - entry['money_out'], 2)
+    return list(summary.values())
@@ -0,0 +1,230 @@
+# app/services/statements.py
+# ==========================
+# Month-end statements
+#
+# A run for a period (YYYY-MM) splits the active accounts into batches of
+# contiguous account ids, recorded in statement_batches. Batches are
+# processed by a pool of worker processes, each with its own app and
+# database connection. A worker streams the period's transactions for its
+# batch in (account, time) order and writes one CSV file per account with a
+# running balance. The batch is marked done only after all its files are
+# written, so re-running the period after a crash skips finished batches.
+#
+# Opening balances are derived backwards from the current balance, so
+# statements are correct even for accounts whose history predates the
+# transactions table. Periods that were archived are read from their
+# archive tables (see app/services/archive.py).
+
+import csv
+import os
+import time
+from concurrent.futures import as_completed
+from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
+
+from sqlalchemy import case, func, select
+
+from app import db
+from app.models.account import Account
+from app.models.statement import StatementBatch, StatementRun
+from app.models.transaction import Transaction
+from app.services.archive import transaction_source
+from app.services.workers import submit, worker_pool
+
+BATCH_SIZE = 500
+STREAM_CHUNK = 2000  # rows fetched at a time while streaming transactions
+
+
+def period_bounds(period):
+    """'2026-03' -> (datetime(2026, 3, 1), datetime(2026, 4, 1))"""
+    start = datetime.strptime(period, '%Y-%m')
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+def ensure_transaction_indexes():
+    """Create the transaction indexes on databases created before they existed"""
+    connection = db.session.connection()
+    for index in Transaction.__table__.indexes:
+        index.create(connection, checkfirst=True)
+
+
+def get_or_create_run(period, output_dir, batch_size=BATCH_SIZE):
+    """The run for a period, creating it and its batches on first use"""
+    run = StatementRun.query.filter_by(period=period).first()
+    if run is not None:
+        return run
+
+    run = StatementRun(period, os.path.abspath(output_dir))
+    db.session.add(run)
+    db.session.flush()
+
+    account_ids = [account_id for (account_id,) in db.session.query(Account.id).filter(
+        Account.status == 'active').order_by(Account.id)]
+    batches = [{
+        'run_id': run.id,
+        'first_account_id': account_ids[i],
+        'last_account_id': account_ids[min(i + batch_size, len(account_ids)) - 1],
+        'status': 'pending',
+        'accounts': 0,
+        'transactions': 0,
+    } for i in range(0, len(account_ids), batch_size)]
+    if batches:
+        db.session.execute(StatementBatch.__table__.insert(), batches)
+    db.session.commit()
+    return run
+
+
+def balance_sums(first_id, last_id, start, end):
+    """{account_id: (change during the period, change after it)}"""
+    source = transaction_source(start)
+    change = source.balance_change
+    rows = db.session.query(
+        source.account_id,
+        func.sum(case((source.timestamp < end, change), else_=0)),
+        func.sum(case((source.timestamp >= end, change), else_=0)),
+    ).filter(
+        source.account_id.between(first_id, last_id),
+        source.timestamp >= start
+    ).group_by(source.account_id)
+    return {account_id: (during or 0.0, after or 0.0) for account_id, during, after in rows}
+
+
+def write_statement(path, account, period, opening, transactions):
+    """Write one account's statement; returns (transactions written, closing balance)"""
+    balance = opening
+    count = 0
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['account', account.account_number, account.account_type, period])
+        writer.writerow(['date', 'reference', 'type', 'description', 'amount', 'balance'])
+        writer.writerow(['', '', 'opening balance', '', '', f'{opening:.2f}'])
+        for t in transactions:
+            balance += t.balance_change
+            count += 1
+            writer.writerow([t.timestamp.strftime('%Y-%m-%d %H:%M:%S'), t.reference_number,
+                             t.transaction_type, t.description or '', f'{t.balance_change:.2f}',
+                             f'{balance:.2f}'])
+        writer.writerow(['', '', 'closing balance', '', '', f'{balance:.2f}'])
+    # A crash never leaves a truncated statement behind
+    os.replace(temp_path, path)
+    return count, balance
+
+
+def generate_batch(batch_id):
+    """Write the statements of one batch and mark it done. Returns (accounts, transactions)."""
+    started = time.perf_counter()
+    batch = db.session.get(StatementBatch, batch_id)
+    run = batch.run
+    start, end = period_bounds(run.period)
+    directory = os.path.join(run.output_dir, run.period)
+    os.makedirs(directory, exist_ok=True)
+
+    accounts = db.session.execute(
+        select(Account.id, Account.account_number, Account.account_type, Account.balance).where(
+            Account.id.between(batch.first_account_id, batch.last_account_id),
+            Account.status == 'active'
+        ).order_by(Account.id)
+    ).all()
+    sums = balance_sums(batch.first_account_id, batch.last_account_id, start, end)
+
+    source = transaction_source(start, end)
+    stream = db.session.execute(
+        select(source.account_id, source.timestamp, source.reference_number,
+               source.transaction_type, source.description,
+               source.balance_change.label('balance_change')).where(
+            source.account_id.between(batch.first_account_id, batch.last_account_id),
+            source.timestamp >= start,
+            source.timestamp < end
+        ).order_by(source.account_id, source.timestamp, source.id)
+        .execution_options(yield_per=STREAM_CHUNK)
+    )
+    groups = groupby(stream, key=itemgetter(0))
+    group = next(groups, None)
+
+    total = 0
+    for account in accounts:
+        while group is not None and group[0] < account.id:
+            group = next(groups, None)
+        transactions = group[1] if group is not None and group[0] == account.id else ()
+
+        during, after = sums.get(account.id, (0.0, 0.0))
+        opening = round(account.balance - after - during, 2)
+        count, _ = write_statement(os.path.join(directory, f'{account.account_number}.csv'),
+                                   account, run.period, opening, transactions)
+        total += count
+
+    batch.status = 'done'
+    batch.accounts = len(accounts)
+    batch.transactions = total
+    batch.duration = time.perf_counter() - started
+    batch.completed_at = datetime.utcnow()
+    db.session.commit()
+    return len(accounts), total
+
+
+def generate_statements(period, output_dir, workers=1, batch_size=BATCH_SIZE, progress=None):
+    """
+    Generate (or resume) the statements for a period.
+
+    workers > 1 runs batches in that many processes; the database must then
+    be reachable from other processes (not in-memory SQLite). progress is
+    called with (batches done, batches total) as batches finish.
+    Returns a summary dict with throughput.
+    """
+    ensure_transaction_indexes()
+    run = get_or_create_run(period, output_dir, batch_size)
+    pending = [b.id for b in run.batches if b.status != 'done']
+    total_batches = len(run.batches)
+    done = total_batches - len(pending)
+    # Release the connection so workers can write to SQLite
+    db.session.commit()
+
+    accounts = transactions = 0
+    started = time.perf_counter()
+    if workers > 1 and pending:
+        with worker_pool(workers) as pool:
+            for future in as_completed([submit(pool, generate_batch, batch_id) for batch_id in pending]):
+                batch_accounts, batch_transactions = future.result()
+                accounts += batch_accounts
+                transactions += batch_transactions
+                done += 1
+                if progress:
+                    progress(done, total_batches)
+    else:
+        for batch_id in pending:
+            batch_accounts, batch_transactions = generate_batch(batch_id)
+            accounts += batch_accounts
+            transactions += batch_transactions
+            done += 1
+            if progress:
+                progress(done, total_batches)
+    elapsed = time.perf_counter() - started
+
+    run = StatementRun.query.filter_by(period=period).one()
+    if run.completed_at is None:
+        run.completed_at = datetime.utcnow()
+        db.session.commit()
+
+    return {
+        'period': period,
+        'output_dir': os.path.join(run.output_dir, period),
+        'workers': workers,
+        'batches': len(pending),
+        'skipped_batches': total_batches - len(pending),
+        'accounts': accounts,
+        'transactions': transactions,
+        'seconds': elapsed,
+        'accounts_per_second': accounts / elapsed if elapsed else 0.0,
+        'transactions_per_second': transactions / elapsed if elapsed else 0.0,
+    }
+
+
+def delete_run(period):
+    """Forget a period's run so the next generation starts over"""
+    run = StatementRun.query.filter_by(period=period).first()
+    if run is not None:
+        db.session.delete(run)
+        db.session.commit()
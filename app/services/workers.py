@@ -0,0 +1,51 @@
+# app/services/workers.py
+# =======================
+# Process pools for batch jobs (statements, reconciliation)
+#
+# Worker processes are spawned, not forked, and each builds its own app and
+# database connection on the parent's database with the request-time
+# features (metrics, slow-query log, velocity warmup) switched off. Work is
+# submitted as a module-level function that runs inside the worker's app
+# context.
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from app import db
+
+_worker_app = None
+
+
+def _init_worker(database_uri):
+    global _worker_app
+    from app import create_app
+    config = {
+        'SQLALCHEMY_DATABASE_URI': database_uri,
+        'METRICS_ENABLED': False,
+        'SLOW_QUERY_THRESHOLD_MS': None,
+        'TEMPLATE_CACHE_DIR': None,
+        'VELOCITY_ENABLED': False,
+    }
+    if database_uri.startswith('sqlite'):
+        # Another worker's read can hold the lock while a batch commits
+        config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'timeout': 60}}
+    _worker_app = create_app(config)
+
+
+def _call_in_app(func, args):
+    with _worker_app.app_context():
+        return func(*args)
+
+
+def worker_pool(workers):
+    """A ProcessPoolExecutor of `workers` processes on the current app's database"""
+    if db.engine.url.database in (None, '', ':memory:'):
+        raise ValueError('An in-memory database cannot be shared with worker processes')
+    database_uri = db.engine.url.render_as_string(hide_password=False)
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=_init_worker, initargs=(database_uri,))
+
+
+def submit(pool, func, *args):
+    """Run func(*args) in a worker's app context; returns a Future"""
+    return pool.submit(_call_in_app, func, args)
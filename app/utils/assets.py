@@ -0,0 +1,169 @@
+# app/utils/assets.py
+# ===================
+# Self-hosted static assets with content-hashed filenames
+#
+# Every file under app/static gets a fingerprinted name at startup
+# (css/site.css -> css/site.3f2a9c1b07.css). Templates link to it with
+# asset_url('css/site.css'); the fingerprinted URL never changes while the
+# file content stays the same, so it is served with a one-year immutable
+# cache header. Compressed variants are built once and kept in memory.
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from flask import Blueprint, Response, abort, current_app, request, send_from_directory
+
+from app.utils.compression import brotli, choose_encoding, is_compressible
+
+ONE_YEAR = 365 * 24 * 3600
+
+assets_bp = Blueprint('assets', __name__, url_prefix='/assets')
+
+
+class AssetManifest:
+    """Maps logical static paths to content-hashed filenames and back"""
+
+    def __init__(self, static_folder):
+        self.static_folder = static_folder
+        self.hashed = {}      # 'vendor/bootstrap/bootstrap.min.css' -> 'vendor/bootstrap/bootstrap.min.<hash>.css'
+        self.original = {}    # reverse mapping
+        self._encoded = {}    # (hashed name, encoding) -> bytes
+        self.build()
+
+    @staticmethod
+    def fingerprint(path):
+        digest = hashlib.md5()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                digest.update(chunk)
+        return digest.hexdigest()[:10]
+
+    def build(self):
+        self.hashed.clear()
+        self.original.clear()
+        self._encoded.clear()
+        if not self.static_folder or not os.path.isdir(self.static_folder):
+            return
+
+        for root, _, files in os.walk(self.static_folder):
+            for filename in files:
+                full_path = os.path.join(root, filename)
+                name = os.path.relpath(full_path, self.static_folder).replace(os.sep, '/')
+                stem, ext = os.path.splitext(name)
+                hashed_name = f'{stem}.{self.fingerprint(full_path)}{ext}'
+                self.hashed[name] = hashed_name
+                self.original[hashed_name] = name
+
+    def url_name(self, name):
+        return self.hashed.get(name, name)
+
+    def encoded(self, hashed_name, encoding):
+        """Return the (possibly compressed) file body, computed once"""
+        key = (hashed_name, encoding)
+        if key not in self._encoded:
+            with open(os.path.join(self.static_folder, self.original[hashed_name]), 'rb') as f:
+                data = f.read()
+            if encoding == 'br':
+                data = brotli.compress(data, quality=11)
+            elif encoding == 'gzip':
+                data = gzip.compress(data, compresslevel=9, mtime=0)
+            self._encoded[key] = data
+        return self._encoded[key]
+
+
+@assets_bp.route('/<path:filename>')
+def serve(filename):
+    """Serve a static asset; fingerprinted names are cached for a year"""
+    manifest = current_app.extensions['asset_manifest']
+
+    if filename not in manifest.original:
+        # Files referenced relatively from CSS (e.g. fonts) keep their real name
+        if filename not in manifest.hashed:
+            abort(404)
+        response = send_from_directory(manifest.static_folder, filename)
+        response.cache_control.public = True
+        response.cache_control.max_age = 3600
+        return response
+
+    mimetype = mimetypes.guess_type(manifest.original[filename])[0] or 'application/octet-stream'
+    encoding = None
+    if is_compressible(mimetype):
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+
+    response = Response(manifest.encoded(filename, encoding), mimetype=mimetype)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = f'public, max-age={ONE_YEAR}, immutable'
+    response.set_etag(f'{filename}-{encoding or "identity"}')
+    return response.make_conditional(request)
+
+
+def init_assets(app):
+    """Build the asset manifest and expose asset_url() to templates"""
+    manifest = AssetManifest(app.static_folder)
+    app.extensions['asset_manifest'] = manifest
+    app.register_blueprint(assets_bp)
+
+    def asset_url(name):
+        return f"{assets_bp.url_prefix}/{manifest.url_name(name)}"
+
+    app.jinja_env.globals['asset_url'] = asset_url
+    return manifest
+
+
+# ---------- icon subset ----------
+
+SYMBOL_RE = re.compile(r'<symbol[^>]*\bid="([^"]+)"[^>]*>(.*?)</symbol>', re.S)
+ICON_CLASS_RE = re.compile(r'\bbi-([a-z0-9-]+)')
+DYNAMIC_ICON_RE = re.compile(r"bi-\{\{(.*?)\}\}", re.S)
+# Icon names chosen in the expression: {{ 'a' if cond else 'b' }}
+QUOTED_RE = re.compile(r"'([a-z0-9-]+)'\s+if\b|\belse\s+'([a-z0-9-]+)'")
+
+ICON_BASE_CSS = (
+    '/* Generated by `flask assets build-icons` from bootstrap-icons (MIT). Do not edit. */\n'
+    '.bi::before{content:"";display:inline-block;width:1em;height:1em;'
+    'vertical-align:-.125em;background-color:currentColor;'
+    '-webkit-mask:var(--bi) no-repeat center/contain;mask:var(--bi) no-repeat center/contain}\n'
+)
+
+
+def find_used_icons(template_folder):
+    """Collect every bi-* icon name referenced by the templates"""
+    names = set()
+    for root, _, files in os.walk(template_folder):
+        for filename in files:
+            with open(os.path.join(root, filename), encoding='utf-8') as f:
+                text = f.read()
+            names.update(ICON_CLASS_RE.findall(text))
+            for expression in DYNAMIC_ICON_RE.findall(text):
+                for groups in QUOTED_RE.findall(expression):
+                    names.update(name for name in groups if name)
+    return names
+
+
+def build_icon_css(sprite_text, names):
+    """
+    Build a stylesheet for the given icons from the bootstrap-icons SVG sprite.
+
+    Each icon becomes a CSS mask, so it is drawn in the current text colour
+    just like the icon font, without shipping the full font.
+    Returns (css, missing names).
+    """
+    symbols = dict(SYMBOL_RE.findall(sprite_text))
+    rules, missing = [ICON_BASE_CSS], []
+
+    for name in sorted(names):
+        body = symbols.get(name)
+        if body is None:
+            missing.append(name)
+            continue
+        svg = f"<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 16 16'>{body.replace(chr(34), chr(39))}</svg>"
+        data_uri = 'data:image/svg+xml,' + quote(svg, safe=" /=:',.-")
+        rules.append(f'.bi-{name}::before{{--bi:url("{data_uri}")}}\n')
+
+    return ''.join(rules), missing
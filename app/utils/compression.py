@@ -0,0 +1,91 @@
+# app/utils/compression.py
+# ========================
+# Response compression (brotli when available, otherwise gzip)
+
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+
+
+def is_compressible(mimetype):
+    return bool(mimetype) and mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+def choose_encoding(accept_encoding):
+    """Pick the best encoding the client accepts: br, then gzip, else None"""
+    accepted = {}
+    for part in accept_encoding.lower().split(','):
+        token, _, params = part.strip().partition(';')
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if token:
+            accepted[token] = q
+
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding, level=None):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level if level is not None else 5)
+    return gzip.compress(data, compresslevel=level if level is not None else 6, mtime=0)
+
+
+def init_compression(app):
+    """
+    Compress dynamic responses larger than COMPRESS_MIN_SIZE bytes.
+
+    Streamed and file responses are left alone; static assets are
+    pre-compressed by the assets blueprint instead.
+    """
+    app.config.setdefault('COMPRESS_ENABLED', True)
+    app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+
+    @app.after_request
+    def compress_response(response):
+        if not app.config['COMPRESS_ENABLED']:
+            return response
+        if response.direct_passthrough or response.is_streamed:
+            return response
+        if 'Content-Encoding' in response.headers or not is_compressible(response.mimetype):
+            return response
+        if response.status_code < 200 or response.status_code in (204, 304):
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        from flask import request
+        encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < app.config['COMPRESS_MIN_SIZE']:
+            return response
+
+        response.set_data(compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    return app
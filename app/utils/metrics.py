@@ -0,0 +1,164 @@
+# app/utils/metrics.py
+# ====================
+# Request and SQL metrics, exported in Prometheus text format
+#
+# Flask request hooks time every request; SQLAlchemy engine events count
+# the statements each request runs. Everything is kept in memory per
+# process and rendered on demand by /admin/metrics.
+
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Fixed-bucket histogram; counts are stored per bucket and summed on export"""
+
+    __slots__ = ('bounds', 'counts', 'total', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self):
+        running = 0
+        for bound, count in zip(self.bounds + ('+Inf',), self.counts):
+            running += count
+            yield bound, running
+
+
+class RequestMetrics:
+    """In-memory store for per-endpoint request and SQL statistics"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.latency = {}       # endpoint -> Histogram
+        self.sql_per_request = {}  # endpoint -> Histogram
+        self.responses = {}     # (endpoint, method, status) -> count
+        self.sql_count = {}     # endpoint -> statements
+        self.sql_time = {}      # endpoint -> seconds
+
+    def record_request(self, endpoint, method, status, elapsed, sql_count, sql_time):
+        with self.lock:
+            histogram = self.latency.get(endpoint)
+            if histogram is None:
+                histogram = self.latency[endpoint] = Histogram(LATENCY_BUCKETS)
+                self.sql_per_request[endpoint] = Histogram(SQL_COUNT_BUCKETS)
+            histogram.observe(elapsed)
+            self.sql_per_request[endpoint].observe(sql_count)
+
+            key = (endpoint, method, status)
+            self.responses[key] = self.responses.get(key, 0) + 1
+            self.sql_count[endpoint] = self.sql_count.get(endpoint, 0) + sql_count
+            self.sql_time[endpoint] = self.sql_time.get(endpoint, 0.0) + sql_time
+
+    def record_statement(self, elapsed):
+        """Record a statement run outside a request (CLI, background jobs)"""
+        with self.lock:
+            self.sql_count['none'] = self.sql_count.get('none', 0) + 1
+            self.sql_time['none'] = self.sql_time.get('none', 0.0) + elapsed
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        with self.lock:
+            lines = []
+            _histogram_lines(lines, 'bank_http_request_duration_seconds',
+                             'Request latency in seconds by endpoint.', self.latency)
+            _histogram_lines(lines, 'bank_sql_statements_per_request',
+                             'SQL statements executed per request by endpoint.', self.sql_per_request)
+
+            lines.append('# HELP bank_http_requests_total Responses by endpoint, method and status code.')
+            lines.append('# TYPE bank_http_requests_total counter')
+            for (endpoint, method, status), count in sorted(self.responses.items()):
+                lines.append(f'bank_http_requests_total{{endpoint="{endpoint}",method="{method}",'
+                             f'status="{status}"}} {count}')
+
+            lines.append('# HELP bank_sql_statements_total SQL statements executed by endpoint.')
+            lines.append('# TYPE bank_sql_statements_total counter')
+            for endpoint, count in sorted(self.sql_count.items()):
+                lines.append(f'bank_sql_statements_total{{endpoint="{endpoint}"}} {count}')
+
+            lines.append('# HELP bank_sql_duration_seconds_total Time spent in SQL statements by endpoint.')
+            lines.append('# TYPE bank_sql_duration_seconds_total counter')
+            for endpoint, seconds in sorted(self.sql_time.items()):
+                lines.append(f'bank_sql_duration_seconds_total{{endpoint="{endpoint}"}} {seconds:.6f}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _histogram_lines(lines, name, help_text, histograms):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for endpoint, histogram in sorted(histograms.items()):
+        for bound, count in histogram.cumulative():
+            lines.append(f'{name}_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+        lines.append(f'{name}_sum{{endpoint="{endpoint}"}} {histogram.total:.6f}')
+        lines.append(f'{name}_count{{endpoint="{endpoint}"}} {histogram.count}')
+
+
+def init_metrics(app, db):
+    """
+    Hook metrics collection into the request lifecycle and the SQL engine.
+
+    Set METRICS_ENABLED to False to turn collection off entirely.
+    """
+    app.config.setdefault('METRICS_ENABLED', True)
+    metrics = RequestMetrics()
+    app.extensions['metrics'] = metrics
+
+    if not app.config['METRICS_ENABLED']:
+        return metrics
+
+    @app.before_request
+    def start_timer():
+        g._metrics_start = time.perf_counter()
+        g._sql_count = 0
+        g._sql_time = 0.0
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop('_metrics_start', None)
+        if start is not None:
+            metrics.record_request(
+                request.endpoint or 'unmatched',
+                request.method,
+                response.status_code,
+                time.perf_counter() - start,
+                g.get('_sql_count', 0),
+                g.get('_sql_time', 0.0),
+            )
+        return response
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_start
+        if has_request_context() and '_sql_count' in g:
+            g._sql_count += 1
+            g._sql_time += elapsed
+        else:
+            metrics.record_statement(elapsed)
+
+    return metrics
@@ -0,0 +1,182 @@
+# app/utils/slow_queries.py
+# =========================
+# Slow-query log with EXPLAIN QUERY PLAN capture
+#
+# Any statement slower than SLOW_QUERY_THRESHOLD_MS is written as one JSON
+# line to a rotating log file, together with the shape of its parameters,
+# the route/blueprint that ran it and its SQLite query plan. The admin page
+# aggregates the log by normalized statement.
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+SPACE_RE = re.compile(r'\s+')
+
+_handlers = {}  # absolute log path -> RotatingFileHandler
+_handlers_lock = threading.Lock()
+
+
+def normalize_statement(statement):
+    """Replace literals and IN-lists so equivalent queries group together"""
+    statement = STRING_RE.sub('?', statement)
+    statement = NUMBER_RE.sub('?', statement)
+    statement = IN_LIST_RE.sub('(?...)', statement)
+    return SPACE_RE.sub(' ', statement).strip()
+
+
+def parameters_shape(parameters, executemany=False):
+    """Describe bound parameters by type only; values are never logged"""
+    if executemany:
+        rows = list(parameters or [])
+        first = parameters_shape(rows[0]) if rows else []
+        return {'rows': len(rows), 'row': first}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def explain_query_plan(dbapi_connection, statement, parameters):
+    """Return SQLite's EXPLAIN QUERY PLAN rows as text lines"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters)
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception as e:
+        return [f'(plan unavailable: {e})']
+    finally:
+        cursor.close()
+
+
+def log_handler(log_path, max_bytes, backups):
+    """The rotating handler for log_path, created on first use and shared by every app"""
+    log_path = os.path.abspath(log_path)
+    with _handlers_lock:
+        handler = _handlers.get(log_path)
+        if handler is None:
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            # delay: the file is only opened once something is slow
+            handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backups,
+                                          encoding='utf-8', delay=True)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            _handlers[log_path] = handler
+        return handler
+
+
+def init_slow_query_log(app, db):
+    """
+    Attach the slow-query recorder to the app's engine.
+
+    Config:
+        SLOW_QUERY_THRESHOLD_MS  statements at or above this are logged (None disables)
+        SLOW_QUERY_LOG           log file path
+        SLOW_QUERY_LOG_MAX_BYTES size before the log rotates
+        SLOW_QUERY_LOG_BACKUPS   number of rotated files kept
+    """
+    app.config.setdefault('SLOW_QUERY_THRESHOLD_MS', 100)
+    app.config.setdefault('SLOW_QUERY_LOG', os.path.join(app.instance_path, 'slow_queries.log'))
+    app.config.setdefault('SLOW_QUERY_LOG_MAX_BYTES', 5 * 1024 * 1024)
+    app.config.setdefault('SLOW_QUERY_LOG_BACKUPS', 3)
+
+    if app.config['SLOW_QUERY_THRESHOLD_MS'] is None:
+        return
+
+    # Each app gets its own (unregistered) logger, so apps in the same
+    # process (tests, benchmarks, workers) never write into each other's
+    # log files; apps logging to the same path share one handler
+    logger = logging.Logger('bank.slow_queries', logging.INFO)
+    logger.addHandler(log_handler(app.config['SLOW_QUERY_LOG'],
+                                  app.config['SLOW_QUERY_LOG_MAX_BYTES'],
+                                  app.config['SLOW_QUERY_LOG_BACKUPS']))
+    app.extensions['slow_queries'] = logger
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_start = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - context._slow_query_start) * 1000
+        threshold = app.config['SLOW_QUERY_THRESHOLD_MS']
+        if threshold is None or elapsed_ms < threshold:
+            return
+
+        endpoint = blueprint = None
+        if has_request_context():
+            endpoint = request.endpoint
+            blueprint = request.blueprint
+
+        plan = []
+        if not executemany and statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            plan = explain_query_plan(cursor.connection, statement, parameters)
+
+        logger.info(json.dumps({
+            'timestamp': datetime.utcnow().isoformat(),
+            'duration_ms': round(elapsed_ms, 3),
+            'statement': statement,
+            'normalized': normalize_statement(statement),
+            'parameters': parameters_shape(parameters, executemany),
+            'endpoint': endpoint,
+            'blueprint': blueprint,
+            'plan': plan,
+        }))
+
+
+def read_slow_query_log(log_path, backups):
+    """Yield entries from the log and its rotated files, oldest first"""
+    paths = [f'{log_path}.{i}' for i in range(backups, 0, -1)] + [log_path]
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def top_offenders(entries, limit=20):
+    """Aggregate log entries by normalized statement, worst total time first"""
+    groups = {}
+    for entry in entries:
+        group = groups.get(entry['normalized'])
+        if group is None:
+            group = groups[entry['normalized']] = {
+                'normalized': entry['normalized'],
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'endpoints': set(),
+            }
+        group['count'] += 1
+        group['total_ms'] += entry['duration_ms']
+        if entry['duration_ms'] >= group['max_ms']:
+            group['max_ms'] = entry['duration_ms']
+            group['plan'] = entry.get('plan', [])
+            group['parameters'] = entry.get('parameters')
+        group['last_seen'] = entry['timestamp']
+        if entry.get('endpoint'):
+            group['endpoints'].add(entry['endpoint'])
+
+    ranked = sorted(groups.values(), key=lambda g: g['total_ms'], reverse=True)[:limit]
+    for group in ranked:
+        group['avg_ms'] = group['total_ms'] / group['count']
+        group['endpoints'] = sorted(group['endpoints'])
+    return ranked
@@ -0,0 +1,44 @@
+# app/utils/templates.py
+# ======================
+# Jinja bytecode cache and template precompilation
+
+import os
+from jinja2 import FileSystemBytecodeCache
+
+
+def init_template_cache(app):
+    """
+    Attach a persistent bytecode cache to the app's Jinja environment.
+
+    Compiled templates are written to TEMPLATE_CACHE_DIR, so a new worker
+    loads bytecode from disk instead of re-parsing every template.
+    Set TEMPLATE_CACHE_DIR to None to disable.
+    """
+    cache_dir = app.config.get('TEMPLATE_CACHE_DIR')
+    if not cache_dir:
+        return None
+
+    os.makedirs(cache_dir, exist_ok=True)
+    bytecode_cache = FileSystemBytecodeCache(cache_dir, pattern='bank_%s.cache')
+    app.jinja_env.bytecode_cache = bytecode_cache
+    return bytecode_cache
+
+
+def precompile_templates(app):
+    """
+    Compile every template the app can load.
+
+    Fills the bytecode cache on disk (if enabled) and the environment's
+    in-memory template cache. Returns the list of compiled template names.
+    """
+    env = app.jinja_env
+    names = [name for name in env.list_templates() if name.endswith('.html')]
+
+    # Make sure all templates fit in the in-memory cache
+    if env.cache is not None and env.cache.capacity < len(names):
+        env.cache.capacity = len(names)
+
+    for name in names:
+        env.get_template(name)
+
+    return names
@@ -0,0 +1,280 @@
+# app/utils/velocity.py
+# =====================
+# Online velocity checks for outgoing postings (withdrawals and transfers)
+#
+# Every account has a sliding-window counter (count and sum) per window,
+# stored as a ring of fixed-width buckets, so checking or recording a
+# posting touches a bounded number of buckets (O(1)) and each account uses
+# a fixed amount of memory. At most VELOCITY_MAX_ACCOUNTS accounts are
+# tracked; the least recently active are dropped first.
+#
+# Routes reserve a posting: the check and the count happen under one lock,
+# so concurrent requests on an account cannot all pass a block rule. A
+# posting that then fails (daily limit, database error) releases its
+# reservation.
+#
+# Counters live in the process and are warmed from the last 24 hours of
+# transactions when the app starts. With several worker processes each one
+# enforces the limits on the postings it has seen.
+
+import logging
+import threading
+import time
+from array import array
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+
+logger = logging.getLogger('app.velocity')
+
+# name -> (span in seconds, buckets); a window covers between
+# (buckets - 1) and buckets bucket-widths of history
+WINDOWS = {
+    '1m': (60, 12),
+    '1h': (3600, 12),
+    '24h': (86400, 24),
+}
+WINDOW_LABELS = {'1m': 'minute', '1h': 'hour', '24h': '24 hours'}
+
+# action 'block' rejects the posting, 'flag' lets it through marked for review
+DEFAULT_RULES = (
+    {'name': 'burst', 'window': '1m', 'max_count': 5, 'action': 'block'},
+    {'name': 'hourly_count', 'window': '1h', 'max_count': 30, 'action': 'flag'},
+    {'name': 'hourly_amount', 'window': '1h', 'max_amount': 5_000, 'action': 'flag'},
+    {'name': 'daily_amount', 'window': '24h', 'max_amount': 20_000, 'action': 'block'},
+)
+
+Rule = namedtuple('Rule', 'name window max_count max_amount action')
+
+
+class Decision(namedtuple('Decision', 'action rule message reserved_at', defaults=(None,))):
+    """
+    Outcome of a velocity check: action is 'allow', 'flag' or 'block'.
+    reserved_at is the time the posting was counted by reserve(), if it was.
+    """
+
+    @property
+    def blocked(self):
+        return self.action == 'block'
+
+    @property
+    def flagged(self):
+        return self.action == 'flag'
+
+
+ALLOW = Decision('allow', None, None)
+
+
+class SlidingWindow:
+    """Count and sum of the postings in the last `span` seconds, in `buckets` buckets"""
+
+    __slots__ = ('width', 'counts', 'sums', 'head', 'count', 'total')
+
+    def __init__(self, span, buckets):
+        self.width = span / buckets
+        self.counts = array('q', [0]) * buckets
+        self.sums = array('d', [0.0]) * buckets
+        self.head = None  # bucket number of the newest bucket
+        self.count = 0
+        self.total = 0.0
+
+    def advance(self, now):
+        """Expire the buckets that fell out of the window; returns now's bucket number"""
+        epoch = int(now // self.width)
+        if self.head is None:
+            self.head = epoch
+        elif epoch > self.head:
+            size = len(self.counts)
+            if epoch - self.head >= size:
+                self.counts = array('q', [0]) * size
+                self.sums = array('d', [0.0]) * size
+                self.count = 0
+                self.total = 0.0
+            else:
+                for bucket in range(self.head + 1, epoch + 1):
+                    i = bucket % size
+                    self.count -= self.counts[i]
+                    self.total -= self.sums[i]
+                    self.counts[i] = 0
+                    self.sums[i] = 0.0
+            self.head = epoch
+        return epoch
+
+    def add(self, now, amount):
+        epoch = self.advance(now)
+        if epoch <= self.head - len(self.counts):
+            return  # older than the window
+        i = epoch % len(self.counts)
+        self.counts[i] += 1
+        self.sums[i] += amount
+        self.count += 1
+        self.total += amount
+
+    def totals(self, now):
+        self.advance(now)
+        return self.count, self.total
+
+    def remove(self, when, amount):
+        """Take back a posting added at `when`, unless its bucket has expired"""
+        epoch = int(when // self.width)
+        if self.head is None or epoch <= self.head - len(self.counts) or epoch > self.head:
+            return
+        i = epoch % len(self.counts)
+        if self.counts[i]:
+            self.counts[i] -= 1
+            self.sums[i] -= amount
+            self.count -= 1
+            self.total -= amount
+
+
+class VelocityEngine:
+    """Per-account sliding-window counters and the rules evaluated against them"""
+
+    def __init__(self, rules=DEFAULT_RULES, windows=WINDOWS, max_accounts=50_000, enabled=True):
+        self.windows = dict(windows)
+        self.rules = []
+        for rule in rules:
+            if rule['window'] not in self.windows:
+                raise ValueError(f"Unknown velocity window {rule['window']!r} in rule {rule['name']!r}")
+            if rule.get('action', 'block') not in ('block', 'flag'):
+                raise ValueError(f"Velocity rule {rule['name']!r} action must be 'block' or 'flag'")
+            self.rules.append(Rule(rule['name'], rule['window'], rule.get('max_count'),
+                                   rule.get('max_amount'), rule.get('action', 'block')))
+        self.max_accounts = max_accounts
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.accounts = OrderedDict()  # account_id -> {window name: SlidingWindow}
+
+    def _counters(self, account_id):
+        counters = self.accounts.get(account_id)
+        if counters is None:
+            counters = self.accounts[account_id] = {
+                name: SlidingWindow(span, buckets) for name, (span, buckets) in self.windows.items()}
+            if len(self.accounts) > self.max_accounts:
+                self.accounts.popitem(last=False)
+        else:
+            self.accounts.move_to_end(account_id)
+        return counters
+
+    def _evaluate(self, account_id, amount, now):
+        """check() with the lock held"""
+        decision = ALLOW
+        counters = self.accounts.get(account_id)
+        for rule in self.rules:
+            count, total = counters[rule.window].totals(now) if counters else (0, 0.0)
+            if rule.max_count is not None and count + 1 > rule.max_count:
+                limit = f'{rule.max_count} withdrawals and transfers'
+            elif rule.max_amount is not None and total + amount > rule.max_amount:
+                limit = f'${rule.max_amount:,.2f} in withdrawals and transfers'
+            else:
+                continue
+            message = f'This exceeds the limit of {limit} per {WINDOW_LABELS.get(rule.window, rule.window)}.'
+            if rule.action == 'block':
+                return Decision('block', rule.name, message)
+            if decision is ALLOW:
+                decision = Decision('flag', rule.name, message)
+        return decision
+
+    def check(self, account_id, amount, now=None):
+        """Would posting `amount` now break a rule? Block wins over flag."""
+        if not self.enabled:
+            return ALLOW
+        now = time.time() if now is None else now
+
+        with self.lock:
+            decision = self._evaluate(account_id, amount, now)
+
+        if decision.flagged:
+            logger.warning('Posting flagged: account=%s amount=%.2f rule=%s', account_id, amount, decision.rule)
+        return decision
+
+    def reserve(self, account_id, amount, now=None):
+        """check() and, unless blocked, count the posting under the same lock"""
+        if not self.enabled:
+            return ALLOW
+        now = time.time() if now is None else now
+
+        with self.lock:
+            decision = self._evaluate(account_id, amount, now)
+            if not decision.blocked:
+                for window in self._counters(account_id).values():
+                    window.add(now, amount)
+                decision = decision._replace(reserved_at=now)
+
+        if decision.flagged:
+            logger.warning('Posting flagged: account=%s amount=%.2f rule=%s', account_id, amount, decision.rule)
+        return decision
+
+    def release(self, account_id, amount, when):
+        """Undo a reservation whose posting was not committed"""
+        with self.lock:
+            counters = self.accounts.get(account_id)
+            for window in (counters or {}).values():
+                window.remove(when, amount)
+
+    def record(self, account_id, amount, now=None):
+        """Count a posting that was committed"""
+        if not self.enabled:
+            return
+        now = time.time() if now is None else now
+        with self.lock:
+            for name, window in self._counters(account_id).items():
+                window.add(now, amount)
+
+    def warm(self, postings):
+        """Load (account_id, amount, unix time) postings, oldest first"""
+        for account_id, amount, when in postings:
+            self.record(account_id, amount, when)
+
+
+def recent_postings(since):
+    """Outgoing postings since `since` as (account_id, amount, unix time), oldest first"""
+    from app import db
+    from app.models.transaction import Transaction
+
+    rows = db.session.query(Transaction.account_id, Transaction.amount, Transaction.timestamp).filter(
+        Transaction.timestamp >= since,
+        (Transaction.transaction_type == 'withdrawal') |
+        ((Transaction.transaction_type == 'transfer') & (Transaction.amount < 0))
+    ).order_by(Transaction.timestamp)
+    for account_id, amount, timestamp in rows:
+        # Timestamps are stored as naive UTC
+        yield account_id, abs(amount), timestamp.replace(tzinfo=timezone.utc).timestamp()
+
+
+def init_velocity(app):
+    """
+    Create the velocity engine and warm it from recent transactions.
+
+    Config:
+        VELOCITY_ENABLED       set to False to skip all checks
+        VELOCITY_RULES         list of {name, window, max_count and/or max_amount, action}
+        VELOCITY_MAX_ACCOUNTS  accounts tracked in memory
+    """
+    app.config.setdefault('VELOCITY_ENABLED', True)
+    app.config.setdefault('VELOCITY_RULES', DEFAULT_RULES)
+    app.config.setdefault('VELOCITY_MAX_ACCOUNTS', 50_000)
+
+    engine = VelocityEngine(app.config['VELOCITY_RULES'],
+                            max_accounts=app.config['VELOCITY_MAX_ACCOUNTS'],
+                            enabled=app.config['VELOCITY_ENABLED'])
+    app.extensions['velocity'] = engine
+
+    if engine.enabled:
+        longest = max(span for span, _ in engine.windows.values())
+        with app.app_context():
+            engine.warm(recent_postings(datetime.utcnow() - timedelta(seconds=longest)))
+    return engine
+
+
+def reserve_posting(account_id, amount):
+    return current_app.extensions['velocity'].reserve(account_id, amount)
+
+
+def release_posting(account_id, amount, decision):
+    if decision.reserved_at is not None:
+        current_app.extensions['velocity'].release(account_id, amount, decision.reserved_at)
@@ -0,0 +1,145 @@
+"""
+Transaction archival benchmark
+------------------------------
+Seeds --transactions transactions spread evenly over the last --months
+months into a throwaway database, then times, before and after archiving
+everything older than a year:
+
+  * a month of one account's history (the hot path)
+  * a full-history search over one account (reaches every archive)
+  * an admin-style scan counting the last 30 days of transactions
+
+Usage:
+    python benchmarks/archive.py [--transactions 2000000] [--accounts 20000] [--months 24]
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+CHUNK = 200_000
+
+
+def seed(db, transactions, accounts, months):
+    from sqlalchemy import bindparam
+    from app.models.account import Account
+    from app.models.transaction import Transaction
+    from app.models.user import User
+    from app.services.interest import db_value, execute_many
+
+    user = User(username='bench', email='bench@example.com', role='customer')
+    user.password_hash = 'x'
+    db.session.add(user)
+    db.session.commit()
+    now = datetime.utcnow()
+    db.session.execute(Account.__table__.insert(), [{
+        'user_id': user.id, 'account_number': f'{i:012d}', 'account_type': 'checking',
+        'balance': 0.0, 'status': 'active', 'created_at': now, 'updated_at': now,
+    } for i in range(accounts)])
+
+    random.seed(1)
+    table = Transaction.__table__
+    insert = table.insert().values({name: bindparam(name) for name in (
+        'account_id', 'transaction_type', 'amount', 'description', 'reference_number', 'status', 'timestamp')})
+    span = months * 30 * 86400
+    start = now - timedelta(seconds=span)
+    for first in range(0, transactions, CHUNK):
+        count = min(CHUNK, transactions - first)
+        # Inserted in time order, like real postings
+        times = [start + timedelta(seconds=(first + i) * span / transactions) for i in range(count)]
+        execute_many(insert, count,
+                     account_id=[random.randint(1, accounts) for _ in range(count)],
+                     transaction_type='deposit', amount=[round(random.uniform(1, 500), 2) for _ in range(count)],
+                     description=[f'Payment {first + i}' for i in range(count)],
+                     reference_number=[f'B{first + i:011d}' for i in range(count)], status='completed',
+                     timestamp=[db_value(table.c.timestamp, t) for t in times])
+    db.session.commit()
+
+
+def timed(func, repeat=20):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def workloads(db):
+    from sqlalchemy import func
+    from app.models.transaction import Transaction
+    from app.services.archive import transaction_source
+
+    now = datetime.utcnow()
+
+    def month_history():
+        start = now - timedelta(days=30)
+        source = transaction_source(start, now)
+        db.session.query(source).filter(source.account_id == 7, source.timestamp >= start)\
+            .order_by(source.timestamp.desc()).all()
+
+    def full_search():
+        source = transaction_source()
+        db.session.query(source).filter(source.account_id == 7, source.description.contains('Payment 1'))\
+            .order_by(source.timestamp.desc()).all()
+
+    def recent_scan():
+        db.session.query(func.count(Transaction.id)).filter(
+            Transaction.timestamp >= now - timedelta(days=30)).scalar()
+
+    return {'month of history': month_history, 'full-history search': full_search,
+            'last 30 days count': recent_scan}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=2_000_000)
+    parser.add_argument('--accounts', type=int, default=20_000)
+    parser.add_argument('--months', type=int, default=24)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bank_bench_')
+    try:
+        from app import create_app, db
+        from app.models.transaction import Transaction
+        from app.services.archive import archive_transactions
+
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            'SLOW_QUERY_THRESHOLD_MS': None,
+            'METRICS_ENABLED': False,
+            'VELOCITY_ENABLED': False,
+        })
+        with app.app_context():
+            start = time.perf_counter()
+            seed(db, args.transactions, args.accounts, args.months)
+            print(f'Seeded {args.transactions:,} transactions over {args.months} months '
+                  f'in {time.perf_counter() - start:.1f}s')
+
+            before = {name: timed(func) for name, func in workloads(db).items()}
+
+            start = time.perf_counter()
+            results = archive_transactions(retention_days=365)
+            elapsed = time.perf_counter() - start
+            moved = sum(rows for _, rows in results)
+            print(f'Archived {moved:,} transactions from {len(results)} months in {elapsed:.1f}s '
+                  f'({moved / elapsed:,.0f}/s); {Transaction.query.count():,} left hot\n')
+
+            after = {name: timed(func) for name, func in workloads(db).items()}
+            print(f"{'query':<22} {'before ms':>10} {'after ms':>10}")
+            for name in before:
+                print(f'{name:<22} {before[name]:10.2f} {after[name]:10.2f}')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Transaction export benchmark
+----------------------------
+Seeds --transactions transactions into a throwaway database and exports
+them all to CSV and Parquet with app/services/export.py, writing to a
+file. For each format it reports rows/sec, the output size and the peak
+Python heap (tracemalloc) while exporting, next to a naive export that
+loads the whole result before encoding it. The streaming peak should stay
+flat as --transactions grows; the naive one grows with it.
+
+Usage:
+    python benchmarks/export.py [--transactions 1000000] [--chunk-size 10000]
+"""
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from archive import seed  # noqa: E402
+
+
+def measure(func):
+    """(seconds, peak traced bytes) of func(); tracing slows it down, so it is timed on its own"""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        func()
+        return elapsed, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=1_000_000)
+    parser.add_argument('--accounts', type=int, default=10_000)
+    parser.add_argument('--chunk-size', type=int, default=10_000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bank_bench_')
+    try:
+        from app import create_app, db
+        from app.services import export
+
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            'SLOW_QUERY_THRESHOLD_MS': None,
+            'METRICS_ENABLED': False,
+            'VELOCITY_ENABLED': False,
+        })
+        with app.app_context():
+            start = time.perf_counter()
+            seed(db, args.transactions, args.accounts, months=12)
+            print(f'Seeded {args.transactions:,} transactions in {time.perf_counter() - start:.1f}s\n')
+            filters = export.ExportFilters()
+            output = os.path.join(workdir, 'export')
+
+            def streaming(fmt):
+                def run():
+                    with open(output, 'wb') as f:
+                        for data in export.export_chunks(filters, fmt, args.chunk_size):
+                            f.write(data)
+                return run
+
+            def naive_csv():
+                rows = db.session.execute(export.export_statement(filters)).all()
+                with open(output, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(export.COLUMNS)
+                    writer.writerows(rows)
+
+            runs = [('csv', 'streaming', streaming('csv')), ('csv', 'naive (fetch all)', naive_csv)]
+            if export.pyarrow is not None:
+                runs.append(('parquet', 'streaming', streaming('parquet')))
+            else:
+                print('pyarrow is not installed; skipping Parquet\n')
+
+            print(f"{'format':<8} {'mode':<18} {'rows/s':>10} {'size MB':>8} {'peak heap MB':>13}")
+            for fmt, mode, func in runs:
+                db.session.remove()
+                elapsed, peak = measure(func)
+                print(f'{fmt:<8} {mode:<18} {args.transactions / elapsed:10,.0f} '
+                      f'{os.path.getsize(output) / 1e6:8.1f} {peak / 1e6:13.1f}')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
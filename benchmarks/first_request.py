@@ -0,0 +1,140 @@
+"""
+First-request latency benchmark
+-------------------------------
+Measures how long the first GET of each page takes in a freshly created app
+(cold Jinja environment) under three setups:
+
+  nocache  - no bytecode cache, templates compiled on first hit
+  diskcache - bytecode cache already filled on disk (after `flask templates precompile`)
+  warmup   - bytecode cache plus TEMPLATE_WARMUP at boot
+
+Usage:
+    python benchmarks/first_request.py [--repeat 5]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+ROUTES = [
+    '/',
+    '/accounts/',
+    '/accounts/create',
+    '/accounts/{account_id}',
+    '/transactions/deposit',
+    '/transactions/withdraw',
+    '/transactions/transfer',
+    '/transactions/history',
+    '/transactions/search',
+    '/auth/profile',
+    '/admin/',
+    '/admin/users',
+    '/admin/transactions',
+]
+
+
+def seed(app):
+    """Create an admin user with one account and a few transactions"""
+    from app import db
+    from app.models.user import User
+    from app.models.account import Account
+    from app.models.transaction import Transaction
+
+    with app.app_context():
+        user = User(username='bench', email='bench@example.com', role='admin')
+        user.set_password('BenchPassword123')
+        db.session.add(user)
+        db.session.commit()
+
+        account = Account(user_id=user.id, account_number='100000000001',
+                          account_type='checking', balance=1000.0)
+        db.session.add(account)
+        db.session.commit()
+
+        for i in range(20):
+            db.session.add(Transaction(account_id=account.id, transaction_type='deposit',
+                                       amount=10.0 + i, description=f'Seed {i}'))
+        db.session.commit()
+        return account.id
+
+
+def measure_first_requests(create_app, account_id):
+    """Create a new app, log in and time the first GET of every route"""
+    boot_start = time.perf_counter()
+    app = create_app()
+    boot = time.perf_counter() - boot_start
+
+    client = app.test_client()
+    client.post('/auth/login', data={'username': 'bench', 'password': 'BenchPassword123'})
+
+    timings = {}
+    for route in ROUTES:
+        url = route.format(account_id=account_id)
+        start = time.perf_counter()
+        response = client.get(url)
+        timings[route] = time.perf_counter() - start
+        assert response.status_code == 200, (url, response.status_code)
+    return boot, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='fresh apps per setup')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bank_bench_')
+    cache_dir = os.path.join(workdir, 'jinja_cache')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    from app import create_app
+    from app.utils.templates import precompile_templates
+
+    results = {}
+    try:
+        os.environ['TEMPLATE_CACHE_DIR'] = ''
+        account_id = seed(create_app())
+
+        setups = [
+            ('nocache', '', '0'),
+            ('diskcache', cache_dir, '0'),
+            ('warmup', cache_dir, '1'),
+        ]
+        for name, cache, warmup in setups:
+            os.environ['TEMPLATE_CACHE_DIR'] = cache
+            os.environ['TEMPLATE_WARMUP'] = warmup
+            if cache:
+                # Same as running `flask templates precompile` at build time
+                precompile_templates(create_app())
+
+            boots, per_route = [], {route: [] for route in ROUTES}
+            for _ in range(args.repeat):
+                boot, timings = measure_first_requests(create_app, account_id)
+                boots.append(boot)
+                for route, elapsed in timings.items():
+                    per_route[route].append(elapsed)
+            results[name] = (boots, per_route)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    names = [name for name, _, _ in setups]
+    print(f"\nFirst-request latency, median of {args.repeat} fresh apps (ms)")
+    print(f"{'route':<28}" + ''.join(f'{n:>12}' for n in names))
+    print('-' * (28 + 12 * len(names)))
+    for route in ROUTES:
+        row = ''.join(f'{statistics.median(results[n][1][route]) * 1000:>12.2f}' for n in names)
+        print(f'{route:<28}{row}')
+    print('-' * (28 + 12 * len(names)))
+    totals = ''.join(f'{sum(statistics.median(results[n][1][r]) for r in ROUTES) * 1000:>12.2f}' for n in names)
+    print(f"{'total (all routes)':<28}{totals}")
+    boots = ''.join(f'{statistics.median(results[n][0]) * 1000:>12.2f}' for n in names)
+    print(f"{'app boot':<28}{boots}")
+
+
+if __name__ == '__main__':
+    main()
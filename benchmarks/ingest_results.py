@@ -0,0 +1,92 @@
+"""
+Test result ingestion benchmark
+-------------------------------
+Writes a synthetic run of --count results (10% failures with a traceback)
+into a throwaway test dashboard database, using the bulk path from
+test_dashboard.ingest and, with --legacy, one ORM object per result.
+
+Usage:
+    python benchmarks/ingest_results.py [--count 50000] [--legacy]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+TRACEBACK = '\n'.join(
+    f'tests/integration/test_module_{i}.py:{i * 7}: in helper_{i}\n    result = call_{i}(value)'
+    for i in range(30)
+) + '\nE   AssertionError: assert 302 == 200'
+
+
+def make_results(count):
+    random.seed(1)
+    results = []
+    for i in range(count):
+        failed = i % 10 == 0
+        results.append({
+            'test_name': f'tests/integration/test_module_{i % 200}.py::TestGroup{i % 20}::test_case_{i}',
+            'test_file': f'tests/integration/test_module_{i % 200}.py',
+            'test_class': f'TestGroup{i % 20}',
+            'status': 'failed' if failed else 'passed',
+            'duration': random.uniform(0.001, 0.5),
+            'error_message': 'AssertionError: assert 302 == 200' if failed else None,
+            'traceback': TRACEBACK if failed else None,
+        })
+    return results
+
+
+def ingest_legacy(results):
+    """The previous collector: one ORM object per result"""
+    from test_dashboard.models import db, TestRun, TestResult
+
+    started = time.perf_counter()
+    test_run = TestRun(run_id=str(uuid.uuid4()))
+    db.session.add(test_run)
+    db.session.commit()
+    for r in results:
+        db.session.add(TestResult(run_id=test_run.id, test_name=r['test_name'], status=r['status'],
+                                  duration=r['duration'], test_file=r['test_file'],
+                                  error_message=(r['traceback'] or '')[:500] or None))
+    db.session.commit()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=50000)
+    parser.add_argument('--legacy', action='store_true', help='also time per-object ORM inserts')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='dashboard_bench_')
+    os.environ['DASHBOARD_DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'dashboard.db')}"
+
+    try:
+        from test_dashboard.app import create_dashboard_app
+        from test_dashboard.ingest import ingest_run
+
+        results = make_results(args.count)
+        app = create_dashboard_app()
+        with app.app_context():
+            _, elapsed = ingest_run(str(uuid.uuid4()), results)
+            print(f"bulk:   {args.count} results in {elapsed:.2f}s ({args.count / elapsed:,.0f} rows/s)")
+
+            if args.legacy:
+                elapsed = ingest_legacy(results)
+                print(f"legacy: {args.count} results in {elapsed:.2f}s ({args.count / elapsed:,.0f} rows/s)")
+
+        size = os.path.getsize(os.path.join(workdir, 'dashboard.db'))
+        print(f"database size: {size / 1024 / 1024:.1f} MB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
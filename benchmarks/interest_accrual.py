@@ -0,0 +1,84 @@
+"""
+Interest accrual benchmark
+--------------------------
+Seeds --accounts accounts (mixed savings/checking, a few closed) into a
+throwaway database and times one daily accrual run, then a re-run of the
+same date (which must be a no-op).
+
+Usage:
+    python benchmarks/interest_accrual.py [--accounts 1000000] [--chunk-size 50000]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+
+def seed(db, count):
+    from app.models.account import Account
+    from app.models.user import User
+
+    user = User(username='bench', email='bench@example.com', role='customer')
+    user.password_hash = 'x'
+    db.session.add(user)
+    db.session.commit()
+
+    random.seed(1)
+    now = datetime.utcnow()
+    for start in range(0, count, 100_000):
+        db.session.execute(Account.__table__.insert(), [{
+            'user_id': user.id,
+            'account_number': f'{i:012d}',
+            'account_type': 'savings' if i % 3 else 'checking',
+            'balance': round(random.lognormvariate(8, 1.5), 2),
+            'status': 'closed' if i % 50 == 0 else 'active',
+            'created_at': now,
+            'updated_at': now,
+        } for i in range(start, min(start + 100_000, count))])
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--accounts', type=int, default=1_000_000)
+    parser.add_argument('--chunk-size', type=int, default=50_000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bank_bench_')
+    try:
+        from app import create_app, db
+        from app.services.interest import accrue_interest
+
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            'SLOW_QUERY_THRESHOLD_MS': None,
+            'METRICS_ENABLED': False,
+        })
+        with app.app_context():
+            start = time.perf_counter()
+            seed(db, args.accounts)
+            print(f'Seeded {args.accounts:,} accounts in {time.perf_counter() - start:.1f}s')
+
+            day = date.today()
+            start = time.perf_counter()
+            job = accrue_interest(day, chunk_size=args.chunk_size)
+            elapsed = time.perf_counter() - start
+            print(f'Accrued {job.accounts:,} accounts (${job.total_interest:,.2f}) in {elapsed:.2f}s '
+                  f'({job.accounts / elapsed:,.0f} accounts/s)')
+
+            start = time.perf_counter()
+            accrue_interest(day, chunk_size=args.chunk_size)
+            print(f'Re-run of {day}: {(time.perf_counter() - start) * 1000:.1f} ms (no-op)')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
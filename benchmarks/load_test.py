@@ -0,0 +1,280 @@
+"""
+HTTP load test for the banking flows
+------------------------------------
+Starts the banking app on a local port with a fresh database, seeds one
+customer per virtual user and drives a weighted mix of login, dashboard,
+deposit, withdraw, transfer and history requests from concurrent
+sessions. Reports req/s and p50/p95/p99 latency per endpoint and saves the
+run to the test dashboard database (see /load-tests on the dashboard).
+
+Usage:
+    python benchmarks/load_test.py [--concurrency 8] [--duration 20]
+        [--mix dashboard=30,history=20,deposit=15,withdraw=10,transfer=10,login=15]
+        [--no-save]
+"""
+import argparse
+import logging
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import requests
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+DEFAULT_MIX = 'dashboard=30,history=20,deposit=15,withdraw=10,transfer=10,login=15'
+PASSWORD = 'LoadTestPassword123'
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in ACTIONS:
+            raise SystemExit(f'Unknown action in --mix: {name}')
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+# ---------- virtual user actions ----------
+# Each action performs one HTTP request and returns the response.
+
+def do_login(user, session, base_url):
+    session.get(f'{base_url}/auth/logout', allow_redirects=False)
+    return session.post(f'{base_url}/auth/login', allow_redirects=False,
+                        data={'username': user['username'], 'password': PASSWORD})
+
+
+def do_dashboard(user, session, base_url):
+    return session.get(f'{base_url}/')
+
+
+def do_history(user, session, base_url):
+    return session.get(f'{base_url}/transactions/history')
+
+
+def do_deposit(user, session, base_url):
+    return session.post(f'{base_url}/transactions/deposit', allow_redirects=False, data={
+        'account_id': user['checking_id'],
+        'amount': f'{random.uniform(5, 50):.2f}',
+        'description': 'Load test deposit',
+    })
+
+
+def do_withdraw(user, session, base_url):
+    return session.post(f'{base_url}/transactions/withdraw', allow_redirects=False, data={
+        'account_id': user['checking_id'],
+        'amount': f'{random.uniform(1, 20):.2f}',
+        'description': 'Load test withdrawal',
+    })
+
+
+def do_transfer(user, session, base_url):
+    return session.post(f'{base_url}/transactions/transfer', allow_redirects=False, data={
+        'from_account_id': user['checking_id'],
+        'to_account_number': user['savings_number'],
+        'amount': f'{random.uniform(1, 10):.2f}',
+        'description': 'Load test transfer',
+    })
+
+
+ACTIONS = {
+    'login': do_login,
+    'dashboard': do_dashboard,
+    'history': do_history,
+    'deposit': do_deposit,
+    'withdraw': do_withdraw,
+    'transfer': do_transfer,
+}
+
+
+# ---------- app under test ----------
+
+def seed_users(app, count, history):
+    """Create one customer per virtual user with a checking and a savings account"""
+    from app import db
+    from app.models.user import User
+    from app.models.account import Account
+    from app.models.transaction import Transaction
+
+    users = []
+    with app.app_context():
+        for i in range(count):
+            user = User(username=f'load{i}', email=f'load{i}@example.com')
+            user.set_password(PASSWORD)
+            db.session.add(user)
+            db.session.flush()
+
+            checking = Account(user_id=user.id, account_number=f'9{i:011d}',
+                               account_type='checking', balance=1_000_000.0)
+            savings = Account(user_id=user.id, account_number=f'8{i:011d}',
+                              account_type='savings', balance=0.0)
+            db.session.add_all([checking, savings])
+            db.session.flush()
+
+            db.session.add_all([
+                Transaction(account_id=checking.id, transaction_type='deposit',
+                            amount=10.0, description=f'Seed {n}')
+                for n in range(history)
+            ])
+            users.append({'username': user.username, 'checking_id': checking.id,
+                          'savings_number': savings.account_number})
+        db.session.commit()
+    return users
+
+
+def start_server(app):
+    """Serve the app from a background thread on a free local port"""
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+# ---------- load generation ----------
+
+def virtual_user(user, base_url, mix, deadline, samples, lock):
+    names, weights = list(mix), list(mix.values())
+    session = requests.Session()
+    do_login(user, session, base_url)
+
+    local = []
+    while time.perf_counter() < deadline:
+        name = random.choices(names, weights)[0]
+        start = time.perf_counter()
+        try:
+            response = ACTIONS[name](user, session, base_url)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        local.append((name, time.perf_counter() - start, ok))
+
+    with lock:
+        samples.extend(local)
+
+
+def run_load(base_url, users, mix, concurrency, duration):
+    samples, lock = [], threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=virtual_user,
+                         args=(users[i % len(users)], base_url, mix, deadline, samples, lock))
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - start
+
+
+def summarize(samples, elapsed):
+    """Per-endpoint request counts, errors, throughput and latency percentiles"""
+    by_endpoint = {}
+    for name, latency, ok in samples:
+        by_endpoint.setdefault(name, []).append((latency, ok))
+
+    summary = {}
+    for name, rows in sorted(by_endpoint.items()):
+        latencies = sorted(latency * 1000 for latency, _ in rows)
+        summary[name] = {
+            'requests': len(rows),
+            'errors': sum(1 for _, ok in rows if not ok),
+            'throughput': len(rows) / elapsed,
+            'mean_ms': sum(latencies) / len(latencies),
+            'p50_ms': percentile(latencies, 50),
+            'p95_ms': percentile(latencies, 95),
+            'p99_ms': percentile(latencies, 99),
+            'max_ms': latencies[-1],
+        }
+    return summary
+
+
+def save_results(run_id, args, summary, elapsed):
+    from test_dashboard.app import create_dashboard_app
+    from test_dashboard.models import db as dashboard_db, LoadTestRun, LoadTestResult
+
+    dashboard = create_dashboard_app()
+    with dashboard.app_context():
+        run = LoadTestRun(run_id=run_id, concurrency=args.concurrency, scenario=args.mix)
+        run.duration = elapsed
+        run.total_requests = sum(s['requests'] for s in summary.values())
+        run.errors = sum(s['errors'] for s in summary.values())
+        run.throughput = run.total_requests / elapsed if elapsed else 0
+        dashboard_db.session.add(run)
+        dashboard_db.session.flush()
+
+        for name, stats in summary.items():
+            dashboard_db.session.add(LoadTestResult(run_id=run.id, endpoint=name, **stats))
+        dashboard_db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=20, help='seconds of load')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='action weights, name=weight,...')
+    parser.add_argument('--history', type=int, default=50, help='seed transactions per user')
+    parser.add_argument('--no-save', action='store_true', help='do not write to the test dashboard')
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    workdir = tempfile.mkdtemp(prefix='bank_load_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'load.db')}"
+    os.environ['TEMPLATE_CACHE_DIR'] = ''
+    # Repeated withdrawals/transfers from one account would trip the velocity and daily limits
+    # (DAILY_LIMITS={} is passed to create_app; it has no environment variable)
+    os.environ['VELOCITY_ENABLED'] = '0'
+
+    server = None
+    try:
+        from app import create_app
+        app = create_app({'DAILY_LIMITS': {}})
+        users = seed_users(app, args.concurrency, args.history)
+        server, base_url = start_server(app)
+
+        print(f'Load test: {args.concurrency} users for {args.duration:g}s against {base_url}')
+        samples, elapsed = run_load(base_url, users, mix, args.concurrency, args.duration)
+    finally:
+        if server is not None:
+            server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    summary = summarize(samples, elapsed)
+    total = len(samples)
+    errors = sum(s['errors'] for s in summary.values())
+
+    print(f"\n{'endpoint':<12}{'requests':>10}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, s in summary.items():
+        print(f"{name:<12}{s['requests']:>10}{s['errors']:>8}{s['throughput']:>9.1f}"
+              f"{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}")
+    print(f"{'total':<12}{total:>10}{errors:>8}{total / elapsed:>9.1f}")
+
+    if not args.no_save:
+        run_id = f"load-{datetime.utcnow():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:6]}"
+        save_results(run_id, args, summary, elapsed)
+        print(f'\nSaved as {run_id} (http://localhost:5050/load-tests)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Metrics overhead benchmark
+--------------------------
+Times the same pages with request/SQL metrics enabled and disabled
+(METRICS_ENABLED) and reports the per-request cost of instrumentation.
+
+Usage:
+    python benchmarks/metrics_overhead.py [--requests 300] [--rounds 5]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+ROUTES = ['/', '/accounts/', '/transactions/history']
+
+
+def seed(app):
+    from app import db
+    from app.models.user import User
+    from app.models.account import Account
+    from app.models.transaction import Transaction
+
+    with app.app_context():
+        user = User(username='bench', email='bench@example.com')
+        user.set_password('BenchPassword123')
+        db.session.add(user)
+        db.session.commit()
+        account = Account(user_id=user.id, account_number='100000000001',
+                          account_type='checking', balance=0.0)
+        db.session.add(account)
+        db.session.commit()
+        db.session.add_all([Transaction(account_id=account.id, transaction_type='deposit',
+                                        amount=1.0 + i) for i in range(50)])
+        db.session.commit()
+
+
+def logged_in_client(create_app, enabled):
+    os.environ['METRICS_ENABLED'] = '1' if enabled else '0'
+    app = create_app()
+    client = app.test_client()
+    client.post('/auth/login', data={'username': 'bench', 'password': 'BenchPassword123'})
+    for route in ROUTES:
+        client.get(route)
+    return client
+
+
+def time_requests(client, count):
+    start = time.perf_counter()
+    for i in range(count):
+        client.get(ROUTES[i % len(ROUTES)])
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bank_bench_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['TEMPLATE_CACHE_DIR'] = ''
+
+    try:
+        from app import create_app
+        from app.utils.metrics import RequestMetrics
+
+        seed(create_app())
+        off_client = logged_in_client(create_app, enabled=False)
+        on_client = logged_in_client(create_app, enabled=True)
+
+        off, on = [], []
+        for _ in range(args.rounds):
+            off.append(time_requests(off_client, args.requests))
+            on.append(time_requests(on_client, args.requests))
+
+        metrics = RequestMetrics()
+        loops = 100_000
+        start = time.perf_counter()
+        for i in range(loops):
+            metrics.record_request('dashboard.index', 'GET', 200, 0.004, 3, 0.001)
+        record_us = (time.perf_counter() - start) / loops * 1e6
+
+        start = time.perf_counter()
+        metrics.render()
+        render_ms = (time.perf_counter() - start) * 1000
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    off_ms, on_ms = statistics.median(off) * 1000, statistics.median(on) * 1000
+    print(f'\nMedian of {args.rounds} rounds x {args.requests} requests over {", ".join(ROUTES)}')
+    print(f'  metrics disabled: {off_ms:.3f} ms/request')
+    print(f'  metrics enabled:  {on_ms:.3f} ms/request')
+    print(f'  overhead:         {on_ms - off_ms:+.3f} ms/request ({(on_ms / off_ms - 1) * 100:+.1f}%)')
+    print(f'  record_request(): {record_us:.2f} us/call')
+    print(f'  render():         {render_ms:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+"""
+Microbenchmark suite
+--------------------
+Times the hot code paths of the banking app:
+
+  models  - Account.deposit/withdraw, Transaction construction and
+            reference generation, password hashing and checking
+  routes  - each transaction route handler through the Flask test client
+
+Each benchmark is calibrated so one repeat runs for at least --min-time
+seconds, then timed --repeat times. Results (microseconds per operation)
+are printed and saved to the test dashboard (see /benchmarks).
+
+Usage:
+    python benchmarks/microbench.py [-k deposit] [--repeat 7] [--min-time 0.2] [--no-save]
+"""
+import argparse
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+BENCHMARKS = []
+
+
+def benchmark(name, group):
+    """Register a benchmark. The function receives the context and returns a callable to time."""
+    def decorator(setup):
+        BENCHMARKS.append((name, group, setup))
+        return setup
+    return decorator
+
+
+def calibrate(func, min_time):
+    """Find a loop count so that one timed repeat takes at least min_time seconds"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return loops
+        # Jump close to the target, at least doubling
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9) * 1.1))
+
+
+def measure(func, repeat, min_time):
+    """Return loops and per-operation times (seconds) for each repeat"""
+    loops = calibrate(func, min_time)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        times.append((time.perf_counter() - start) / loops)
+    return loops, times
+
+
+# ---------- models ----------
+
+@benchmark('account_deposit', 'models')
+def bench_account_deposit(ctx):
+    from app.models.account import Account
+    account = Account(user_id=1, account_number='100000000001', account_type='checking', balance=0.0)
+    return lambda: account.deposit(10.0)
+
+
+@benchmark('account_withdraw', 'models')
+def bench_account_withdraw(ctx):
+    from app.models.account import Account
+    account = Account(user_id=1, account_number='100000000001', account_type='checking', balance=1e12)
+    return lambda: account.withdraw(10.0)
+
+
+@benchmark('transaction_construct', 'models')
+def bench_transaction_construct(ctx):
+    from app.models.transaction import Transaction
+    return lambda: Transaction(account_id=1, transaction_type='deposit', amount=10.0,
+                               description='Benchmark')
+
+
+@benchmark('transaction_generate_reference', 'models')
+def bench_generate_reference(ctx):
+    from app.models.transaction import Transaction
+    return Transaction.generate_reference
+
+
+@benchmark('account_generate_number', 'models')
+def bench_generate_account_number(ctx):
+    from app.models.account import Account
+    return Account.generate_account_number
+
+
+@benchmark('user_set_password', 'models')
+def bench_set_password(ctx):
+    from app.models.user import User
+    user = User(username='bench', email='bench@example.com')
+    return lambda: user.set_password('BenchPassword123')
+
+
+@benchmark('user_check_password', 'models')
+def bench_check_password(ctx):
+    from app.models.user import User
+    user = User(username='bench', email='bench@example.com')
+    user.set_password('BenchPassword123')
+    return lambda: user.check_password('BenchPassword123')
+
+
+# ---------- routes ----------
+
+@benchmark('route_deposit', 'routes')
+def bench_route_deposit(ctx):
+    client, ids = ctx['client'], ctx['ids']
+    data = {'account_id': ids['checking_id'], 'amount': '10.00', 'description': 'Bench'}
+    return lambda: client.post('/transactions/deposit', data=data)
+
+
+@benchmark('route_withdraw', 'routes')
+def bench_route_withdraw(ctx):
+    client, ids = ctx['client'], ctx['ids']
+    data = {'account_id': ids['checking_id'], 'amount': '1.00', 'description': 'Bench'}
+    return lambda: client.post('/transactions/withdraw', data=data)
+
+
+@benchmark('route_transfer', 'routes')
+def bench_route_transfer(ctx):
+    client, ids = ctx['client'], ctx['ids']
+    data = {'from_account_id': ids['checking_id'], 'to_account_number': ids['savings_number'],
+            'amount': '1.00', 'description': 'Bench'}
+    return lambda: client.post('/transactions/transfer', data=data)
+
+
+@benchmark('route_history', 'routes')
+def bench_route_history(ctx):
+    client = ctx['client']
+    return lambda: client.get('/transactions/history')
+
+
+@benchmark('route_search', 'routes')
+def bench_route_search(ctx):
+    client = ctx['client']
+    return lambda: client.get('/transactions/search?q=Seed&type=deposit')
+
+
+# ---------- runner ----------
+
+def make_context(history):
+    """Create the app on a throwaway database with one logged-in customer"""
+    from app import create_app, db
+    from app.models.user import User
+    from app.models.account import Account
+    from app.models.transaction import Transaction
+
+    app = create_app({'DAILY_LIMITS': {}})
+    with app.app_context():
+        user = User(username='bench', email='bench@example.com')
+        user.set_password('BenchPassword123')
+        db.session.add(user)
+        db.session.flush()
+        checking = Account(user_id=user.id, account_number='100000000001',
+                           account_type='checking', balance=1e9)
+        savings = Account(user_id=user.id, account_number='100000000002',
+                          account_type='savings', balance=0.0)
+        db.session.add_all([checking, savings])
+        db.session.flush()
+        db.session.add_all([Transaction(account_id=checking.id, transaction_type='deposit',
+                                        amount=1.0, description=f'Seed {i}')
+                            for i in range(history)])
+        db.session.commit()
+        ids = {'checking_id': checking.id, 'savings_number': savings.account_number}
+
+    client = app.test_client()
+    client.post('/auth/login', data={'username': 'bench', 'password': 'BenchPassword123'})
+    return {'app': app, 'client': client, 'ids': ids}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=project_root,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(results):
+    from test_dashboard.app import create_dashboard_app
+    from test_dashboard.models import db as dashboard_db, BenchmarkRun, BenchmarkResult
+
+    run_id = f"bench-{datetime.utcnow():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:6]}"
+    dashboard = create_dashboard_app()
+    with dashboard.app_context():
+        run = BenchmarkRun(run_id=run_id, git_commit=git_commit(),
+                           python_version=platform.python_version(),
+                           machine=f'{platform.system()} {platform.machine()}')
+        dashboard_db.session.add(run)
+        dashboard_db.session.flush()
+        for result in results:
+            dashboard_db.session.add(BenchmarkResult(run_id=run.id, **result))
+        dashboard_db.session.commit()
+    return run_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-k', dest='keyword', default='', help='only run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds per timed repeat')
+    parser.add_argument('--history', type=int, default=200, help='seed transactions for route benchmarks')
+    parser.add_argument('--no-save', action='store_true', help='do not write to the test dashboard')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bank_bench_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['TEMPLATE_CACHE_DIR'] = ''
+    # Repeated withdrawals/transfers from one account would trip the velocity and daily limits
+    # (DAILY_LIMITS={} is passed to create_app; it has no environment variable)
+    os.environ['VELOCITY_ENABLED'] = '0'
+
+    results = []
+    try:
+        ctx = make_context(args.history)
+        print(f"{'benchmark':<32}{'loops':>8}{'min us':>12}{'median us':>12}{'stdev':>10}{'ops/s':>12}")
+        for name, group, setup in BENCHMARKS:
+            if args.keyword not in name:
+                continue
+            with ctx['app'].app_context():
+                loops, times = measure(setup(ctx), args.repeat, args.min_time)
+            us = [t * 1e6 for t in times]
+            result = {
+                'name': name,
+                'group': group,
+                'loops': loops,
+                'repeat': args.repeat,
+                'min_us': min(us),
+                'median_us': statistics.median(us),
+                'mean_us': statistics.mean(us),
+                'stdev_us': statistics.stdev(us) if len(us) > 1 else 0.0,
+            }
+            results.append(result)
+            print(f"{name:<32}{loops:>8}{result['min_us']:>12.2f}{result['median_us']:>12.2f}"
+                  f"{result['stdev_us']:>10.2f}{1e6 / result['median_us']:>12,.0f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if results and not args.no_save:
+        run_id = save_results(results)
+        print(f'\nSaved as {run_id} (http://localhost:5050/benchmarks)')
+
+
+if __name__ == '__main__':
+    main()
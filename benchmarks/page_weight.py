@@ -0,0 +1,93 @@
+"""
+Page weight benchmark
+---------------------
+Fetches the transaction history page (and the assets it links to) with no
+compression, gzip and brotli, and reports transferred bytes plus estimated
+transfer time on a given link speed.
+
+Usage:
+    python benchmarks/page_weight.py [--transactions 1000] [--mbps 10]
+"""
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+ENCODINGS = [('identity', 'identity'), ('gzip', 'gzip'), ('br', 'br, gzip')]
+
+
+def seed(app, count):
+    from app import db
+    from app.models.user import User
+    from app.models.account import Account
+    from app.models.transaction import Transaction
+
+    with app.app_context():
+        user = User(username='bench', email='bench@example.com')
+        user.set_password('BenchPassword123')
+        db.session.add(user)
+        db.session.commit()
+
+        account = Account(user_id=user.id, account_number='100000000001',
+                          account_type='checking', balance=0.0)
+        db.session.add(account)
+        db.session.commit()
+
+        types = ['deposit', 'withdrawal', 'transfer']
+        db.session.add_all([
+            Transaction(account_id=account.id, transaction_type=types[i % 3],
+                        amount=10.0 + i, description=f'Benchmark transaction {i}')
+            for i in range(count)
+        ])
+        db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=1000)
+    parser.add_argument('--mbps', type=float, default=10.0, help='link speed for transfer time estimate')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bank_bench_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['TEMPLATE_CACHE_DIR'] = ''
+
+    try:
+        from app import create_app
+        app = create_app()
+        seed(app, args.transactions)
+
+        client = app.test_client()
+        client.post('/auth/login', data={'username': 'bench', 'password': 'BenchPassword123'})
+
+        bytes_per_second = args.mbps * 1_000_000 / 8
+        print(f'\n/transactions/history with {args.transactions} transactions, {args.mbps:g} Mbit/s link')
+        print(f"{'encoding':<10}{'html bytes':>12}{'assets bytes':>14}{'server ms':>11}{'transfer ms':>13}")
+
+        for label, accept in ENCODINGS:
+            start = time.perf_counter()
+            page = client.get('/transactions/history', headers={'Accept-Encoding': accept})
+            server_ms = (time.perf_counter() - start) * 1000
+            html_bytes = len(page.get_data())
+
+            raw_html = client.get('/transactions/history').get_data(as_text=True)
+            assets = re.findall(r'(?:href|src)="(/assets/[^"]+)"', raw_html)
+            asset_bytes = sum(
+                len(client.get(url, headers={'Accept-Encoding': accept}).get_data())
+                for url in assets
+            )
+
+            transfer_ms = (html_bytes + asset_bytes) / bytes_per_second * 1000
+            print(f'{label:<10}{html_bytes:>12,}{asset_bytes:>14,}{server_ms:>11.1f}{transfer_ms:>13.1f}')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Ledger reconciliation benchmark
+-------------------------------
+Seeds --accounts accounts and --transactions transactions into a throwaway
+database, with balances matching their ledgers except for --drift accounts,
+then times:
+
+  * a full reconciliation with 1, 2, 4, ... up to --max-workers processes
+  * an incremental run after posting to 1% of the accounts
+
+Usage:
+    python benchmarks/reconciliation.py [--accounts 200000] [--transactions 10000000] [--max-workers 4]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+CHUNK = 200_000
+
+
+def seed(db, accounts, transactions, drift):
+    from sqlalchemy import bindparam
+    from app.models.account import Account
+    from app.models.transaction import Transaction
+    from app.models.user import User
+    from app.services.interest import db_value, execute_many
+
+    user = User(username='bench', email='bench@example.com', role='customer')
+    user.password_hash = 'x'
+    db.session.add(user)
+    db.session.commit()
+
+    random.seed(1)
+    table = Transaction.__table__
+    insert = table.insert().values({name: bindparam(name) for name in (
+        'account_id', 'transaction_type', 'amount', 'description', 'reference_number', 'status', 'timestamp')})
+    start = datetime.utcnow() - timedelta(days=365)
+    balances = [0.0] * (accounts + 1)
+    types = ('deposit', 'deposit', 'withdrawal', 'transfer')
+    for first in range(0, transactions, CHUNK):
+        count = min(CHUNK, transactions - first)
+        account_ids = [1 + (first + i) % accounts for i in range(count)]
+        kinds = [types[(first + i) % 4] for i in range(count)]
+        amounts = [round(random.uniform(1, 500), 2) * (-1 if kind == 'transfer' and i % 2 else 1)
+                   for i, kind in enumerate(kinds)]
+        for account_id, kind, amount in zip(account_ids, kinds, amounts):
+            balances[account_id] += -amount if kind == 'withdrawal' else amount
+        execute_many(insert, count, account_id=account_ids, transaction_type=kinds, amount=amounts,
+                     description=None, reference_number=[f'B{first + i:011d}' for i in range(count)],
+                     status='completed',
+                     timestamp=db_value(table.c.timestamp, start + timedelta(seconds=first // accounts)))
+
+    now = datetime.utcnow() - timedelta(days=1)
+    drifted = set(random.sample(range(1, accounts + 1), drift))
+    db.session.execute(Account.__table__.insert(), [{
+        'user_id': user.id,
+        'account_number': f'{i:012d}',
+        'account_type': 'checking',
+        'balance': round(balances[i] + (10.0 if i in drifted else 0.0), 2),
+        'status': 'active',
+        'created_at': now,
+        'updated_at': now,
+    } for i in range(1, accounts + 1)])
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--accounts', type=int, default=200_000)
+    parser.add_argument('--transactions', type=int, default=10_000_000)
+    parser.add_argument('--drift', type=int, default=25, help='accounts seeded out of balance')
+    parser.add_argument('--max-workers', type=int, default=4)
+    parser.add_argument('--range-size', type=int, default=None)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bank_bench_')
+    try:
+        from app import create_app, db
+        from app.models.account import Account
+        from app.models.reconciliation import ReconciliationRun
+        from app.services.reconciliation import RANGE_SIZE, reconcile
+
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            'SLOW_QUERY_THRESHOLD_MS': None,
+            'METRICS_ENABLED': False,
+            'VELOCITY_ENABLED': False,
+        })
+        with app.app_context():
+            start = time.perf_counter()
+            seed(db, args.accounts, args.transactions, args.drift)
+            print(f'Seeded {args.accounts:,} accounts, {args.transactions:,} transactions '
+                  f'in {time.perf_counter() - start:.1f}s, {os.cpu_count()} CPUs\n')
+
+            print('workers   seconds      txns/s  speedup  discrepancies')
+            baseline = None
+            workers = 1
+            while workers <= args.max_workers:
+                start = time.perf_counter()
+                run = reconcile(os.path.join(workdir, 'reports'), full=True, workers=workers,
+                                range_size=args.range_size or min(RANGE_SIZE, args.accounts // (4 * workers) or 1))
+                elapsed = time.perf_counter() - start
+                baseline = baseline or elapsed
+                print(f'{workers:7d} {elapsed:9.2f} {run.transactions / elapsed:11,.0f} '
+                      f'{baseline / elapsed:7.2f}x {run.discrepancy_count:14d}')
+                workers *= 2
+
+            # Incremental: touch 1% of the accounts after the last run
+            ReconciliationRun.query.order_by(ReconciliationRun.id.desc()).first().started_at -= timedelta(hours=1)
+            touched = list(range(1, args.accounts + 1, 100))
+            db.session.execute(Account.__table__.update().where(Account.id.in_(touched)).values(
+                updated_at=datetime.utcnow()))
+            db.session.commit()
+            start = time.perf_counter()
+            run = reconcile(os.path.join(workdir, 'reports'))
+            elapsed = time.perf_counter() - start
+            print(f'\nIncremental run: {run.accounts:,} accounts, {run.transactions:,} transactions '
+                  f'in {elapsed:.2f}s ({run.discrepancy_count} discrepancies)')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
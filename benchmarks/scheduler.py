@@ -0,0 +1,119 @@
+"""
+Scheduled transfer benchmark
+----------------------------
+Seeds --schedules standing orders into a throwaway database, spread over
+the next 30 days with --due of them due now, then times:
+
+  * an idle tick (the indexed "due soon" query against the whole table)
+  * the tick that executes every due transfer, in batches
+
+Usage:
+    python benchmarks/scheduler.py [--schedules 1000000] [--due 10000] [--batch-size 500]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+ACCOUNTS = 2_000
+
+
+def seed(db, count, due, now):
+    from app.models.account import Account
+    from app.models.scheduled_transfer import ScheduledTransfer
+    from app.models.user import User
+
+    user = User(username='bench', email='bench@example.com', role='customer')
+    user.password_hash = 'x'
+    db.session.add(user)
+    db.session.commit()
+
+    db.session.execute(Account.__table__.insert(), [{
+        'user_id': user.id,
+        'account_number': f'{i:012d}',
+        'account_type': 'checking',
+        'balance': 1_000_000.0,
+        'status': 'active',
+        'created_at': now,
+        'updated_at': now,
+    } for i in range(ACCOUNTS)])
+
+    random.seed(1)
+    frequencies = ('daily', 'weekly', 'monthly', 'monthly')
+    for start in range(0, count, 100_000):
+        rows = []
+        for i in range(start, min(start + 100_000, count)):
+            # The first `due` schedules are due now, the rest later this month
+            when = now - timedelta(seconds=i % 60) if i < due else now + timedelta(seconds=random.randint(600, 30 * 86400))
+            rows.append({
+                'user_id': user.id,
+                'from_account_id': 1 + i % ACCOUNTS,
+                'to_account_number': f'{(i + 1) % ACCOUNTS:012d}',
+                'amount': 1.0,
+                'frequency': frequencies[i % 4],
+                'start_at': when,
+                'due_at': when,
+                'next_run_at': when,
+                'attempts': 0,
+                'runs': 0,
+                'status': 'active',
+                'created_at': now,
+            })
+        db.session.execute(ScheduledTransfer.__table__.insert(), rows)
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--schedules', type=int, default=1_000_000)
+    parser.add_argument('--due', type=int, default=10_000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bank_bench_')
+    try:
+        from app import create_app, db
+        from app.services.scheduler import TransferScheduler
+
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            'SLOW_QUERY_THRESHOLD_MS': None,
+            'METRICS_ENABLED': False,
+            'DAILY_LIMITS': {},
+            'VELOCITY_ENABLED': False,  # seeded schedules share source accounts
+        })
+        with app.app_context():
+            now = datetime.utcnow()
+            start = time.perf_counter()
+            seed(db, args.schedules, args.due, now)
+            print(f'Seeded {args.schedules:,} schedules in {time.perf_counter() - start:.1f}s')
+
+            scheduler = TransferScheduler(batch_size=args.batch_size)
+            start = time.perf_counter()
+            outcomes = scheduler.tick(now)
+            elapsed = time.perf_counter() - start
+            executed = sum(outcomes.values())
+            print(f'Tick executing {executed:,} due transfers: {elapsed:.2f}s '
+                  f'({executed / elapsed:,.0f} transfers/s) {dict(outcomes)}')
+
+            timings = []
+            for _ in range(20):
+                start = time.perf_counter()
+                scheduler.tick(now)
+                timings.append(time.perf_counter() - start)
+            timings.sort()
+            print(f'Idle tick over {args.schedules:,} schedules: median {timings[10] * 1000:.2f} ms, '
+                  f'max {timings[-1] * 1000:.2f} ms')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
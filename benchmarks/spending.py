@@ -0,0 +1,125 @@
+"""
+Spending rollup benchmark
+-------------------------
+Seeds --transactions transactions over the last --months months for
+--users users into a throwaway database, rebuilds the rollup, then times:
+
+  * the dashboard's monthly totals computed from raw transactions
+  * the same totals read from the rollup (what the dashboard does)
+  * ORM postings with and without the rollup update
+
+Usage:
+    python benchmarks/spending.py [--transactions 1000000] [--users 2000] [--months 12]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from archive import seed, timed  # noqa: E402
+
+
+def spread_owners(db, users):
+    """Give the seeded accounts to `users` users, round robin"""
+    from app.models.account import Account
+    from app.models.user import User
+
+    now = datetime.utcnow()
+    db.session.execute(User.__table__.insert(), [{
+        'username': f'owner{i}', 'email': f'owner{i}@example.com', 'password_hash': 'x',
+        'role': 'customer', 'is_active': True, 'created_at': now, 'updated_at': now,
+    } for i in range(users)])
+    first = db.session.query(db.func.min(User.id)).filter(User.username.like('owner%')).scalar()
+    accounts = Account.__table__
+    db.session.execute(accounts.update().values(user_id=first + accounts.c.id % users))
+    db.session.commit()
+
+
+def raw_monthly(db, user_id, start):
+    """The dashboard's totals the slow way: group the user's transactions"""
+    from sqlalchemy import case, func
+    from app.models.account import Account
+    from app.models.transaction import Transaction
+
+    change = Transaction.balance_change
+    return db.session.query(
+        func.strftime('%Y-%m', Transaction.timestamp), Transaction.transaction_type,
+        func.sum(case((change > 0, change), else_=0.0)), func.sum(case((change < 0, -change), else_=0.0)),
+        func.count()
+    ).join(Account, Account.id == Transaction.account_id).filter(
+        Account.user_id == user_id, Transaction.timestamp >= start
+    ).group_by(func.strftime('%Y-%m', Transaction.timestamp), Transaction.transaction_type).all()
+
+
+def time_postings(db, account_id, count):
+    from app.models.transaction import Transaction
+
+    start = time.perf_counter()
+    for _ in range(count):
+        db.session.add(Transaction(account_id=account_id, transaction_type='deposit', amount=1.0))
+        db.session.commit()
+    return (time.perf_counter() - start) / count * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=1_000_000)
+    parser.add_argument('--accounts', type=int, default=10_000)
+    parser.add_argument('--users', type=int, default=2_000)
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--postings', type=int, default=500)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bank_bench_')
+    try:
+        from sqlalchemy import event
+        from app import create_app, db
+        from app.models.account import Account
+        from app.models.transaction import Transaction
+        from app.services import spending
+
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            'SLOW_QUERY_THRESHOLD_MS': None,
+            'METRICS_ENABLED': False,
+            'VELOCITY_ENABLED': False,
+        })
+        with app.app_context():
+            start = time.perf_counter()
+            seed(db, args.transactions, args.accounts, args.months)
+            spread_owners(db, args.users)
+            print(f'Seeded {args.transactions:,} transactions for {args.users:,} users '
+                  f'in {time.perf_counter() - start:.1f}s')
+
+            start = time.perf_counter()
+            rows = spending.rebuild_rollup()
+            elapsed = time.perf_counter() - start
+            print(f'Rebuilt {rows:,} rollup rows in {elapsed:.1f}s ({args.transactions / elapsed:,.0f} transactions/s)\n')
+
+            account = db.session.get(Account, 7)
+            month = spending.month_start(datetime.utcnow())
+            for _ in range(spending.MONTHS - 1):
+                month = spending.previous_month(month)
+            raw = timed(lambda: raw_monthly(db, account.user_id, month))
+            rollup = timed(lambda: spending.monthly_spending(account.user_id))
+            print(f"{'dashboard totals':<28} {'ms':>8}")
+            print(f"{'from transactions':<28} {raw:8.2f}")
+            print(f"{'from rollup':<28} {rollup:8.2f}  ({raw / rollup:.0f}x faster)\n")
+
+            with_rollup = time_postings(db, account.id, args.postings)
+            event.remove(Transaction, 'after_insert', spending._after_insert)
+            without = time_postings(db, account.id, args.postings)
+            print(f'ORM posting: {with_rollup:.3f} ms with the rollup update, {without:.3f} ms without')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Month-end statement benchmark
+-----------------------------
+Seeds --accounts accounts with --transactions transactions each in the
+benchmarked month into a throwaway database, then generates the month's
+statements with 1, 2, 4, ... up to --max-workers worker processes and
+reports throughput and speedup over one worker.
+
+Usage:
+    python benchmarks/statements.py [--accounts 20000] [--transactions 20] [--max-workers 8]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+PERIOD = '2026-03'
+
+
+def seed(db, accounts, per_account):
+    from app.models.account import Account
+    from app.models.transaction import Transaction
+    from app.models.user import User
+
+    user = User(username='bench', email='bench@example.com', role='customer')
+    user.password_hash = 'x'
+    db.session.add(user)
+    db.session.commit()
+
+    random.seed(1)
+    now = datetime(2026, 4, 15)
+    db.session.execute(Account.__table__.insert(), [{
+        'user_id': user.id,
+        'account_number': f'{i:012d}',
+        'account_type': 'savings' if i % 3 else 'checking',
+        'balance': round(random.uniform(0, 10_000), 2),
+        'status': 'active',
+        'created_at': now,
+        'updated_at': now,
+    } for i in range(1, accounts + 1)])
+
+    month_start = datetime(2026, 3, 1)
+    for first in range(1, accounts + 1, 5000):
+        db.session.execute(Transaction.__table__.insert(), [{
+            'account_id': account_id,
+            'transaction_type': random.choice(('deposit', 'withdrawal', 'transfer')),
+            'amount': round(random.uniform(1, 500), 2),
+            'description': 'Benchmark',
+            'reference_number': f'B{account_id:09d}{n:04d}',
+            'status': 'completed',
+            'timestamp': month_start + timedelta(seconds=random.randrange(31 * 86400)),
+        } for account_id in range(first, min(first + 5000, accounts + 1)) for n in range(per_account)])
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--accounts', type=int, default=20_000)
+    parser.add_argument('--transactions', type=int, default=20, help='per account in the month')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bank_bench_')
+    try:
+        from app import create_app, db
+        from app.services.statements import delete_run, generate_statements
+
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            'SLOW_QUERY_THRESHOLD_MS': None,
+            'METRICS_ENABLED': False,
+        })
+        with app.app_context():
+            seed(db, args.accounts, args.transactions)
+            print(f'{args.accounts:,} accounts, {args.accounts * args.transactions:,} transactions, '
+                  f'{os.cpu_count()} CPUs\n')
+            print(f"{'workers':>7}  {'seconds':>8}  {'accounts/s':>11}  {'txns/s':>10}  {'speedup':>7}  {'efficiency':>10}")
+
+            workers, baseline = 1, None
+            while workers <= args.max_workers:
+                delete_run(PERIOD)
+                summary = generate_statements(PERIOD, os.path.join(workdir, 'statements'),
+                                              workers=workers, batch_size=args.batch_size)
+                baseline = baseline or summary['seconds']
+                speedup = baseline / summary['seconds']
+                print(f"{workers:>7}  {summary['seconds']:>8.2f}  {summary['accounts_per_second']:>11,.0f}  "
+                      f"{summary['transactions_per_second']:>10,.0f}  {speedup:>6.2f}x  {speedup / workers:>9.0%}")
+                workers *= 2
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,23 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, abort
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from sqlalchemy import case, func
 import os
 import sys
+import uuid
 
 # Add project root to path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
-from test_dashboard.models import db, TestRun, TestResult, CoverageReport
+from test_dashboard.models import (db, ensure_indexes, TestRun, TestResult, LoadTestRun, LoadTestResult,
+                                   BenchmarkRun, BenchmarkResult)
+from test_dashboard.coverage_data import coverage_with_deltas
+from test_dashboard.flaky import MIN_RUNS, flaky_tests, largest_clusters
+from test_dashboard.ingest import RESULT_STATUSES, add_results, finish_run, get_or_create_run
+from test_dashboard.regressions import DEFAULT_WINDOW, find_run_regressions
+from test_dashboard.trends import DEFAULT_POINTS, trend_series
+
+RESULTS_PER_PAGE = 50
 
 
 def create_dashboard_app():
@@ -17,13 +26,15 @@ def create_dashboard_app():
     # Configuration
     basedir = os.path.abspath(os.path.dirname(__file__))
     app.config['SECRET_KEY'] = 'dashboard-secret-key'
-    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.join(basedir, "test_dashboard.db")}'
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+        'DASHBOARD_DATABASE_URL', f'sqlite:///{os.path.join(basedir, "test_dashboard.db")}')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
     db.init_app(app)
     
     with app.app_context():
         db.create_all()
+        ensure_indexes(db.engine)
     
     # ==================== ROUTES ====================
     
@@ -48,15 +59,12 @@ def create_dashboard_app():
         # Calculate stats
         total_runs = TestRun.query.count()
         
-        # Average pass rate (last 30 days)
+        # Average pass rate (last 30 days), same definition as TestRun.pass_rate
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_runs_stats = TestRun.query.filter(
-            TestRun.start_time >= thirty_days_ago
-        ).all()
-        
-        avg_pass_rate = 0
-        if recent_runs_stats:
-            avg_pass_rate = sum(r.pass_rate for r in recent_runs_stats) / len(recent_runs_stats)
+        avg_pass_rate = db.session.query(func.avg(case(
+            (TestRun.total_tests > 0, TestRun.passed * 100.0 / TestRun.total_tests),
+            else_=0.0
+        ))).filter(TestRun.start_time >= thirty_days_ago).scalar() or 0
         
         return render_template('dashboard/index.html',
                              latest_run=latest_run,
@@ -79,27 +87,37 @@ def create_dashboard_app():
         """View details of a specific test run"""
         run = TestRun.query.get_or_404(run_id)
         
-        # Get all results for this run
-        results = TestResult.query.filter_by(run_id=run_id).order_by(
-            TestResult.status.desc(),  # Failed first
+        # Counts per status in one grouped query
+        status_counts = dict(db.session.query(TestResult.status, func.count()).filter(
+            TestResult.run_id == run_id
+        ).group_by(TestResult.status).all())
+        
+        # Failures and the results table are paginated separately;
+        # (run_id, status, test_name) serves both filters and the ordering
+        failed_tests = TestResult.query.filter_by(run_id=run_id, status='failed').order_by(
             TestResult.test_name
-        ).all()
+        ).paginate(page=request.args.get('failed_page', 1, type=int), per_page=RESULTS_PER_PAGE,
+                   error_out=False)
         
-        # Get coverage for this run
-        coverage = CoverageReport.query.filter_by(run_id=run_id).all()
+        status = request.args.get('status', 'all')
+        results = TestResult.query.filter_by(run_id=run_id)
+        if status != 'all':
+            results = results.filter_by(status=status)
+        results = results.order_by(
+            TestResult.status,  # Failed first
+            TestResult.test_name
+        ).paginate(page=request.args.get('page', 1, type=int), per_page=RESULTS_PER_PAGE, error_out=False)
         
-        # Group by status
-        passed_tests = [r for r in results if r.status == 'passed']
-        failed_tests = [r for r in results if r.status == 'failed']
-        skipped_tests = [r for r in results if r.status == 'skipped']
+        # Per-module coverage with the change since the previous run
+        coverage, _ = coverage_with_deltas(run_id)
         
         return render_template('dashboard/run_details.html',
                              run=run,
                              results=results,
+                             status=status,
+                             status_counts=status_counts,
                              coverage=coverage,
-                             passed_tests=passed_tests,
-                             failed_tests=failed_tests,
-                             skipped_tests=skipped_tests)
+                             failed_tests=failed_tests)
     
     @app.route('/failures')
     def failures():
@@ -114,13 +132,109 @@ def create_dashboard_app():
     @app.route('/trends')
     def trends():
         """View test trends over time"""
-        # Get runs from last 30 days
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        runs = TestRun.query.filter(
-            TestRun.start_time >= thirty_days_ago
-        ).order_by(TestRun.start_time).all()
+        days = request.args.get('days', 30, type=int)
+        
+        return render_template('dashboard/trends.html',
+                             days=days,
+                             series=trend_series(days=days))
+    
+    @app.route('/flaky')
+    def flaky():
+        """Tests that flip between passing and failing, and the largest failure clusters"""
+        min_runs = request.args.get('min_runs', MIN_RUNS, type=int)
         
-        return render_template('dashboard/trends.html', runs=runs)
+        return render_template('dashboard/flaky.html',
+                             min_runs=min_runs,
+                             tests=flaky_tests(min_runs=min_runs),
+                             clusters=largest_clusters())
+    
+    def regression_run():
+        """Run selected with ?run=<id>, defaulting to the latest run"""
+        run_id = request.args.get('run', type=int)
+        if run_id:
+            return TestRun.query.get_or_404(run_id)
+        return TestRun.query.order_by(TestRun.start_time.desc()).first()
+    
+    @app.route('/regressions')
+    def regressions():
+        """Tests whose duration regressed against their recent baseline"""
+        run = regression_run()
+        window = request.args.get('window', DEFAULT_WINDOW, type=int)
+        found = find_run_regressions(run.id, window=window) if run else []
+        
+        return render_template('dashboard/regressions.html',
+                             run=run,
+                             window=window,
+                             regressions=found)
+    
+    def benchmark_history(limit):
+        """Median time per benchmark over the last `limit` benchmark runs, oldest first"""
+        runs = BenchmarkRun.query.order_by(BenchmarkRun.start_time.desc()).limit(limit).all()
+        runs.reverse()
+        
+        results = BenchmarkResult.query.filter(
+            BenchmarkResult.run_id.in_([r.id for r in runs])
+        ).all()
+        by_key = {(r.run_id, r.name): r for r in results}
+        groups = {r.name: r.group or '' for r in results}
+        names = sorted(groups, key=lambda n: (groups[n], n))
+        
+        history = {}
+        for name in names:
+            history[name] = [
+                by_key[(run.id, name)].median_us if (run.id, name) in by_key else None
+                for run in runs
+            ]
+        return runs, names, history, by_key
+    
+    @app.route('/benchmarks')
+    def benchmarks():
+        """Per-benchmark history from the microbenchmark suite"""
+        runs, names, history, by_key = benchmark_history(
+            request.args.get('runs', 30, type=int))
+        
+        latest = []
+        if runs:
+            last_run = runs[-1]
+            for name in names:
+                result = by_key.get((last_run.id, name))
+                if result is None:
+                    continue
+                values = [v for v in history[name][:-1] if v is not None]
+                change = None
+                if values:
+                    change = round((result.median_us / values[-1] - 1) * 100, 1)
+                latest.append({'result': result, 'change': change})
+        
+        return render_template('dashboard/benchmarks.html',
+                             runs=runs,
+                             labels=[r.start_time.strftime('%m/%d %H:%M') for r in runs],
+                             names=names,
+                             history=history,
+                             latest=latest)
+    
+    @app.route('/load-tests')
+    def load_tests():
+        """Load-test runs with per-endpoint latency for the selected run"""
+        runs = LoadTestRun.query.order_by(LoadTestRun.start_time.desc()).limit(50).all()
+        
+        selected = None
+        run_id = request.args.get('run', type=int)
+        if run_id:
+            selected = LoadTestRun.query.get_or_404(run_id)
+        elif runs:
+            selected = runs[0]
+        
+        endpoints = []
+        if selected:
+            endpoints = LoadTestResult.query.filter_by(run_id=selected.id).order_by(
+                LoadTestResult.endpoint
+            ).all()
+        
+        return render_template('dashboard/load_tests.html',
+                             runs=runs,
+                             selected=selected,
+                             endpoints=endpoints)
     
     # ==================== API ENDPOINTS ====================
     
@@ -152,23 +266,14 @@ def create_dashboard_app():
     
     @app.route('/api/trends')
     def api_trends():
-        """Get trend data for charts"""
+        """Get downsampled trend data for charts (min/avg/max per time bucket)"""
         days = request.args.get('days', 30, type=int)
-        start_date = datetime.utcnow() - timedelta(days=days)
-        
-        runs = TestRun.query.filter(
-            TestRun.start_time >= start_date
-        ).order_by(TestRun.start_time).all()
+        points = request.args.get('points', DEFAULT_POINTS, type=int)
         
-        return jsonify({
-            'dates': [r.start_time.strftime('%Y-%m-%d %H:%M') for r in runs],
-            'passed': [r.passed for r in runs],
-            'failed': [r.failed for r in runs],
-            'total': [r.total_tests for r in runs],
-            'pass_rate': [r.pass_rate for r in runs],
-            'coverage': [r.coverage for r in runs],
-            'duration': [r.duration for r in runs]
-        })
+        response = jsonify(trend_series(days=days, points=points))
+        response.add_etag()
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
     
     @app.route('/api/recent-failures')
     def api_recent_failures():
@@ -189,20 +294,158 @@ def create_dashboard_app():
     
     @app.route('/api/coverage')
     def api_coverage():
-        """Get latest coverage data"""
-        latest_run = TestRun.query.order_by(TestRun.start_time.desc()).first()
+        """Per-module coverage of a run (default: latest) with deltas against the previous run"""
+        run_id = request.args.get('run', type=int)
+        if not run_id:
+            latest_run = TestRun.query.order_by(TestRun.start_time.desc()).first()
+            if not latest_run:
+                return jsonify([])
+            run_id = latest_run.id
         
-        if not latest_run:
-            return jsonify([])
+        modules, _ = coverage_with_deltas(run_id)
+        return jsonify(modules)
+    
+    @app.route('/api/regressions')
+    def api_regressions():
+        """Duration regressions for a run (default: latest)"""
+        run = regression_run()
+        if not run:
+            return jsonify({'run_id': None, 'regressions': []})
         
-        coverage = CoverageReport.query.filter_by(run_id=latest_run.id).all()
+        window = request.args.get('window', DEFAULT_WINDOW, type=int)
+        return jsonify({
+            'run_id': run.run_id,
+            'window': window,
+            'regressions': find_run_regressions(run.id, window=window)
+        })
+    
+    @app.route('/api/benchmarks')
+    def api_benchmarks():
+        """Median microseconds per benchmark across recent runs"""
+        runs, names, history, _ = benchmark_history(request.args.get('runs', 30, type=int))
+        name = request.args.get('name')
+        if name:
+            history = {name: history.get(name, [])}
+        
+        return jsonify({
+            'runs': [{'run_id': r.run_id,
+                      'start_time': r.start_time.isoformat(),
+                      'git_commit': r.git_commit} for r in runs],
+            'median_us': history
+        })
+    
+    @app.route('/api/load-tests')
+    def api_load_tests():
+        """Throughput and p95 per endpoint across recent load-test runs"""
+        limit = request.args.get('limit', 50, type=int)
+        runs = LoadTestRun.query.order_by(LoadTestRun.start_time.desc()).limit(limit).all()
+        runs.reverse()
+        
+        results = LoadTestResult.query.filter(
+            LoadTestResult.run_id.in_([r.id for r in runs])
+        ).all()
+        by_run = {}
+        for result in results:
+            by_run.setdefault(result.run_id, {})[result.endpoint] = {
+                'requests': result.requests,
+                'errors': result.errors,
+                'throughput': result.throughput,
+                'p50_ms': result.p50_ms,
+                'p95_ms': result.p95_ms,
+                'p99_ms': result.p99_ms,
+            }
         
         return jsonify([{
-            'module': c.module_name,
-            'statements': c.statements,
-            'missing': c.missing,
-            'coverage': c.coverage_percent
-        } for c in coverage])
+            'run_id': r.run_id,
+            'start_time': r.start_time.isoformat(),
+            'concurrency': r.concurrency,
+            'throughput': r.throughput,
+            'errors': r.errors,
+            'endpoints': by_run.get(r.id, {})
+        } for r in runs])
+    
+    # ==================== INGESTION API ====================
+    
+    def run_progress(run):
+        """JSON view of a run's merged counters"""
+        return {
+            'id': run.id,
+            'run_id': run.run_id,
+            'status': run.status,
+            'total_tests': run.total_tests,
+            'passed': run.passed,
+            'failed': run.failed,
+            'skipped': run.skipped,
+            'errors': run.errors,
+            'pass_rate': run.pass_rate,
+            'duration': run.duration,
+            'start_time': run.start_time.isoformat(),
+            'end_time': run.end_time.isoformat() if run.end_time else None
+        }
+    
+    def get_run_or_404(run_id):
+        run = TestRun.query.filter_by(run_id=run_id).first()
+        if not run:
+            abort(404, description=f'Unknown run {run_id}')
+        return run
+    
+    @app.route('/api/runs', methods=['POST'])
+    def api_create_run():
+        """Start a run; every worker may call this with the same run_id"""
+        data = request.get_json(silent=True) or {}
+        run_id = str(data.get('run_id') or uuid.uuid4())
+        if len(run_id) > 50:
+            return jsonify({'error': 'run_id is too long'}), 400
+        
+        run, created = get_or_create_run(run_id)
+        return jsonify(run_progress(run)), 201 if created else 200
+    
+    @app.route('/api/runs/<run_id>', methods=['GET'])
+    def api_run(run_id):
+        """Live progress of a run"""
+        return jsonify(run_progress(get_run_or_404(run_id)))
+    
+    @app.route('/api/runs/<run_id>/results', methods=['POST'])
+    def api_add_results(run_id):
+        """Append a batch of results from one worker"""
+        run = get_run_or_404(run_id)
+        data = request.get_json(silent=True) or {}
+        results = data.get('results')
+        
+        if not isinstance(results, list):
+            return jsonify({'error': 'results must be a list'}), 400
+        for r in results:
+            if not isinstance(r, dict) or not r.get('test_name') or r.get('status') not in RESULT_STATUSES:
+                return jsonify({'error': 'each result needs test_name and a valid status'}), 400
+        
+        try:
+            added = add_results(run, results)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        progress = run_progress(run)
+        progress['added'] = added
+        return jsonify(progress)
+    
+    @app.route('/api/runs/<run_id>/finish', methods=['POST'])
+    def api_finish_run(run_id):
+        """Mark a run finished once all workers have reported"""
+        run = get_run_or_404(run_id)
+        data = request.get_json(silent=True) or {}
+        
+        modules = data.get('modules')
+        if modules is not None and not isinstance(modules, list):
+            return jsonify({'error': 'modules must be a list'}), 400
+        impact = data.get('impact')
+        if impact is not None and not isinstance(impact, dict):
+            return jsonify({'error': 'impact must be an object'}), 400
+        
+        finish_run(run, duration=data.get('duration'), coverage=data.get('coverage'),
+                   modules=modules, impact=impact)
+        db.session.commit()
+        return jsonify(run_progress(run))
     
     return app
 
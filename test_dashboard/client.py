@@ -0,0 +1,37 @@
+"""
+HTTP client for the test dashboard ingestion API.
+
+Used by the pytest collector when TEST_DASHBOARD_URL is set, so that each
+worker streams its results into one shared run while tests execute.
+Only the standard library is used so that test workers need no extra packages.
+"""
+import json
+import urllib.request
+
+
+class DashboardClient:
+    """Posts runs and result batches to a running test dashboard"""
+
+    def __init__(self, base_url, timeout=5.0):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def _post(self, path, payload):
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=json.dumps(payload).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read().decode('utf-8'))
+
+    def start_run(self, run_id):
+        return self._post('/api/runs', {'run_id': run_id})
+
+    def add_results(self, run_id, results):
+        return self._post(f'/api/runs/{run_id}/results', {'results': results})
+
+    def finish_run(self, run_id, duration=None, coverage=None, modules=None, impact=None):
+        return self._post(f'/api/runs/{run_id}/finish',
+                          {'duration': duration, 'coverage': coverage, 'modules': modules, 'impact': impact})
@@ -0,0 +1,94 @@
+"""
+Per-module coverage for the test dashboard.
+
+Statement and missing-line counts are read per measured file from a
+coverage.Coverage object (analysis2), so no text report is rendered and
+parsed. Rows are written to coverage_reports in one executemany INSERT,
+and deltas are computed against the previous run that recorded coverage.
+"""
+import os
+
+from sqlalchemy import func
+
+from test_dashboard.models import db, CoverageReport, TestRun
+
+
+def module_coverage(cov, source_dir, root):
+    """[{module, statements, missing}] for measured files under source_dir"""
+    source_dir = os.path.abspath(source_dir)
+    modules = []
+    for filename in sorted(cov.get_data().measured_files()):
+        # Compiled templates are traced too; only Python sources are reported
+        if not filename.startswith(source_dir + os.sep) or not filename.endswith('.py'):
+            continue
+        try:
+            _, statements, _, missing, _ = cov.analysis2(filename)
+        except Exception:
+            # Deleted or unparsable since it was measured
+            continue
+        modules.append({
+            'module': os.path.relpath(filename, root).replace(os.sep, '/'),
+            'statements': len(statements),
+            'missing': len(missing),
+        })
+    return modules
+
+
+def total_coverage(modules):
+    """Overall percentage, weighted by statements"""
+    statements = sum(m['statements'] for m in modules)
+    if not statements:
+        return 0.0
+    missing = sum(m['missing'] for m in modules)
+    return round((statements - missing) / statements * 100, 2)
+
+
+def save_module_coverage(test_run, modules):
+    """Replace a run's per-module rows; the caller commits"""
+    table = CoverageReport.__table__
+    db.session.execute(table.delete().where(table.c.run_id == test_run.id))
+    if not modules:
+        return 0
+
+    db.session.execute(table.insert(), [{
+        'run_id': test_run.id,
+        'module_name': m['module'],
+        'statements': m['statements'],
+        'missing': m['missing'],
+        'coverage_percent': round((m['statements'] - m['missing']) / m['statements'] * 100, 2)
+        if m['statements'] else 100.0,
+    } for m in modules])
+    return len(modules)
+
+
+def previous_coverage_run_id(run_id):
+    """Most recent earlier run that has per-module coverage"""
+    return db.session.query(func.max(CoverageReport.run_id)).filter(
+        CoverageReport.run_id < run_id
+    ).scalar()
+
+
+def coverage_delta(test_run):
+    """Change in total coverage points since the previous run with coverage"""
+    previous_id = previous_coverage_run_id(test_run.id)
+    if not previous_id:
+        return None
+    return round(test_run.coverage - db.session.get(TestRun, previous_id).coverage, 2)
+
+
+def coverage_with_deltas(run_id):
+    """A run's modules with the change in coverage points since the previous run"""
+    current = CoverageReport.query.filter_by(run_id=run_id).order_by(CoverageReport.module_name).all()
+    previous_id = previous_coverage_run_id(run_id)
+    previous = {}
+    if previous_id:
+        previous = {c.module_name: c.coverage_percent
+                    for c in CoverageReport.query.filter_by(run_id=previous_id)}
+
+    return [{
+        'module': c.module_name,
+        'statements': c.statements,
+        'missing': c.missing,
+        'coverage': c.coverage_percent,
+        'delta': round(c.coverage_percent - previous[c.module_name], 2) if c.module_name in previous else None,
+    } for c in current], previous_id
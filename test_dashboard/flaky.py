@@ -0,0 +1,164 @@
+"""
+Flaky-test statistics and failure clustering.
+
+Both indexes are maintained incrementally: every ingested batch is applied
+with INSERT ... ON CONFLICT DO UPDATE, so ingestion never rescans history.
+
+- test_stats counts runs, failures and flips (passed <-> failed between a
+  test's consecutive runs); a high flip rate marks a flaky test.
+- failure_clusters groups failures by a hash of the error message with
+  volatile parts (numbers, addresses, quoted values, paths) masked out.
+
+Rebuild both from the stored results with:
+    python -m test_dashboard.flaky --rebuild
+"""
+import argparse
+import hashlib
+import re
+from datetime import datetime
+
+from sqlalchemy import case
+from sqlalchemy.dialects.sqlite import insert
+
+from test_dashboard.models import db, TestRun, TestResult, TestStats, FailureCluster
+
+MIN_RUNS = 5  # runs before a test is ranked as flaky
+
+_NORMALIZERS = [
+    (re.compile(r'0x[0-9a-fA-F]+'), '0x?'),
+    (re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'), '<uuid>'),
+    (re.compile(r'(/[\w.\-]+)+/?'), '<path>'),
+    (re.compile(r"'[^']*'|\"[^\"]*\""), "'?'"),
+    (re.compile(r'\d+(\.\d+)?'), 'N'),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def normalize_error(message):
+    """Mask the parts of an error message that vary between occurrences"""
+    lines = (message or '').strip().splitlines()
+    text = lines[0] if lines else ''
+    for pattern, replacement in _NORMALIZERS:
+        text = pattern.sub(replacement, text)
+    return text.strip()[:500]
+
+
+def error_signature(message):
+    return hashlib.sha1(normalize_error(message).encode('utf-8')).hexdigest()[:16]
+
+
+def update_test_stats(run_id, results, now=None):
+    """Fold one batch of results into test_stats; the caller commits"""
+    now = now or datetime.utcnow()
+    rows = [{
+        'test_name': r['test_name'],
+        'runs': 1,
+        'failures': 1 if r['status'] == 'failed' else 0,
+        'flips': 0,
+        'last_status': r['status'],
+        'last_run_id': run_id,
+        'updated_at': now,
+    } for r in results if r['status'] in ('passed', 'failed')]
+    if not rows:
+        return 0
+
+    table = TestStats.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['test_name'],
+        set_={
+            'runs': table.c.runs + 1,
+            'failures': table.c.failures + stmt.excluded.failures,
+            'flips': table.c.flips + case((table.c.last_status != stmt.excluded.last_status, 1), else_=0),
+            'last_status': stmt.excluded.last_status,
+            'last_run_id': stmt.excluded.last_run_id,
+            'updated_at': stmt.excluded.updated_at,
+        }
+    )
+    db.session.execute(stmt, rows)
+    return len(rows)
+
+
+def update_failure_clusters(run_id, results, now=None):
+    """Fold the failures of one batch into failure_clusters; the caller commits"""
+    now = now or datetime.utcnow()
+    clusters = {}
+    for r in results:
+        if r['status'] != 'failed':
+            continue
+        message = r.get('error_message') or ''
+        signature = error_signature(message)
+        cluster = clusters.setdefault(signature, {
+            'signature': signature,
+            'normalized': normalize_error(message),
+            'sample_message': message[:1000],
+            'occurrences': 0,
+            'last_run_id': run_id,
+            'first_seen': now,
+            'last_seen': now,
+        })
+        cluster['occurrences'] += 1
+        cluster['last_test'] = r['test_name']
+    if not clusters:
+        return 0
+
+    table = FailureCluster.__table__
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['signature'],
+        set_={
+            'occurrences': table.c.occurrences + stmt.excluded.occurrences,
+            'last_test': stmt.excluded.last_test,
+            'last_run_id': stmt.excluded.last_run_id,
+            'last_seen': stmt.excluded.last_seen,
+        }
+    )
+    db.session.execute(stmt, list(clusters.values()))
+    return len(clusters)
+
+
+def analyze_results(run_id, results):
+    """Update both indexes with a batch of result dicts"""
+    update_test_stats(run_id, results)
+    update_failure_clusters(run_id, results)
+
+
+def flaky_tests(limit=25, min_runs=MIN_RUNS):
+    """Tests that flip most often between passing and failing"""
+    flip_rate = TestStats.flips * 1.0 / (TestStats.runs - 1)
+    return TestStats.query.filter(
+        TestStats.runs >= min_runs,
+        TestStats.flips > 0
+    ).order_by(flip_rate.desc(), TestStats.flips.desc()).limit(limit).all()
+
+
+def largest_clusters(limit=25):
+    return FailureCluster.query.order_by(FailureCluster.occurrences.desc()).limit(limit).all()
+
+
+def rebuild():
+    """Recompute both indexes from all stored results, oldest run first"""
+    TestStats.query.delete()
+    FailureCluster.query.delete()
+
+    for run in TestRun.query.order_by(TestRun.start_time, TestRun.id).all():
+        results = [{'test_name': r.test_name, 'status': r.status, 'error_message': r.error_message}
+                   for r in db.session.query(TestResult.test_name, TestResult.status,
+                                             TestResult.error_message).filter_by(run_id=run.id)]
+        now = run.start_time
+        update_test_stats(run.id, results, now=now)
+        update_failure_clusters(run.id, results, now=now)
+
+    db.session.commit()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Flaky-test and failure cluster indexes')
+    parser.add_argument('--rebuild', action='store_true', help='recompute from all stored results')
+    args = parser.parse_args()
+
+    if args.rebuild:
+        from test_dashboard.app import create_dashboard_app
+        with create_dashboard_app().app_context():
+            rebuild()
+            print(f'{TestStats.query.count()} tests, {FailureCluster.query.count()} failure clusters')
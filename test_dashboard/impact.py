@@ -0,0 +1,122 @@
+"""
+Coverage-based test impact selection.
+
+With `--cov=app --cov-context=test`, coverage records which test executed
+each line. After a run the collector turns that into one row per
+(test, file) in test_impact, with the lines stored as a compact range
+string ("1-12,15,20-31"). Only the tests that ran are replaced, so the map
+is updated incrementally and tests that were not selected keep their rows.
+
+Given changed files, impacted_tests() returns the tests that touched any
+of them, plus tests that have no mapping yet and tests in changed test
+modules. Any other change (conftest.py, requirements, ...) selects
+everything, and so does a source file no test is mapped to: coverage does
+not see templates or static files, and new modules have no rows yet.
+"""
+import os
+
+from test_dashboard.models import db, TestImpact
+
+
+def encode_lines(lines):
+    """[1, 2, 3, 7, 9, 10] -> '1-3,7,9-10'"""
+    parts = []
+    start = prev = None
+    for n in sorted(set(lines)):
+        if start is None:
+            start = prev = n
+        elif n == prev + 1:
+            prev = n
+        else:
+            parts.append(f'{start}-{prev}' if prev != start else str(start))
+            start = prev = n
+    if start is not None:
+        parts.append(f'{start}-{prev}' if prev != start else str(start))
+    return ','.join(parts)
+
+
+def decode_lines(text):
+    lines = []
+    for part in filter(None, (text or '').split(',')):
+        first, _, last = part.partition('-')
+        lines.extend(range(int(first), int(last or first) + 1))
+    return lines
+
+
+def context_test_name(context):
+    """pytest-cov contexts are '<nodeid>|setup', '<nodeid>|run' or '<nodeid>|teardown'"""
+    return context.rsplit('|', 1)[0] if '|' in context else context
+
+
+def collect_impact(cov, source_dir, root):
+    """{test_name: {file: [lines]}} for files under source_dir, from coverage contexts"""
+    source_dir = os.path.abspath(source_dir)
+    data = cov.get_data()
+    impact = {}
+    for filename in data.measured_files():
+        if not filename.startswith(source_dir + os.sep):
+            continue
+        path = os.path.relpath(filename, root).replace(os.sep, '/')
+        for lineno, contexts in data.contexts_by_lineno(filename).items():
+            for context in contexts:
+                if not context:
+                    continue  # executed outside any test (imports, collection)
+                impact.setdefault(context_test_name(context), {}).setdefault(path, []).append(lineno)
+    return impact
+
+
+def save_impact(run_id, impact):
+    """Replace the rows of the tests in `impact`; the caller commits"""
+    if not impact:
+        return 0
+
+    table = TestImpact.__table__
+    names = list(impact)
+    for i in range(0, len(names), 500):
+        db.session.execute(table.delete().where(table.c.test_name.in_(names[i:i + 500])))
+
+    rows = [{
+        'test_name': test_name,
+        'file_path': path,
+        'lines': encode_lines(lines),
+        'run_id': run_id,
+    } for test_name, files in impact.items() for path, lines in files.items()]
+    db.session.execute(table.insert(), rows)
+    return len(rows)
+
+
+def impacted_tests(test_names, changed_files, source_prefix='app/', test_prefix='tests/'):
+    """
+    Subset of test_names to run for changed_files (paths relative to the
+    project root). Returns (selected names, reason).
+    """
+    test_names = list(test_names)
+    changed = {path.replace(os.sep, '/') for path in changed_files}
+
+    # conftest.py, fixtures, requirements... can affect any test
+    unmapped = [p for p in changed if not p.startswith(source_prefix) and not (
+        p.startswith(test_prefix) and os.path.basename(p).startswith('test_'))]
+    if unmapped:
+        return test_names, f'unmapped changes: {", ".join(sorted(unmapped))}'
+
+    selected = set()
+    covered = set()
+    source_changes = [p for p in changed if p.startswith(source_prefix)]
+    for i in range(0, len(source_changes), 500):
+        for name, path in db.session.query(TestImpact.test_name, TestImpact.file_path).filter(
+                TestImpact.file_path.in_(source_changes[i:i + 500])).distinct():
+            selected.add(name)
+            covered.add(path)
+
+    # Templates, static files and new modules have no coverage rows
+    uncovered = [p for p in source_changes if p not in covered]
+    if uncovered:
+        return test_names, f'changes without coverage data: {", ".join(sorted(uncovered))}'
+
+    mapped = {name for (name,) in db.session.query(TestImpact.test_name).distinct()}
+    changed_tests = {p for p in changed if p.startswith(test_prefix)}
+    for name in test_names:
+        if name not in mapped or name.split('::')[0] in changed_tests:
+            selected.add(name)
+
+    return [name for name in test_names if name in selected], None
@@ -0,0 +1,125 @@
+"""
+Ingestion of test results.
+
+Results go through batched executemany INSERTs instead of one ORM object
+per test, and the run's counters are bumped with a single UPDATE per batch
+(`passed = passed + n`), so several workers can add results to the same
+run concurrently without losing counts. Each batch also updates the
+flaky-test and failure-cluster indexes (see test_dashboard.flaky).
+"""
+import time
+from datetime import datetime
+
+from sqlalchemy.exc import IntegrityError
+
+from test_dashboard.coverage_data import save_module_coverage, total_coverage
+from test_dashboard.flaky import analyze_results
+from test_dashboard.impact import save_impact
+from test_dashboard.models import db, TestRun, TestResult
+from test_dashboard.trends import refresh_rollups
+
+RESULT_STATUSES = ('passed', 'failed', 'skipped', 'error')
+
+
+def result_row(run_id, result, now):
+    """Map a collected result dict onto test_results columns"""
+    return {
+        'run_id': run_id,
+        'test_name': result['test_name'],
+        'test_file': result.get('test_file'),
+        'test_class': result.get('test_class'),
+        'status': result['status'],
+        'duration': result.get('duration') or 0.0,
+        'error_message': result.get('error_message'),
+        'stack_trace': TestResult.compress_traceback(result.get('traceback')),
+        'timestamp': now,
+    }
+
+
+def get_or_create_run(run_id):
+    """Return (TestRun, created). Safe when several workers start the same run."""
+    test_run = TestRun.query.filter_by(run_id=run_id).first()
+    if test_run:
+        return test_run, False
+
+    test_run = TestRun(run_id=run_id)
+    test_run.status = 'running'
+    db.session.add(test_run)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker created it first
+        db.session.rollback()
+        return TestRun.query.filter_by(run_id=run_id).one(), False
+    return test_run, True
+
+
+def add_results(test_run, results, batch_size=5000):
+    """Insert results for a run and update its counters; the caller commits"""
+    now = datetime.utcnow()
+    insert = TestResult.__table__.insert()
+
+    for i in range(0, len(results), batch_size):
+        batch = results[i:i + batch_size]
+        db.session.execute(insert, [result_row(test_run.id, r, now) for r in batch])
+
+        counts = {status: 0 for status in RESULT_STATUSES}
+        for r in batch:
+            counts[r['status']] += 1
+        db.session.execute(
+            TestRun.__table__.update()
+            .where(TestRun.id == test_run.id)
+            .values(total_tests=TestRun.total_tests + len(batch),
+                    passed=TestRun.passed + counts['passed'],
+                    failed=TestRun.failed + counts['failed'],
+                    skipped=TestRun.skipped + counts['skipped'],
+                    errors=TestRun.errors + counts['error'])
+        )
+        analyze_results(test_run.id, batch)
+
+    db.session.expire(test_run)
+    return len(results)
+
+
+def finish_run(test_run, duration=None, coverage=None, modules=None, impact=None):
+    """Mark a run finished; the status follows the merged counters and the trend rollups catch up"""
+    db.session.refresh(test_run)
+    test_run.end_time = datetime.utcnow()
+    test_run.duration = duration if duration is not None else (
+        test_run.end_time - test_run.start_time).total_seconds()
+    if modules is not None:
+        save_module_coverage(test_run, modules)
+        if coverage is None:
+            coverage = total_coverage(modules)
+    if coverage is not None:
+        test_run.coverage = coverage
+    if impact:
+        save_impact(test_run.id, impact)
+    test_run.status = 'passed' if not test_run.failed and not test_run.errors else 'failed'
+    refresh_rollups(days=[test_run.start_time.date()])
+    return test_run
+
+
+def ingest_run(run_id, results, duration=None, coverage=None, modules=None, impact=None):
+    """
+    Store a finished run and all its results in one transaction.
+    Returns (TestRun, seconds spent writing).
+
+    `results` are dicts with test_name, test_file, test_class, status, duration,
+    error_message and the uncompressed traceback; `modules` is per-module
+    coverage from test_dashboard.coverage_data and `impact` the per-test
+    line map from test_dashboard.impact. Results for a run_id that
+    already exists (another worker) are merged into it.
+    """
+    started = time.perf_counter()
+    test_run, _ = get_or_create_run(run_id)
+
+    try:
+        add_results(test_run, results)
+        finish_run(test_run, duration=duration, coverage=coverage, modules=modules, impact=impact)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return test_run, time.perf_counter() - started
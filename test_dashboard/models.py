@@ -1,15 +1,23 @@
+import zlib
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 
 db = SQLAlchemy()
 
+
+def ensure_indexes(engine):
+    """Create model indexes that are missing from an existing database"""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
 class TestRun(db.Model):
     """Represents a single test execution run"""
     __tablename__ = 'test_runs'
     
     id = db.Column(db.Integer, primary_key=True)
     run_id = db.Column(db.String(50), unique=True, nullable=False)
-    start_time = db.Column(db.DateTime, default=datetime.utcnow)
+    start_time = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     end_time = db.Column(db.DateTime)
     total_tests = db.Column(db.Integer, default=0)
     passed = db.Column(db.Integer, default=0)
@@ -40,6 +48,12 @@ class TestRun(db.Model):
 class TestResult(db.Model):
     """Represents individual test case result"""
     __tablename__ = 'test_results'
+    __table_args__ = (
+        # Per-test history lookups (duration baselines)
+        db.Index('ix_test_results_name_run', 'test_name', 'run_id'),
+        # Per-status listing of a run, ordered by name
+        db.Index('ix_test_results_run_status', 'run_id', 'status', 'test_name'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     run_id = db.Column(db.Integer, db.ForeignKey('test_runs.id'), nullable=False)
@@ -49,7 +63,7 @@ class TestResult(db.Model):
     status = db.Column(db.String(20), nullable=False)  # passed, failed, skipped, error
     duration = db.Column(db.Float, default=0.0)
     error_message = db.Column(db.Text)
-    stack_trace = db.Column(db.Text)
+    stack_trace = db.Column(db.LargeBinary)  # zlib-compressed full traceback
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     
     def __init__(self, run_id, test_name, status, duration=0.0, test_file=None, 
@@ -63,6 +77,20 @@ class TestResult(db.Model):
         self.error_message = error_message
         self.stack_trace = stack_trace
     
+    @staticmethod
+    def compress_traceback(text):
+        """Compress a traceback for the stack_trace column"""
+        return zlib.compress(text.encode('utf-8'), 6) if text else None
+    
+    @property
+    def traceback(self):
+        """Full traceback text"""
+        if not self.stack_trace:
+            return None
+        if isinstance(self.stack_trace, str):
+            return self.stack_trace
+        return zlib.decompress(self.stack_trace).decode('utf-8', 'replace')
+    
     def __repr__(self):
         return f'<TestResult {self.test_name}: {self.status}>'
 
@@ -79,4 +107,190 @@ class CoverageReport(db.Model):
     coverage_percent = db.Column(db.Float, default=0.0)
     
     def __repr__(self):
-        return f'<CoverageReport {self.module_name}: {self.coverage_percent}%>'
\ No newline at end of file
+        return f'<CoverageReport {self.module_name}: {self.coverage_percent}%>'
+
+
+class TestImpact(db.Model):
+    """Lines of one source file executed by one test (from coverage contexts)"""
+    __tablename__ = 'test_impact'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    test_name = db.Column(db.String(300), nullable=False, index=True)
+    file_path = db.Column(db.String(300), nullable=False, index=True)
+    lines = db.Column(db.Text)  # ranges, e.g. "1-12,15,20-31"
+    run_id = db.Column(db.Integer)
+    
+    def __repr__(self):
+        return f'<TestImpact {self.test_name} -> {self.file_path}>'
+
+
+class TrendRollup(db.Model):
+    """Daily aggregate of one trend metric over all runs started that day"""
+    __tablename__ = 'trend_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('day', 'metric', name='uq_trend_rollups_day_metric'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False, index=True)
+    metric = db.Column(db.String(20), nullable=False)
+    samples = db.Column(db.Integer, default=0)
+    total = db.Column(db.Float, default=0.0)
+    minimum = db.Column(db.Float)
+    maximum = db.Column(db.Float)
+    
+    def __repr__(self):
+        return f'<TrendRollup {self.day} {self.metric}>'
+
+
+class TestStats(db.Model):
+    """Running pass/fail statistics per test, updated on ingestion"""
+    __tablename__ = 'test_stats'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    test_name = db.Column(db.String(300), unique=True, nullable=False)
+    runs = db.Column(db.Integer, default=0)
+    failures = db.Column(db.Integer, default=0)
+    flips = db.Column(db.Integer, default=0)  # passed <-> failed changes between consecutive runs
+    last_status = db.Column(db.String(20))
+    last_run_id = db.Column(db.Integer)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @property
+    def flip_rate(self):
+        if self.runs > 1:
+            return round(self.flips / (self.runs - 1) * 100, 1)
+        return 0
+    
+    @property
+    def failure_rate(self):
+        if self.runs:
+            return round(self.failures / self.runs * 100, 1)
+        return 0
+    
+    def __repr__(self):
+        return f'<TestStats {self.test_name}: {self.flips} flips>'
+
+
+class FailureCluster(db.Model):
+    """Failures grouped by normalized error signature"""
+    __tablename__ = 'failure_clusters'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    signature = db.Column(db.String(16), unique=True, nullable=False)
+    normalized = db.Column(db.Text)
+    sample_message = db.Column(db.Text)
+    occurrences = db.Column(db.Integer, default=0)
+    last_test = db.Column(db.String(300))
+    last_run_id = db.Column(db.Integer)
+    first_seen = db.Column(db.DateTime, default=datetime.utcnow)
+    last_seen = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<FailureCluster {self.signature}: {self.occurrences}>'
+
+
+class LoadTestRun(db.Model):
+    """A load-test run of the banking app (benchmarks/load_test.py)"""
+    __tablename__ = 'load_test_runs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.String(50), unique=True, nullable=False)
+    start_time = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    duration = db.Column(db.Float, default=0.0)
+    concurrency = db.Column(db.Integer, default=1)
+    scenario = db.Column(db.String(200))  # e.g. "dashboard=30,history=20,..."
+    total_requests = db.Column(db.Integer, default=0)
+    errors = db.Column(db.Integer, default=0)
+    throughput = db.Column(db.Float, default=0.0)  # requests per second
+    
+    endpoints = db.relationship('LoadTestResult', backref='load_test_run', lazy=True,
+                                cascade='all, delete-orphan')
+    
+    def __init__(self, run_id, concurrency=1, scenario=None):
+        self.run_id = run_id
+        self.concurrency = concurrency
+        self.scenario = scenario
+        self.start_time = datetime.utcnow()
+    
+    @property
+    def error_rate(self):
+        if self.total_requests > 0:
+            return round((self.errors / self.total_requests) * 100, 2)
+        return 0
+    
+    def __repr__(self):
+        return f'<LoadTestRun {self.run_id}>'
+
+
+class LoadTestResult(db.Model):
+    """Latency and throughput of one endpoint within a load-test run"""
+    __tablename__ = 'load_test_results'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey('load_test_runs.id'), nullable=False, index=True)
+    endpoint = db.Column(db.String(100), nullable=False)
+    requests = db.Column(db.Integer, default=0)
+    errors = db.Column(db.Integer, default=0)
+    throughput = db.Column(db.Float, default=0.0)
+    mean_ms = db.Column(db.Float, default=0.0)
+    p50_ms = db.Column(db.Float, default=0.0)
+    p95_ms = db.Column(db.Float, default=0.0)
+    p99_ms = db.Column(db.Float, default=0.0)
+    max_ms = db.Column(db.Float, default=0.0)
+    
+    def __repr__(self):
+        return f'<LoadTestResult {self.endpoint}: p95 {self.p95_ms}ms>'
+
+
+class BenchmarkRun(db.Model):
+    """A run of the microbenchmark suite (benchmarks/microbench.py)"""
+    __tablename__ = 'benchmark_runs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.String(50), unique=True, nullable=False)
+    start_time = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    git_commit = db.Column(db.String(40))
+    python_version = db.Column(db.String(20))
+    machine = db.Column(db.String(100))
+    
+    results = db.relationship('BenchmarkResult', backref='benchmark_run', lazy=True,
+                              cascade='all, delete-orphan')
+    
+    def __init__(self, run_id, git_commit=None, python_version=None, machine=None):
+        self.run_id = run_id
+        self.git_commit = git_commit
+        self.python_version = python_version
+        self.machine = machine
+        self.start_time = datetime.utcnow()
+    
+    def __repr__(self):
+        return f'<BenchmarkRun {self.run_id}>'
+
+
+class BenchmarkResult(db.Model):
+    """Timing of one benchmark in a run; times are microseconds per operation"""
+    __tablename__ = 'benchmark_results'
+    __table_args__ = (
+        db.Index('ix_benchmark_results_name_run', 'name', 'run_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey('benchmark_runs.id'), nullable=False, index=True)
+    name = db.Column(db.String(100), nullable=False)
+    group = db.Column(db.String(50))
+    loops = db.Column(db.Integer, default=1)   # operations per timed repeat
+    repeat = db.Column(db.Integer, default=1)
+    min_us = db.Column(db.Float, default=0.0)
+    median_us = db.Column(db.Float, default=0.0)
+    mean_us = db.Column(db.Float, default=0.0)
+    stdev_us = db.Column(db.Float, default=0.0)
+    
+    @property
+    def ops_per_sec(self):
+        if self.median_us > 0:
+            return round(1_000_000 / self.median_us, 1)
+        return 0
+    
+    def __repr__(self):
+        return f'<BenchmarkResult {self.name}: {self.median_us}us>'
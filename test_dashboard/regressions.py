@@ -0,0 +1,115 @@
+"""
+Test duration baselines and performance regression detection.
+
+A test's baseline is the mean and standard deviation of its duration over
+its last N passing runs. A new duration is a regression when it is
+statistically unusual (z-score) *and* materially slower, so that noise on
+millisecond-scale tests does not trip the gate.
+"""
+import math
+from collections import namedtuple
+
+from sqlalchemy import func
+
+from test_dashboard.models import db, TestRun, TestResult
+
+Baseline = namedtuple('Baseline', 'samples mean stdev')
+
+DEFAULT_WINDOW = 20          # passing runs per test in the baseline
+DEFAULT_MIN_SAMPLES = 5      # fewer samples -> no verdict
+DEFAULT_Z_THRESHOLD = 3.0    # standard deviations above the mean
+DEFAULT_MIN_RATIO = 1.5      # and at least this many times the mean
+DEFAULT_MIN_DELTA = 0.05     # and at least this many seconds slower
+
+
+def compute_baselines(test_names=None, window=DEFAULT_WINDOW, before_run_id=None, lookback_runs=None):
+    """
+    Return {test_name: Baseline} from the last `window` passing results per test.
+
+    Only the most recent `lookback_runs` runs (default 3 x window) are scanned,
+    so the cost stays bounded as history grows; the (test_name, run_id) index
+    keeps each test's range scan short.
+    """
+    lookback_runs = lookback_runs or window * 3
+
+    runs = db.session.query(TestRun.id)
+    if before_run_id is not None:
+        runs = runs.filter(TestRun.id < before_run_id)
+    run_ids = [r.id for r in runs.order_by(TestRun.id.desc()).limit(lookback_runs)]
+    if not run_ids:
+        return {}
+
+    query = db.session.query(
+        TestResult.test_name,
+        TestResult.duration,
+        func.row_number().over(
+            partition_by=TestResult.test_name,
+            order_by=TestResult.run_id.desc()
+        ).label('rn')
+    ).filter(
+        TestResult.run_id >= min(run_ids),
+        TestResult.run_id <= max(run_ids),
+        TestResult.status == 'passed'
+    )
+    if test_names is not None:
+        query = query.filter(TestResult.test_name.in_(list(test_names)))
+    ranked = query.subquery()
+
+    rows = db.session.query(
+        ranked.c.test_name,
+        func.count(),
+        func.avg(ranked.c.duration),
+        func.avg(ranked.c.duration * ranked.c.duration)
+    ).filter(ranked.c.rn <= window).group_by(ranked.c.test_name)
+
+    baselines = {}
+    for name, count, mean, mean_sq in rows:
+        variance = max((mean_sq or 0) - (mean or 0) ** 2, 0.0)
+        # Sample standard deviation
+        if count > 1:
+            variance *= count / (count - 1)
+        baselines[name] = Baseline(count, mean or 0.0, math.sqrt(variance))
+    return baselines
+
+
+def check_duration(duration, baseline, z_threshold=DEFAULT_Z_THRESHOLD, min_ratio=DEFAULT_MIN_RATIO,
+                   min_delta=DEFAULT_MIN_DELTA, min_samples=DEFAULT_MIN_SAMPLES):
+    """Return a regression dict if `duration` regresses against `baseline`, else None"""
+    if baseline is None or baseline.samples < min_samples:
+        return None
+
+    delta = duration - baseline.mean
+    if delta < min_delta or duration < baseline.mean * min_ratio:
+        return None
+
+    # Floor the spread so perfectly stable tests do not give infinite z-scores
+    stdev = max(baseline.stdev, baseline.mean * 0.05, 1e-6)
+    z_score = delta / stdev
+    if z_score < z_threshold:
+        return None
+
+    return {
+        'duration': duration,
+        'baseline_mean': baseline.mean,
+        'baseline_stdev': baseline.stdev,
+        'samples': baseline.samples,
+        'z_score': round(z_score, 2),
+        'ratio': round(duration / baseline.mean, 2) if baseline.mean else None,
+    }
+
+
+def find_run_regressions(run_id, window=DEFAULT_WINDOW, **thresholds):
+    """Regressions of one stored run against the runs before it, worst first"""
+    results = TestResult.query.filter_by(run_id=run_id, status='passed').all()
+    baselines = compute_baselines([r.test_name for r in results], window=window, before_run_id=run_id)
+
+    regressions = []
+    for result in results:
+        regression = check_duration(result.duration, baselines.get(result.test_name), **thresholds)
+        if regression:
+            regression['test_name'] = result.test_name
+            regression['test_file'] = result.test_file
+            regressions.append(regression)
+
+    regressions.sort(key=lambda r: r['z_score'], reverse=True)
+    return regressions
@@ -0,0 +1,135 @@
+"""
+History-driven test sharding.
+
+Tests are assigned to shards longest-processing-time-first (LPT): sorted by
+their mean duration over recent passing runs, each test goes to the shard
+with the smallest total so far. Tests without history get the median known
+duration. The naive plan splits test files into equal-count contiguous
+chunks, which is what splitting "by file" does.
+
+Every shard computes the plan on its own, so all of them must read the
+same history: pinned_durations() only uses runs with ids below a cutoff
+chosen once for the whole CI pipeline, and rejects cutoffs that runs
+recorded later could still fall under.
+
+Compare both plans for the tests of the latest run with:
+    python -m test_dashboard.sharding --shards 4
+"""
+import argparse
+import heapq
+import statistics
+
+from sqlalchemy import func
+
+from test_dashboard.regressions import compute_baselines
+
+DEFAULT_DURATION = 1.0  # seconds, when there is no history at all
+
+
+def historical_durations(test_names, window=10, before_run_id=None):
+    """{test_name: mean duration} for tests with passing history"""
+    return {name: b.mean for name, b in compute_baselines(
+        test_names, window=window, before_run_id=before_run_id).items()}
+
+
+def latest_run_id():
+    from test_dashboard.models import db, TestRun
+    return db.session.query(func.max(TestRun.id)).scalar() or 0
+
+
+def pinned_durations(test_names, before_run_id, window=10):
+    """
+    Durations from runs with id < before_run_id only; 0 uses no history.
+    Raises ValueError when before_run_id is past the next run id, since
+    runs recorded later would then change the plan.
+    """
+    if before_run_id <= 0:
+        return {}
+    if before_run_id > latest_run_id() + 1:
+        raise ValueError(f'no run with id {before_run_id - 1} yet; pin to at most {latest_run_id() + 1}')
+    return historical_durations(test_names, window=window, before_run_id=before_run_id)
+
+
+def estimate(test_names, durations):
+    """Durations for every test, filling gaps with the median known duration"""
+    default = statistics.median(durations.values()) if durations else DEFAULT_DURATION
+    return {name: durations.get(name, default) for name in test_names}
+
+
+def plan_lpt(estimates, shards):
+    """Assign tests to `shards` buckets, longest first. Returns (assignment, loads)."""
+    assignment = [[] for _ in range(shards)]
+    loads = [0.0] * shards
+    heap = [(0.0, i) for i in range(shards)]
+
+    for name in sorted(estimates, key=lambda n: (-estimates[n], n)):
+        load, i = heapq.heappop(heap)
+        assignment[i].append(name)
+        loads[i] = load + estimates[name]
+        heapq.heappush(heap, (loads[i], i))
+
+    return assignment, loads
+
+
+def plan_by_file(estimates, shards):
+    """Split test files into equal-count contiguous chunks. Returns (assignment, loads)."""
+    files = {}
+    for name in estimates:
+        files.setdefault(name.split('::')[0], []).append(name)
+    ordered = sorted(files)
+
+    assignment = [[] for _ in range(shards)]
+    for index, filename in enumerate(ordered):
+        assignment[index * shards // max(len(ordered), 1)].extend(files[filename])
+    loads = [sum(estimates[n] for n in bucket) for bucket in assignment]
+    return assignment, loads
+
+
+def compare_plans(estimates, shards):
+    """Makespan (slowest shard) of the LPT and file-count plans"""
+    _, lpt_loads = plan_lpt(estimates, shards)
+    _, naive_loads = plan_by_file(estimates, shards)
+    lpt, naive = max(lpt_loads, default=0.0), max(naive_loads, default=0.0)
+    return {
+        'shards': shards,
+        'tests': len(estimates),
+        'total': sum(estimates.values()),
+        'lpt_makespan': lpt,
+        'naive_makespan': naive,
+        'speedup': round(naive / lpt, 2) if lpt else None,
+        'lpt_loads': lpt_loads,
+        'naive_loads': naive_loads,
+    }
+
+
+def main():
+    from test_dashboard.app import create_dashboard_app
+    from test_dashboard.models import TestRun, TestResult
+
+    parser = argparse.ArgumentParser(description='Compare LPT and by-file shard plans')
+    parser.add_argument('--shards', type=int, default=4)
+    parser.add_argument('--window', type=int, default=10, help='passing runs per test to average')
+    args = parser.parse_args()
+
+    with create_dashboard_app().app_context():
+        latest = TestRun.query.order_by(TestRun.start_time.desc()).first()
+        if not latest:
+            print('No test runs recorded yet')
+            return
+        names = [r.test_name for r in TestResult.query.filter_by(run_id=latest.id)]
+        pin = latest_run_id() + 1
+        estimates = estimate(names, pinned_durations(names, pin, window=args.window))
+
+    result = compare_plans(estimates, args.shards)
+    print(f"{result['tests']} tests, {result['total']:.1f}s serial, {args.shards} shards")
+    print(f"by file: makespan {result['naive_makespan']:.1f}s  "
+          f"[{', '.join(f'{l:.1f}' for l in result['naive_loads'])}]")
+    print(f"LPT:     makespan {result['lpt_makespan']:.1f}s  "
+          f"[{', '.join(f'{l:.1f}' for l in result['lpt_loads'])}]")
+    if result['speedup']:
+        print(f"LPT is {result['speedup']}x faster than splitting by file")
+    print(f"Pin every shard to this history with --shard-history-before {pin}")
+
+
+if __name__ == '__main__':
+    main()
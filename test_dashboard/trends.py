@@ -0,0 +1,171 @@
+"""
+Downsampled trend series.
+
+The requested window is split into `points` time buckets and each metric is
+reduced to min/avg/max per bucket in SQL. Days older than RAW_DAYS are read
+from pre-aggregated daily rollups (TrendRollup) instead of test_runs, so the
+cost of a trend query does not grow with the length of the history.
+
+Rollups are written when a run is finished (test_dashboard.ingest) or with
+`python -m test_dashboard.trends --refresh`; reading trends never writes.
+"""
+import argparse
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Integer, case, cast, func, or_
+
+from test_dashboard.models import db, TestRun, TrendRollup
+
+RAW_DAYS = 7          # recent days are bucketed from raw runs
+DEFAULT_POINTS = 200
+MAX_POINTS = 1000
+
+EPOCH = datetime(1970, 1, 1)
+JULIAN_EPOCH = 2440587.5  # julianday('1970-01-01')
+
+METRICS = {
+    'pass_rate': case((TestRun.total_tests > 0, TestRun.passed * 100.0 / TestRun.total_tests), else_=0.0),
+    'passed': TestRun.passed,
+    'failed': TestRun.failed,
+    'total': TestRun.total_tests,
+    'coverage': TestRun.coverage,
+    'duration': TestRun.duration,
+}
+
+
+def aggregate_columns():
+    """count/sum/min/max for every metric, in METRICS order"""
+    columns = []
+    for expr in METRICS.values():
+        columns += [func.count(expr), func.sum(expr), func.min(expr), func.max(expr)]
+    return columns
+
+
+def raw_horizon(now=None):
+    """Start of the period served from raw runs"""
+    today = (now or datetime.utcnow()).date()
+    return today - timedelta(days=RAW_DAYS)
+
+
+def rolled_up_until():
+    """First day with no rollup after the last rolled-up one (None before the first refresh)"""
+    last_day = db.session.query(func.max(TrendRollup.day)).scalar()
+    return last_day + timedelta(days=1) if last_day else None
+
+
+def refresh_rollups(now=None, days=()):
+    """
+    Roll up complete days older than the raw horizon that are not rolled up
+    yet, and recompute any of `days` that already are (a run that arrived
+    late). Writes in the caller's transaction; returns the days written.
+    """
+    horizon = raw_horizon(now)
+    start = rolled_up_until()
+    late = sorted({day.isoformat() for day in days if start and day < start})
+
+    day_expr = func.date(TestRun.start_time)
+    query = db.session.query(day_expr, *aggregate_columns()).filter(
+        TestRun.start_time < datetime.combine(horizon, datetime.min.time())
+    )
+    stale = TrendRollup.query
+    if start:
+        query = query.filter(or_(TestRun.start_time >= datetime.combine(start, datetime.min.time()),
+                                 day_expr.in_(late)))
+        stale = stale.filter(or_(TrendRollup.day >= start,
+                                 TrendRollup.day.in_([date.fromisoformat(day) for day in late])))
+    stale.delete(synchronize_session=False)
+
+    added = 0
+    for row in query.group_by(day_expr):
+        day = date.fromisoformat(row[0])
+        for i, metric in enumerate(METRICS):
+            samples, total, minimum, maximum = row[1 + i * 4:5 + i * 4]
+            db.session.add(TrendRollup(day=day, metric=metric, samples=samples, total=total or 0.0,
+                                       minimum=minimum, maximum=maximum))
+        added += 1
+    db.session.flush()
+    return added
+
+
+def rebuild_rollups(now=None):
+    """Recompute every rollup from test_runs; returns the days written"""
+    TrendRollup.query.delete(synchronize_session=False)
+    return refresh_rollups(now)
+
+
+def trend_series(days=30, points=DEFAULT_POINTS, now=None):
+    """
+    Min/avg/max per time bucket for each metric over the last `days` days.
+
+    Buckets are aligned to multiples of their width since the epoch, so a
+    response only changes when a bucket in the window does. Empty buckets
+    are omitted.
+    """
+    now = now or datetime.utcnow()
+    points = max(1, min(points, MAX_POINTS))
+    start = now - timedelta(days=days)
+    width = max(days * 86400 / points, 60.0)
+    # Days the rollups do not cover yet (they are refreshed on ingestion)
+    # are read from raw runs as well
+    covered = rolled_up_until()
+    horizon = datetime.combine(min(raw_horizon(now), covered) if covered else EPOCH.date(), datetime.min.time())
+
+    buckets = {}
+
+    def merge(bucket, metric, samples, total, minimum, maximum):
+        if not samples:
+            return
+        entry = buckets.setdefault(bucket, {}).setdefault(metric, [0, 0.0, minimum, maximum])
+        entry[0] += samples
+        entry[1] += total or 0.0
+        entry[2] = min(entry[2], minimum)
+        entry[3] = max(entry[3], maximum)
+
+    # Old days from rollups, one row per day and metric
+    if start < horizon:
+        rollups = TrendRollup.query.filter(
+            TrendRollup.day >= start.date(),
+            TrendRollup.day < horizon.date()
+        )
+        for r in rollups:
+            seconds = (datetime.combine(r.day, datetime.min.time()) - EPOCH).total_seconds()
+            merge(int(seconds // width), r.metric, r.samples, r.total, r.minimum, r.maximum)
+
+    # Recent runs bucketed in SQL
+    bucket_expr = cast((func.julianday(TestRun.start_time) - JULIAN_EPOCH) * 86400 / width, Integer)
+    rows = db.session.query(bucket_expr, *aggregate_columns()).filter(
+        TestRun.start_time >= max(start, horizon)
+    ).group_by(bucket_expr)
+    for row in rows:
+        for i, metric in enumerate(METRICS):
+            merge(row[0], metric, *row[1 + i * 4:5 + i * 4])
+
+    label_format = '%Y-%m-%d' if width >= 86400 else '%Y-%m-%d %H:%M'
+    ordered = sorted(buckets)
+    series = {
+        'dates': [(EPOCH + timedelta(seconds=b * width)).strftime(label_format) for b in ordered],
+        'runs': [buckets[b]['total'][0] for b in ordered],
+        'bucket_seconds': width,
+        'min': {},
+        'max': {},
+    }
+    for metric in METRICS:
+        values = [buckets[b].get(metric) for b in ordered]
+        series[metric] = [round(v[1] / v[0], 2) if v else None for v in values]
+        series['min'][metric] = [round(v[2], 2) if v else None for v in values]
+        series['max'][metric] = [round(v[3], 2) if v else None for v in values]
+    return series
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Daily trend rollups')
+    parser.add_argument('--refresh', action='store_true', help='roll up days that crossed the raw horizon')
+    parser.add_argument('--rebuild', action='store_true', help='recompute every day from stored runs')
+    args = parser.parse_args()
+
+    if args.refresh or args.rebuild:
+        from test_dashboard.app import create_dashboard_app
+        with create_dashboard_app().app_context():
+            days = rebuild_rollups() if args.rebuild else refresh_rollups()
+            db.session.commit()
+            print(f'{days} days rolled up')
@@ -1,9 +1,10 @@
+import functools
 import pytest
 import time
 import uuid
 import os
+import subprocess
 import sys
-from datetime import datetime
 #How Pytest Discovers This Plugin
 
 try:
@@ -14,6 +15,13 @@ except ImportError:
 # Add project root to Python path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
+from flask.globals import app_ctx
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import StaticPool
+from werkzeug.security import generate_password_hash
+
 from app import create_app, db
 from app.models.user import User
 from app.models.account import Account
@@ -24,6 +32,10 @@ from app.models.transaction import Transaction
 # TEST DASHBOARD COLLECTOR
 # ============================================================
 
+# Results are streamed to TEST_DASHBOARD_URL in batches of this size
+STREAM_BATCH_SIZE = 50
+
+
 class TestResultCollector:
     """Collects test results to save to dashboard"""
     
@@ -34,82 +46,323 @@ class TestResultCollector:
         self.passed = 0
         self.failed = 0
         self.skipped = 0
+        self.baselines = {}
+        self.regressions = []
+        self.client = None
+        self.streamed = 0
+        self.shard_plan = None
+        self.impact_selection = None
     
     def reset(self):
-        self.run_id = str(uuid.uuid4())
+        # Workers share the controller's run id so their results merge into one run
+        self.run_id = os.environ.get('TEST_DASHBOARD_RUN_ID') or str(uuid.uuid4())
         self.start_time = time.time()
         self.results = []
         self.passed = 0
         self.failed = 0
         self.skipped = 0
+        self.baselines = {}
+        self.regressions = []
+        self.client = None
+        self.streamed = 0
+        self.shard_plan = None
+        self.impact_selection = None
+    
+    def flush(self):
+        """Send results that have not been streamed yet"""
+        pending = self.results[self.streamed:]
+        if not self.client or not pending:
+            return
+        try:
+            self.client.add_results(self.run_id, pending)
+            self.streamed += len(pending)
+        except Exception as e:
+            print(f"\nDashboard streaming stopped: {e}")
+            self.client = None
 
 # Global collector
 collector = TestResultCollector()
 
 
-def get_actual_coverage(session=None):
+def get_coverage(session=None):
     """
-    Extract coverage percentage by running coverage report and parsing output.
-    This is simpler and more reliable than accessing coverage internals.
+    Coverage data for this run: the live pytest-cov object when --cov is
+    active, else the .coverage file in the project root. Returns
+    (Coverage or None, live).
     """
     if coverage is None:
-        return 0.0
+        return None, False
+    
+    plugin = session.config.pluginmanager.getplugin('_cov') if session else None
+    if plugin is not None and getattr(plugin, 'cov_controller', None) is not None:
+        return plugin.cov_controller.cov, True
     
+    coverage_file = os.path.join(project_root, '.coverage')
+    if not os.path.exists(coverage_file):
+        return None, False
     try:
-        # Look for .coverage file in the project root
-        coverage_file = os.path.join(project_root, '.coverage')
-        
-        if not os.path.exists(coverage_file):
-            return 0.0
-        
-        # Load the coverage data and generate report
         cov = coverage.Coverage(data_file=coverage_file, auto_data=False)
         cov.load()
+        return cov, False
+    except Exception:
+        return None, False
+
+
+def get_module_coverage(cov):
+    """Per-module statement and missing counts for app/, read straight from coverage data"""
+    if cov is None:
+        return None
+    try:
+        from test_dashboard.coverage_data import module_coverage
+        return module_coverage(cov, os.path.join(project_root, 'app'), project_root)
+    except Exception:
+        return None
+
+
+def get_test_impact(cov, live):
+    """Files and lines of app/ each test executed (needs --cov-context=test)"""
+    if cov is None or not live:
+        return None
+    try:
+        from test_dashboard.impact import collect_impact
+        return collect_impact(cov, os.path.join(project_root, 'app'), project_root) or None
+    except Exception:
+        return None
+
+
+def pytest_addoption(parser):
+    """Command line options for the dashboard plugins"""
+    group = parser.getgroup('perf-gate', 'performance regression gate')
+    group.addoption('--perf-gate', choices=['off', 'warn', 'fail'], default='warn',
+                    help='flag (warn) or fail tests whose duration regresses against '
+                         'their dashboard history (default: warn)')
+    group.addoption('--perf-window', type=int, default=20,
+                    help='number of previous passing runs per test in the baseline')
+    group.addoption('--perf-z', type=float, default=3.0,
+                    help='standard deviations above the baseline mean that count as a regression')
+    
+    group = parser.getgroup('sharding', 'history-driven test sharding')
+    group.addoption('--num-shards', type=int, default=1,
+                    help='split the collected tests into this many shards balanced by past durations')
+    group.addoption('--shard-id', type=int, default=0,
+                    help='run only this shard (0-based)')
+    group.addoption('--shard-window', type=int, default=10,
+                    help='number of previous passing runs per test used to estimate durations')
+    group.addoption('--shard-history-before', type=int, metavar='RUN_ID',
+                    help='estimate durations from dashboard runs with a lower id only; required with '
+                         '--num-shards and the same for every shard (0 = no history, split by count)')
+    
+    group = parser.getgroup('impact', 'coverage-based test impact selection')
+    group.addoption('--changed-files', action='append', default=[],
+                    help='run only tests that executed these files (comma-separated, repeatable)')
+    group.addoption('--changed-since', metavar='REF',
+                    help='run only tests impacted by files changed since this git ref')
+
+
+def pytest_collection_modifyitems(session, config, items):
+    """Select impacted tests, load duration history and select this run's shard"""
+    if not items:
+        return
+    
+    gate = config.getoption('--perf-gate') != 'off'
+    num_shards = config.getoption('--num-shards')
+    if num_shards > 1 and not 0 <= config.getoption('--shard-id') < num_shards:
+        raise pytest.UsageError(f"--shard-id must be between 0 and {num_shards - 1}")
+    history_before = config.getoption('--shard-history-before')
+    if num_shards > 1 and history_before is None:
+        raise pytest.UsageError("--num-shards needs --shard-history-before RUN_ID so that every shard plans "
+                                "from the same history (see python -m test_dashboard.sharding, or 0 for none)")
+    changed = get_changed_files(config)
+    
+    durations = {}
+    if gate or num_shards > 1 or changed is not None:
+        try:
+            from test_dashboard.app import create_dashboard_app
+            from test_dashboard.regressions import compute_baselines
+            from test_dashboard.sharding import pinned_durations
+            
+            app = create_dashboard_app()
+            with app.app_context():
+                if changed is not None:
+                    select_impacted(config, items, changed)
+                names = [item.nodeid for item in items]
+                if gate:
+                    collector.baselines = compute_baselines(names, window=config.getoption('--perf-window'))
+                if num_shards > 1:
+                    durations = pinned_durations(names, history_before, window=config.getoption('--shard-window'))
+        except Exception as e:
+            # A shard planning without the history the others used would run a different split
+            if num_shards > 1 and history_before:
+                raise pytest.UsageError(f"Shard history unavailable: {e}")
+            print(f"\nDashboard history unavailable: {e}")
+    
+    # Without history every test gets the same estimate, which still splits evenly by count
+    if num_shards > 1:
+        select_shard(config, items, durations, num_shards, config.getoption('--shard-id'))
+
+
+def get_changed_files(config):
+    """Changed paths from --changed-files / --changed-since, or None when neither is given"""
+    changed = [p.strip() for value in config.getoption('--changed-files')
+               for p in value.split(',') if p.strip()]
+    ref = config.getoption('--changed-since')
+    if ref:
+        try:
+            output = subprocess.run(['git', 'diff', '--name-only', ref], cwd=project_root,
+                                    capture_output=True, text=True, check=True).stdout
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise pytest.UsageError(f"--changed-since: git diff failed: {e}")
+        changed.extend(line.strip() for line in output.splitlines() if line.strip())
+    if not changed and not ref:
+        return None
+    return changed
+
+
+def select_impacted(config, items, changed):
+    """Keep only the tests whose recorded coverage touches a changed file"""
+    from test_dashboard.impact import impacted_tests
+    
+    keep, reason = impacted_tests([item.nodeid for item in items], changed)
+    keep = set(keep)
+    
+    selected = [item for item in items if item.nodeid in keep]
+    deselected = [item for item in items if item.nodeid not in keep]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    collector.impact_selection = {'changed': len(changed), 'collected': len(items),
+                                  'selected': len(selected), 'reason': reason}
+    items[:] = selected
+
+
+def select_shard(config, items, durations, num_shards, shard_id):
+    """Keep only the tests the LPT plan assigns to shard_id"""
+    from test_dashboard.sharding import compare_plans, estimate, plan_lpt
+    
+    estimates = estimate([item.nodeid for item in items], durations)
+    assignment, loads = plan_lpt(estimates, num_shards)
+    keep = set(assignment[shard_id])
+    
+    selected = [item for item in items if item.nodeid in keep]
+    deselected = [item for item in items if item.nodeid not in keep]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = selected
+    
+    collector.shard_plan = dict(compare_plans(estimates, num_shards), shard_id=shard_id,
+                                shard_tests=len(selected), shard_load=loads[shard_id],
+                                with_history=len(durations))
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Compare each passing test's duration with its baseline"""
+    report = yield
+    
+    if report.when != 'call' or not report.passed or not collector.baselines:
+        return report
+    
+    from test_dashboard.regressions import check_duration
+    
+    regression = check_duration(report.duration, collector.baselines.get(report.nodeid),
+                                z_threshold=item.config.getoption('--perf-z'))
+    if regression:
+        regression['test_name'] = report.nodeid
+        collector.regressions.append(regression)
         
-        # Use the coverage report method to get summary
-        # The report method returns a float that is the total coverage percentage
-        import io
-        from contextlib import redirect_stdout
-        
-        # Capture report output
-        report_output = io.StringIO()
-        with redirect_stdout(report_output):
-            cov.report(include=['app/*'])
-        
-        output_text = report_output.getvalue()
-        
-        # Parse the TOTAL line from coverage report output
-        # Format: "TOTAL   531   295    44%"
-        import re
-        match = re.search(r'TOTAL\s+\d+\s+\d+\s+(\d+)%', output_text)
-        if match:
-            percentage = float(match.group(1))
-            return percentage
-        
-        # If regex didn't match, return 0
-        return 0.0
+        if item.config.getoption('--perf-gate') == 'fail':
+            report.outcome = 'failed'
+            report.longrepr = (
+                f"Performance regression: {report.duration:.3f}s vs baseline "
+                f"{regression['baseline_mean']:.3f}s +/- {regression['baseline_stdev']:.3f}s "
+                f"({regression['ratio']}x, z={regression['z_score']}, {regression['samples']} runs)"
+            )
     
-    except Exception as e:
-        # Silently fail and return 0
-        return 0.0
+    return report
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Report test selection and the shard plan, and list duration regressions"""
+    selection = collector.impact_selection
+    if selection:
+        terminalreporter.section('test impact')
+        terminalreporter.write_line(
+            f"{selection['changed']} changed files: running {selection['selected']} "
+            f"of {selection['collected']} tests"
+        )
+        if selection['reason']:
+            terminalreporter.write_line(f"all tests selected ({selection['reason']})")
+    
+    plan = collector.shard_plan
+    if plan:
+        terminalreporter.section('test sharding')
+        terminalreporter.write_line(
+            f"shard {plan['shard_id']} of {plan['shards']}: {plan['shard_tests']} tests, "
+            f"estimated {plan['shard_load']:.1f}s ({plan['with_history']}/{plan['tests']} tests with history)"
+        )
+        terminalreporter.write_line(
+            f"estimated makespan: {plan['lpt_makespan']:.1f}s (LPT) vs "
+            f"{plan['naive_makespan']:.1f}s (split by file)"
+        )
+    
+    if not collector.regressions:
+        return
+    
+    terminalreporter.section('performance regressions')
+    for r in collector.regressions:
+        terminalreporter.write_line(
+            f"{r['test_name']}: {r['duration']:.3f}s vs {r['baseline_mean']:.3f}s "
+            f"({r['ratio']}x, z={r['z_score']})"
+        )
+
+
+def is_xdist_worker(config):
+    return hasattr(config, 'workerinput')
+
+
+def pytest_configure(config):
+    """Give parallel workers (which inherit the environment) one shared run id"""
+    if not is_xdist_worker(config):
+        os.environ.setdefault('TEST_DASHBOARD_RUN_ID', str(uuid.uuid4()))
 
 
 def pytest_sessionstart(session):
     """Called when test session starts"""
     collector.reset()
+    
+    url = os.environ.get('TEST_DASHBOARD_URL')
+    if url:
+        from test_dashboard.client import DashboardClient
+        try:
+            collector.client = DashboardClient(url)
+            collector.client.start_run(collector.run_id)
+        except Exception as e:
+            print(f"\nDashboard streaming unavailable: {e}")
+            collector.client = None
+    
     print(f"\nTest Dashboard: Recording results (Run ID: {collector.run_id[:8]}...)")
 
 
 def pytest_runtest_logreport(report):
     """Called for each test"""
+    # Reports forwarded from xdist workers are recorded by the worker itself
+    if hasattr(report, 'node'):
+        return
+    
     if report.when == 'call':
+        parts = report.nodeid.split('::')
         result = {
             'test_name': report.nodeid,
             'test_file': str(report.fspath) if hasattr(report, 'fspath') else '',
+            'test_class': parts[1] if len(parts) > 2 else None,
             'duration': report.duration,
             'status': 'passed' if report.passed else 'failed' if report.failed else 'skipped',
-            'error_message': str(report.longrepr)[:500] if report.failed and report.longrepr else None
+            'error_message': None,
+            'traceback': None
         }
+        if report.failed and report.longrepr:
+            crash = getattr(report.longrepr, 'reprcrash', None)
+            result['error_message'] = crash.message if crash else str(report.longrepr).splitlines()[-1]
+            result['traceback'] = str(report.longrepr)
         collector.results.append(result)
         
         if report.passed:
@@ -118,59 +371,66 @@ def pytest_runtest_logreport(report):
             collector.failed += 1
         elif report.skipped:
             collector.skipped += 1
+        
+        if collector.client and len(collector.results) - collector.streamed >= STREAM_BATCH_SIZE:
+            collector.flush()
 
 
 def pytest_sessionfinish(session, exitstatus):
     """Called when test session finishes - saves results to dashboard"""
-    if not collector.results:
-        return
-    
     duration = time.time() - collector.start_time if collector.start_time else 0
     
-    # Calculate actual coverage
-    coverage_percentage = get_actual_coverage(session)
+    if collector.client:
+        collector.flush()
+    
+    if collector.client and not is_xdist_worker(session.config):
+        # The controller closes the run once every worker has reported
+        cov, live = get_coverage(session)
+        try:
+            run = collector.client.finish_run(collector.run_id, duration=duration,
+                                              modules=get_module_coverage(cov),
+                                              impact=get_test_impact(cov, live))
+            print(f"\nTEST DASHBOARD: Run {collector.run_id[:8]}... finished "
+                  f"({run['total_tests']} tests, pass rate {run['pass_rate']}%)")
+        except Exception as e:
+            print(f"\nDashboard finish skipped: {e}")
+        if collector.streamed == len(collector.results):
+            return
+    
+    # Anything not streamed is written to the database directly
+    unsent = collector.results[collector.streamed:]
+    if not unsent:
+        return
+    
+    cov, live = get_coverage(session)
+    modules = get_module_coverage(cov)
+    impact = get_test_impact(cov, live)
     
     try:
         from test_dashboard.app import create_dashboard_app
-        from test_dashboard.models import db as dashboard_db, TestRun, TestResult
+        from test_dashboard.coverage_data import coverage_delta
+        from test_dashboard.ingest import ingest_run
         
         app = create_dashboard_app()
         
         with app.app_context():
-            # Create test run record
-            test_run = TestRun(run_id=collector.run_id)
-            test_run.end_time = datetime.utcnow()
-            test_run.total_tests = len(collector.results)
-            test_run.passed = collector.passed
-            test_run.failed = collector.failed
-            test_run.skipped = collector.skipped
-            test_run.duration = duration
-            test_run.status = 'passed' if collector.failed == 0 else 'failed'
-            test_run.coverage = coverage_percentage
-            
-            dashboard_db.session.add(test_run)
-            dashboard_db.session.commit()
-            
-            # Add individual test results
-            for result in collector.results:
-                test_result = TestResult(
-                    run_id=test_run.id,
-                    test_name=result['test_name'],
-                    status=result['status'],
-                    duration=result['duration'],
-                    test_file=result['test_file'],
-                    error_message=result['error_message']
-                )
-                dashboard_db.session.add(test_result)
-            
-            dashboard_db.session.commit()
+            test_run, ingest_time = ingest_run(
+                collector.run_id,
+                unsent,
+                duration=duration,
+                modules=modules,
+                impact=impact
+            )
             
             print(f"\n{'='*60}")
             print(f"TEST DASHBOARD: Results Saved!")
             print(f"   Run ID: {collector.run_id[:8]}...")
             print(f"   Total: {test_run.total_tests} | PASSED: {test_run.passed} | FAILED: {test_run.failed}")
             print(f"   Duration: {duration:.2f}s | Pass Rate: {test_run.pass_rate}%")
-            print(f"   Coverage: {test_run.coverage}%")
+            delta = coverage_delta(test_run) if modules else None
+            print(f"   Coverage: {test_run.coverage}%"
+                  + (f" ({delta:+.2f} vs previous run)" if delta is not None else ""))
+            print(f"   Ingested in {ingest_time * 1000:.1f}ms")
             print(f"   View at: http://localhost:5050")
             print(f"{'='*60}\n")
             
@@ -185,23 +445,105 @@ def pytest_sessionfinish(session, exitstatus):
 class TestConfig:
     """Test configuration"""
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///test_bank.db'
+    # One in-memory database per process (so per xdist worker), shared by all
+    # connections through StaticPool; each test runs inside a transaction
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'poolclass': StaticPool,
+        # Autocommit at the driver level so SQLAlchemy controls BEGIN/SAVEPOINT
+        'connect_args': {'check_same_thread': False, 'isolation_level': None},
+    }
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = 'test-secret-key'
     WTF_CSRF_ENABLED = False
     LOGIN_DISABLED = False
+    TEMPLATE_WARMUP = False
+
+
+class SavepointSession(Session):
+    """Session that always uses the test's connection instead of the engine"""
+    
+    def get_bind(self, *args, **kwargs):
+        return self.bind
+
+
+def app_context_id():
+    """Scope sessions per app context, like Flask-SQLAlchemy, so each request gets its own"""
+    return id(app_ctx._get_current_object())
+
 
+@functools.lru_cache(maxsize=None)
+def fixture_password_hash(password):
+    """Hash fixture passwords once per session, with a single PBKDF2 iteration"""
+    return generate_password_hash(password, method='pbkdf2:sha256:1')
+
+
+@pytest.fixture(scope='session')
+def _app(tmp_path_factory):
+    """Create the application and schema once per session (per xdist worker)"""
+    instance = tmp_path_factory.mktemp('instance')
+    config = {key: getattr(TestConfig, key) for key in dir(TestConfig) if key.isupper()}
+    config['TEMPLATE_CACHE_DIR'] = str(instance / 'jinja_cache')
+    config['SLOW_QUERY_LOG'] = str(instance / 'slow_queries.log')
+    
+    application = create_app(config)
+    with application.app_context():
+        @event.listens_for(db.engine, 'begin')
+        def do_begin(connection):
+            connection.exec_driver_sql('BEGIN')
+    return application
+
+
+@pytest.fixture(scope='function')
+def app(_app):
+    """
+    Application for one test. The test runs inside a transaction that is
+    rolled back afterwards; commits in fixtures and views only release a
+    SAVEPOINT, so every test starts from an empty schema.
+    """
+    config = dict(_app.config)
+    bytecode_cache = _app.jinja_env.bytecode_cache
+    _app.extensions['metrics'].reset()
+    _app.extensions['velocity'].reset()
+    
+    with _app.app_context():
+        connection = db.engine.connect()
+        transaction = connection.begin()
+        app_session = db.session
+        db.session = scoped_session(sessionmaker(
+            class_=SavepointSession,
+            db=db,
+            bind=connection,
+            join_transaction_mode='create_savepoint',
+        ), scopefunc=app_context_id)
+        
+        yield _app
+        
+        db.session.remove()
+        db.session = app_session
+        transaction.rollback()
+        connection.close()
+    
+    _app.config.clear()
+    _app.config.update(config)
+    _app.jinja_env.bytecode_cache = bytecode_cache
 
 @pytest.fixture(scope='function')
-def app():
-    """Create application for testing"""
-    application = create_app()
-    application.config.from_object(TestConfig)
+def dashboard_app(tmp_path, monkeypatch):
+    """Create a test dashboard app on a temporary database"""
+    monkeypatch.setenv('DASHBOARD_DATABASE_URL', f"sqlite:///{tmp_path / 'dashboard.db'}")
+    from test_dashboard.app import create_dashboard_app
+    application = create_dashboard_app()
+    application.config['TESTING'] = True
     with application.app_context():
-        db.create_all()
         yield application
-        db.session.remove()
-        db.drop_all()
+
+
+@pytest.fixture(scope='function')
+def dashboard_client(dashboard_app):
+    """Create test client for the dashboard"""
+    return dashboard_app.test_client()
+
 
 @pytest.fixture(scope='function')
 def admin_user(app):
@@ -212,7 +554,7 @@ def admin_user(app):
             email='admin@example.com',
             role='admin'
         )
-        admin.set_password('AdminPassword123')
+        admin.password_hash = fixture_password_hash('AdminPassword123')
         db.session.add(admin)
         db.session.commit()
         
@@ -228,7 +570,7 @@ def test_user(app):
             email='testuser@example.com',
             role='customer'
         )
-        user.set_password('TestPassword123')
+        user.password_hash = fixture_password_hash('TestPassword123')
         db.session.add(user)
         db.session.commit()
         
@@ -249,12 +591,8 @@ def runner(app):
 
 @pytest.fixture(scope='function')
 def init_database(app):
-    """Initialize database with test data"""
-    with app.app_context():
-        db.create_all()
-        yield db
-        db.session.remove()
-        db.drop_all()
+    """The database; the schema is created once per session"""
+    yield db
 
 @pytest.fixture(scope='function')
 def test_account(app, test_user):
@@ -296,6 +634,19 @@ def second_account(app, test_user):
         yield account
 
 
+@pytest.fixture(scope='function')
+def post_transaction(app):
+    """Add a transaction to the session, dated `when` if given; the test commits"""
+    def post(account, transaction_type, amount, when=None, description=None):
+        transaction = Transaction(account_id=account.id, transaction_type=transaction_type, amount=amount,
+                                  description=description)
+        if when is not None:
+            transaction.timestamp = when
+        db.session.add(transaction)
+        return transaction
+    return post
+
+
 @pytest.fixture(scope='function')
 def authenticated_client(client, test_user):
     """Create an authenticated client"""
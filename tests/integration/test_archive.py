@@ -0,0 +1,118 @@
+import pytest
+from datetime import datetime
+from app import db
+from app.models.archive import TransactionArchive
+from app.models.transaction import Transaction
+from app.services.archive import archive_table, archive_transactions, transaction_source
+from app.services.reconciliation import reconcile
+from app.services.statements import generate_statements
+
+NOW = datetime(2026, 6, 15)
+
+
+class TestArchive:
+    """Integration tests for transaction archival and reads across archives"""
+
+    @pytest.fixture
+    def history(self, app, test_account, post_transaction):
+        # Balance 1000 = 600 + 300 + 150 - 50
+        post_transaction(test_account, 'deposit', 600.0, datetime(2025, 1, 10), 'January salary')
+        post_transaction(test_account, 'deposit', 300.0, datetime(2025, 1, 20))
+        post_transaction(test_account, 'deposit', 150.0, datetime(2025, 3, 5), 'March bonus')
+        post_transaction(test_account, 'withdrawal', 50.0, datetime(2026, 6, 1), 'Recent ATM')
+        db.session.commit()
+        return test_account
+
+    def archive(self):
+        return archive_transactions(retention_days=365, now=NOW, chunk_size=1)
+
+    @pytest.mark.integration
+    def test_moves_whole_old_months(self, app, history):
+        """Test months before the retention cutoff move to per-month tables"""
+        assert self.archive() == [('2025-01', 2), ('2025-03', 1)]
+
+        assert Transaction.query.count() == 1
+        january = TransactionArchive.query.filter_by(month='2025-01').one()
+        assert (january.table_name, january.rows) == ('transactions_archive_2025_01', 2)
+        table = archive_table(january.table_name)
+        assert db.session.execute(db.select(db.func.count()).select_from(table)).scalar() == 2
+        assert self.archive() == []  # nothing left to move
+
+    @pytest.mark.integration
+    def test_source_only_unions_needed_months(self, app, history):
+        """Test recent ranges read the hot table and older ranges reach the archives"""
+        self.archive()
+
+        assert transaction_source(datetime(2026, 1, 1)) is Transaction
+        source = transaction_source(datetime(2025, 3, 1), datetime(2025, 4, 1))
+        rows = db.session.query(source).filter(source.timestamp >= datetime(2025, 3, 1)).order_by(source.timestamp).all()
+        assert [t.description for t in rows] == ['March bonus', 'Recent ATM']
+        assert rows[0].balance_change == 150.0
+
+    @pytest.mark.integration
+    def test_history_and_search_reach_archives(self, authenticated_client, history):
+        """Test a date range shows archived transactions on the history and search pages"""
+        self.archive()
+
+        response = authenticated_client.get('/transactions/history?start=2025-01-01&end=2025-12-31')
+        assert b'January salary' in response.data and b'Recent ATM' not in response.data
+
+        response = authenticated_client.get('/transactions/history?start=2026-05-01&end=2026-06-30')
+        assert b'Recent ATM' in response.data and b'January salary' not in response.data
+
+        response = authenticated_client.get('/transactions/search?q=bonus&start=2025-01-01')
+        assert b'March bonus' in response.data
+
+    @pytest.mark.integration
+    def test_default_views_read_retention_window(self, authenticated_client, history, post_transaction):
+        """Test history and search without a range stay within the retention window"""
+        self.archive()
+        post_transaction(history, 'deposit', 5.0, datetime.utcnow(), 'Today bonus')
+        db.session.commit()
+
+        response = authenticated_client.get('/transactions/history')
+        assert b'Today bonus' in response.data and b'January salary' not in response.data
+        assert b'Older transactions' in response.data
+
+        response = authenticated_client.get('/transactions/search?q=bonus')
+        assert b'Today bonus' in response.data and b'March bonus' not in response.data
+
+    @pytest.mark.integration
+    def test_admin_search_archived_on_request(self, admin_client, history):
+        """Test admin transaction search reads archives only when asked to"""
+        self.archive()
+        reference = Transaction.query.first().reference_number
+        archived = archive_table('transactions_archive_2025_01')
+        old_reference = db.session.execute(archived.select().limit(1)).first().reference_number
+
+        response = admin_client.get(f'/admin/search?type=transactions&q={old_reference}')
+        assert b'No results found' in response.data and b'Older transactions' in response.data
+
+        response = admin_client.get(f'/admin/search?type=transactions&q={old_reference}&archived=1')
+        assert f'<td>{old_reference}</td>'.encode() in response.data
+
+        response = admin_client.get(f'/admin/search?type=transactions&q={reference}')
+        assert f'<td>{reference}</td>'.encode() in response.data
+
+    @pytest.mark.integration
+    def test_statement_and_reconciliation_include_archives(self, app, history, tmp_path):
+        """Test archived months still produce statements and balance the ledger"""
+        self.archive()
+
+        summary = generate_statements('2025-01', str(tmp_path))
+        assert summary['transactions'] == 2
+        with open(tmp_path / '2025-01' / f'{history.account_number}.csv') as f:
+            lines = f.read().splitlines()
+        assert lines[2].endswith(',0.00') and lines[-1].endswith(',900.00')
+
+        assert reconcile(str(tmp_path / 'reports')).discrepancy_count == 0
+
+    @pytest.mark.integration
+    def test_cli_archive(self, runner, history):
+        """Test the archive command reports each month"""
+        result = runner.invoke(args=['ledger', 'archive', '--retention-days', '30'])
+
+        assert result.exit_code == 0, result.output
+        assert '2025-01: 2 transactions' in result.output
+        assert 'Archived 4 transactions from 3 months' in result.output
+        assert Transaction.query.count() == 0
@@ -0,0 +1,104 @@
+import pytest
+from datetime import date
+from app import db
+from app.models.limits import DailyLimitUsage, LimitOverride
+from app.models.transaction import Transaction
+from app.services.limits import remaining_today, reserve
+
+
+@pytest.fixture
+def small_limits(app):
+    app.config['DAILY_LIMITS'] = {'customer': {'savings': {'withdrawal': 100, 'transfer': 300}}}
+
+
+class TestDailyLimits:
+    """Integration tests for daily withdrawal and transfer limits"""
+
+    def withdraw(self, client, account, amount):
+        return client.post('/transactions/withdraw', data={
+            'account_id': account.id, 'amount': amount, 'description': 'ATM'
+        }, follow_redirects=True)
+
+    @pytest.mark.integration
+    def test_reserve_keeps_running_total(self, app, test_account, small_limits):
+        """Test reservations accumulate in one row and stop at the limit"""
+        assert reserve(test_account, 'withdrawal', 60)
+        assert reserve(test_account, 'withdrawal', 40)
+        assert not reserve(test_account, 'withdrawal', 0.01)
+        assert reserve(test_account, 'transfer', 300)
+
+        usage = DailyLimitUsage.query.filter_by(account_id=test_account.id).one()
+        assert (usage.withdrawal, usage.transfer) == (100.0, 300.0)
+
+    @pytest.mark.integration
+    def test_unlimited_account_type(self, app, second_account, small_limits):
+        """Test account types without a configured limit are not limited"""
+        assert reserve(second_account, 'withdrawal', 10_000)
+        assert remaining_today(second_account)['withdrawal'] == {'limit': None, 'used': 10_000.0, 'remaining': None}
+
+    @pytest.mark.integration
+    def test_withdrawal_over_limit_rejected(self, authenticated_client, test_account, small_limits):
+        """Test a withdrawal past today's limit is rejected without posting"""
+        assert b'Successfully withdrew' in self.withdraw(authenticated_client, test_account, '80.00').data
+
+        response = self.withdraw(authenticated_client, test_account, '30.00')
+
+        assert b'exceeds your daily withdrawal limit. Remaining today: $20.00' in response.data
+        assert Transaction.query.filter_by(account_id=test_account.id).count() == 1
+        db.session.refresh(test_account)
+        assert test_account.balance == 920.0
+
+    @pytest.mark.integration
+    def test_rejected_posting_uses_no_limit(self, authenticated_client, test_account, small_limits):
+        """Test postings rejected before the reservation do not use the limit"""
+        self.withdraw(authenticated_client, test_account, '5000.00')  # insufficient funds
+
+        assert remaining_today(test_account)['withdrawal']['used'] == 0.0
+
+    @pytest.mark.integration
+    def test_view_shows_remaining(self, authenticated_client, test_account, small_limits):
+        """Test the account page shows what is left today"""
+        self.withdraw(authenticated_client, test_account, '25.00')
+
+        response = authenticated_client.get(f'/accounts/{test_account.id}')
+
+        assert b'Remaining Today' in response.data
+        assert b'$75.00 of $100.00' in response.data
+
+    @pytest.mark.integration
+    def test_admin_override(self, admin_client, test_account, small_limits):
+        """Test admins can raise, inspect and remove an account's limit"""
+        url = f'/admin/api/accounts/{test_account.id}/limits'
+        response = admin_client.put(f'{url}/override', json={
+            'withdrawal_limit': 500, 'valid_until': '2999-01-01', 'reason': 'Car purchase'})
+        assert response.status_code == 200
+        assert response.get_json()['override']['withdrawal_limit'] == 500.0
+
+        assert reserve(test_account, 'withdrawal', 400)
+        limits = admin_client.get(url).get_json()
+        assert limits['limits']['withdrawal'] == {'limit': 500.0, 'used': 400.0, 'remaining': 100.0}
+        assert limits['limits']['transfer']['limit'] == 300  # not overridden
+        assert limits['override']['reason'] == 'Car purchase'
+
+        assert admin_client.delete(f'{url}/override').get_json()['removed'] is True
+        assert LimitOverride.query.count() == 0
+        assert admin_client.get(url).get_json()['limits']['withdrawal']['remaining'] == 0.0
+
+    @pytest.mark.integration
+    def test_expired_override_ignored(self, app, test_account, small_limits):
+        """Test an override past its valid_until date no longer applies"""
+        override = LimitOverride(test_account.id)
+        override.withdrawal_limit = 5000
+        override.valid_until = date(2000, 1, 1)
+        db.session.add(override)
+        db.session.commit()
+
+        assert remaining_today(test_account)['withdrawal']['limit'] == 100
+
+    @pytest.mark.integration
+    def test_override_validation(self, admin_client, test_account):
+        """Test bad override input is rejected"""
+        url = f'/admin/api/accounts/{test_account.id}/limits/override'
+        assert admin_client.put(url, json={'withdrawal_limit': -1}).status_code == 400
+        assert admin_client.put(url, json={'reason': 'no limits'}).status_code == 400
+        assert admin_client.put(url, json={'transfer_limit': 10, 'valid_until': 'soon'}).status_code == 400
@@ -0,0 +1,579 @@
+import pytest
+from datetime import datetime, timedelta
+from test_dashboard.models import (db, TestRun, TestResult, TrendRollup, TestStats, FailureCluster,
+                                   CoverageReport, TestImpact, LoadTestRun, LoadTestResult,
+                                   BenchmarkRun, BenchmarkResult)
+from test_dashboard.coverage_data import coverage_delta, module_coverage
+from test_dashboard.flaky import flaky_tests, largest_clusters, normalize_error, rebuild
+from test_dashboard.impact import impacted_tests
+from test_dashboard.ingest import ingest_run
+from test_dashboard.regressions import Baseline, check_duration, compute_baselines
+from test_dashboard.sharding import pinned_durations
+from test_dashboard.trends import refresh_rollups, trend_series
+
+
+class TestLoadTestPages:
+    """Integration tests for load-test results on the test dashboard"""
+
+    def add_load_run(self, run_id='load-1', throughput=42.0):
+        run = LoadTestRun(run_id=run_id, concurrency=4, scenario='dashboard=1')
+        run.duration = 10.0
+        run.total_requests = 420
+        run.errors = 2
+        run.throughput = throughput
+        db.session.add(run)
+        db.session.flush()
+        db.session.add(LoadTestResult(run_id=run.id, endpoint='dashboard', requests=420, errors=2,
+                                      throughput=throughput, mean_ms=20.0, p50_ms=18.0,
+                                      p95_ms=35.0, p99_ms=50.0, max_ms=80.0))
+        db.session.commit()
+        return run
+
+    @pytest.mark.integration
+    def test_load_tests_page_empty(self, dashboard_client):
+        """Test the page renders without any runs"""
+        response = dashboard_client.get('/load-tests')
+
+        assert response.status_code == 200
+        assert b'No load tests recorded yet' in response.data
+
+    @pytest.mark.integration
+    def test_load_tests_page_shows_latest_run(self, dashboard_client):
+        """Test the latest run and its endpoint percentiles are shown"""
+        self.add_load_run()
+        response = dashboard_client.get('/load-tests')
+
+        assert b'load-1' in response.data
+        assert b'35.0 ms' in response.data
+
+    @pytest.mark.integration
+    def test_api_load_tests(self, dashboard_client):
+        """Test the API returns per-endpoint stats oldest first"""
+        self.add_load_run('load-1', 40.0)
+        self.add_load_run('load-2', 50.0)
+        data = dashboard_client.get('/api/load-tests').get_json()
+
+        assert [r['run_id'] for r in data] == ['load-1', 'load-2']
+        assert data[1]['endpoints']['dashboard']['p95_ms'] == 35.0
+
+
+class TestBenchmarkPages:
+    """Integration tests for microbenchmark history on the test dashboard"""
+
+    def add_benchmark_run(self, run_id, median_us):
+        run = BenchmarkRun(run_id=run_id, git_commit='abc123')
+        db.session.add(run)
+        db.session.flush()
+        db.session.add(BenchmarkResult(run_id=run.id, name='account_deposit', group='models',
+                                       loops=1000, repeat=5, min_us=median_us * 0.9,
+                                       median_us=median_us, mean_us=median_us, stdev_us=0.1))
+        db.session.commit()
+        return run
+
+    @pytest.mark.integration
+    def test_benchmarks_page_empty(self, dashboard_client):
+        """Test the page renders without any runs"""
+        response = dashboard_client.get('/benchmarks')
+
+        assert response.status_code == 200
+        assert b'No benchmark runs recorded yet' in response.data
+
+    @pytest.mark.integration
+    def test_benchmarks_page_change_vs_previous(self, dashboard_client):
+        """Test the latest result is compared with the previous run"""
+        self.add_benchmark_run('bench-1', 2.0)
+        self.add_benchmark_run('bench-2', 3.0)
+        response = dashboard_client.get('/benchmarks')
+
+        assert b'account_deposit' in response.data
+        assert b'+50.0%' in response.data
+
+    @pytest.mark.integration
+    def test_api_benchmarks_history(self, dashboard_client):
+        """Test the API returns per-benchmark history oldest first"""
+        self.add_benchmark_run('bench-1', 2.0)
+        self.add_benchmark_run('bench-2', 3.0)
+        data = dashboard_client.get('/api/benchmarks?name=account_deposit').get_json()
+
+        assert [r['run_id'] for r in data['runs']] == ['bench-1', 'bench-2']
+        assert data['median_us'] == {'account_deposit': [2.0, 3.0]}
+
+
+class TestRegressions:
+    """Integration tests for test duration baselines and regression detection"""
+
+    def add_test_run(self, run_id, durations):
+        run = TestRun(run_id=run_id)
+        run.total_tests = run.passed = len(durations)
+        db.session.add(run)
+        db.session.flush()
+        for name, duration in durations.items():
+            db.session.add(TestResult(run_id=run.id, test_name=name, test_file='tests/test_x.py',
+                                      status='passed', duration=duration))
+        db.session.commit()
+        return run
+
+    def test_check_duration_needs_history(self):
+        """Test too few samples never give a verdict"""
+        assert check_duration(10.0, Baseline(2, 0.1, 0.01)) is None
+        assert check_duration(10.0, None) is None
+
+    def test_check_duration_ignores_small_slowdowns(self):
+        """Test fast tests need a material absolute and relative slowdown"""
+        baseline = Baseline(10, 0.010, 0.001)
+
+        assert check_duration(0.030, baseline) is None
+        assert check_duration(0.500, baseline)['ratio'] == 50.0
+
+    @pytest.mark.integration
+    def test_compute_baselines_uses_window(self, dashboard_app):
+        """Test only the last `window` passing runs count"""
+        with dashboard_app.app_context():
+            for i in range(3):
+                self.add_test_run(f'old-{i}', {'t::a': 5.0})
+            for i in range(5):
+                self.add_test_run(f'new-{i}', {'t::a': 1.0})
+
+            baseline = compute_baselines(['t::a'], window=5)['t::a']
+
+        assert baseline.samples == 5
+        assert baseline.mean == pytest.approx(1.0)
+        assert baseline.stdev == pytest.approx(0.0, abs=1e-6)
+
+    @pytest.mark.integration
+    def test_pinned_shard_history(self, dashboard_app):
+        """Test shard durations ignore runs recorded after the pinned cutoff"""
+        with dashboard_app.app_context():
+            first = self.add_test_run('shard-1', {'t::a': 2.0})
+            pin = first.id + 1
+            before = pinned_durations(['t::a'], pin)
+            self.add_test_run('shard-2', {'t::a': 8.0})
+
+            assert pinned_durations(['t::a'], pin) == before == {'t::a': pytest.approx(2.0)}
+            assert pinned_durations(['t::a'], 0) == {}
+            with pytest.raises(ValueError):
+                pinned_durations(['t::a'], pin + 5)
+
+    @pytest.mark.integration
+    def test_regressions_page_and_api(self, dashboard_app, dashboard_client):
+        """Test the latest run is checked against the runs before it"""
+        with dashboard_app.app_context():
+            for i in range(6):
+                self.add_test_run(f'run-{i}', {'t::slow': 0.2 + i * 0.001, 't::steady': 0.2})
+            self.add_test_run('run-latest', {'t::slow': 1.0, 't::steady': 0.2})
+
+        response = dashboard_client.get('/regressions')
+        data = dashboard_client.get('/api/regressions').get_json()
+
+        assert b't::slow' in response.data
+        assert b't::steady' not in response.data
+        assert data['run_id'] == 'run-latest'
+        assert [r['test_name'] for r in data['regressions']] == ['t::slow']
+
+
+class TestIngestion:
+    """Integration tests for bulk ingestion of test results"""
+
+    def make_results(self):
+        return [
+            {'test_name': 'tests/test_x.py::TestX::test_ok', 'test_file': 'tests/test_x.py',
+             'test_class': 'TestX', 'status': 'passed', 'duration': 0.1},
+            {'test_name': 'tests/test_x.py::test_bad', 'test_file': 'tests/test_x.py',
+             'test_class': None, 'status': 'failed', 'duration': 0.2,
+             'error_message': 'AssertionError: boom', 'traceback': 'line\n' * 2000 + 'E   boom'},
+        ]
+
+    @pytest.mark.integration
+    def test_ingest_run_stores_results(self, dashboard_app):
+        """Test a run and all results are written with the full traceback"""
+        test_run, elapsed = ingest_run('ingest-1', self.make_results())
+
+        results = TestResult.query.filter_by(run_id=test_run.id).order_by(TestResult.test_name).all()
+        assert elapsed >= 0
+        assert [r.test_class for r in results] == ['TestX', None]
+        assert results[1].traceback.endswith('E   boom')
+        assert len(results[1].stack_trace) < len(results[1].traceback)
+        assert results[0].stack_trace is None
+
+    @pytest.mark.integration
+    def test_run_details_shows_traceback(self, dashboard_client):
+        """Test the run details page renders the decompressed traceback"""
+        test_run, _ = ingest_run('ingest-2', self.make_results())
+        response = dashboard_client.get(f'/runs/{test_run.id}')
+
+        assert b'Full traceback' in response.data
+        assert b'E   boom' in response.data
+
+
+class TestIngestionApi:
+    """Integration tests for streaming results from parallel workers"""
+
+    def result(self, name, status='passed'):
+        return {'test_name': name, 'test_file': 'tests/test_x.py', 'status': status, 'duration': 0.1}
+
+    @pytest.mark.integration
+    def test_create_run_is_idempotent(self, dashboard_client):
+        """Test every worker can start the same run"""
+        first = dashboard_client.post('/api/runs', json={'run_id': 'shared'})
+        second = dashboard_client.post('/api/runs', json={'run_id': 'shared'})
+
+        assert first.status_code == 201
+        assert second.status_code == 200
+        assert first.get_json()['id'] == second.get_json()['id']
+        assert TestRun.query.count() == 1
+
+    @pytest.mark.integration
+    def test_batches_from_workers_merge_into_one_run(self, dashboard_client):
+        """Test batches from several workers give correct aggregate counts"""
+        dashboard_client.post('/api/runs', json={'run_id': 'shared'})
+        dashboard_client.post('/api/runs/shared/results',
+                              json={'results': [self.result('a'), self.result('b', 'failed')]})
+        progress = dashboard_client.post('/api/runs/shared/results',
+                                         json={'results': [self.result('c'), self.result('d', 'skipped')]}).get_json()
+
+        assert progress['status'] == 'running'
+        assert (progress['total_tests'], progress['passed'], progress['failed'], progress['skipped']) == (4, 2, 1, 1)
+
+        finished = dashboard_client.post('/api/runs/shared/finish', json={'duration': 3.5}).get_json()
+        assert finished['status'] == 'failed'
+        assert finished['duration'] == 3.5
+        assert TestResult.query.count() == 4
+
+    @pytest.mark.integration
+    def test_add_results_validation(self, dashboard_client):
+        """Test unknown runs and malformed batches are rejected"""
+        assert dashboard_client.post('/api/runs/missing/results', json={'results': []}).status_code == 404
+
+        dashboard_client.post('/api/runs', json={'run_id': 'shared'})
+        response = dashboard_client.post('/api/runs/shared/results',
+                                         json={'results': [{'test_name': 'a', 'status': 'bogus'}]})
+        assert response.status_code == 400
+
+    @pytest.mark.integration
+    def test_run_details_polls_while_running(self, dashboard_client):
+        """Test a running run shows live progress"""
+        run = dashboard_client.post('/api/runs', json={'run_id': 'shared'}).get_json()
+        response = dashboard_client.get(f"/runs/{run['id']}")
+
+        assert b'RUNNING' in response.data
+        assert b'/api/runs/shared' in response.data
+
+
+class TestRunDetailsPagination:
+    """Integration tests for SQL-side aggregation on the run pages"""
+
+    def seed_run(self, run_id='big', passed=120, failed=3):
+        results = [{'test_name': f'tests/test_x.py::test_ok_{i:03d}', 'status': 'passed', 'duration': 0.01}
+                   for i in range(passed)]
+        results += [{'test_name': f'tests/test_x.py::test_bad_{i}', 'status': 'failed', 'duration': 0.02,
+                     'error_message': f'failure {i}'} for i in range(failed)]
+        test_run, _ = ingest_run(run_id, results)
+        return test_run
+
+    @pytest.mark.integration
+    def test_results_are_paginated(self, dashboard_client):
+        """Test only one page of results is rendered, failures first"""
+        test_run = self.seed_run()
+        response = dashboard_client.get(f'/runs/{test_run.id}')
+
+        assert b'All (123)' in response.data
+        assert b'Passed (120)' in response.data
+        assert b'test_bad_0' in response.data
+        assert b'test_ok_046' in response.data
+        assert b'test_ok_047' not in response.data
+
+    @pytest.mark.integration
+    def test_results_filtered_by_status(self, dashboard_client):
+        """Test a status tab pages through that status only"""
+        test_run = self.seed_run()
+        response = dashboard_client.get(f'/runs/{test_run.id}?status=passed&page=3')
+
+        assert b'test_ok_100' in response.data
+        assert b'test_ok_099' not in response.data
+        assert b'status=passed' in response.data
+
+    @pytest.mark.integration
+    def test_dashboard_average_pass_rate(self, dashboard_client):
+        """Test the 30-day average pass rate is computed per run"""
+        self.seed_run('run-a', passed=1, failed=1)
+        self.seed_run('run-b', passed=4, failed=0)
+        response = dashboard_client.get('/')
+
+        assert b'75.0' in response.data
+
+
+class TestTrends:
+    """Integration tests for downsampled trend data"""
+
+    def add_run(self, start_time, passed, failed=0, duration=1.0):
+        run = TestRun(run_id=f'trend-{start_time.isoformat()}')
+        run.start_time = start_time
+        run.total_tests = passed + failed
+        run.passed = passed
+        run.failed = failed
+        run.duration = duration
+        db.session.add(run)
+        db.session.commit()
+        return run
+
+    @pytest.mark.integration
+    def test_series_is_capped_at_points(self, dashboard_app):
+        """Test many runs are reduced to at most `points` buckets"""
+        now = datetime.utcnow()
+        for i in range(120):
+            self.add_run(now - timedelta(minutes=30 * i), passed=10)
+
+        series = trend_series(days=3, points=24, now=now)
+
+        assert len(series['dates']) <= 25
+        assert sum(series['runs']) == len([i for i in range(120) if 30 * i < 3 * 24 * 60])
+
+    @pytest.mark.integration
+    def test_bucket_min_avg_max(self, dashboard_app):
+        """Test runs in one bucket are reduced to min/avg/max"""
+        now = datetime(2026, 1, 15, 12, 0)
+        self.add_run(now - timedelta(hours=2), passed=5, failed=5, duration=2.0)
+        self.add_run(now - timedelta(hours=1), passed=10, duration=4.0)
+
+        series = trend_series(days=1, points=1, now=now)
+
+        assert series['pass_rate'] == [75.0]
+        assert series['min']['pass_rate'] == [50.0]
+        assert series['max']['duration'] == [4.0]
+
+    @pytest.mark.integration
+    def test_old_days_come_from_rollups(self, dashboard_app):
+        """Test days past the raw horizon are rolled up once and still charted"""
+        now = datetime.utcnow()
+        self.add_run(now - timedelta(days=40), passed=8, failed=2)
+        self.add_run(now - timedelta(days=40, hours=1), passed=10)
+
+        assert refresh_rollups(now) == 1
+        assert refresh_rollups(now) == 0
+        assert TrendRollup.query.filter_by(metric='pass_rate').one().samples == 2
+
+        series = trend_series(days=90, points=90, now=now)
+        assert series['pass_rate'] == [90.0]
+
+    @pytest.mark.integration
+    def test_late_run_recomputes_its_day(self, dashboard_app):
+        """Test finishing a run for an already rolled-up day updates that day's rollup"""
+        now = datetime.utcnow()
+        noon = datetime.combine((now - timedelta(days=40)).date(), datetime.min.time()) + timedelta(hours=12)
+        self.add_run(noon, passed=10)
+        refresh_rollups(now)
+        db.session.commit()
+        late = self.add_run(noon + timedelta(hours=1), passed=0)
+
+        ingest_run(late.run_id, [{'test_name': 'test_a', 'status': 'failed'}])
+
+        rollup = TrendRollup.query.filter_by(metric='failed').one()
+        assert rollup.samples == 2 and rollup.maximum == 1
+
+    @pytest.mark.integration
+    def test_trend_reads_never_write(self, dashboard_client):
+        """Test trend pages leave the rollups alone and still chart days not rolled up yet"""
+        self.add_run(datetime.utcnow() - timedelta(days=40), passed=10)
+
+        data = dashboard_client.get('/api/trends?days=90&points=90').get_json()
+        dashboard_client.get('/trends?days=90')
+
+        assert TrendRollup.query.count() == 0
+        assert data['pass_rate'] == [100.0]
+
+    @pytest.mark.integration
+    def test_api_trends_etag(self, dashboard_client):
+        """Test unchanged trend data is answered with 304"""
+        first = dashboard_client.get('/api/trends?days=7&points=50')
+        second = dashboard_client.get('/api/trends?days=7&points=50',
+                                      headers={'If-None-Match': first.headers['ETag']})
+
+        assert first.status_code == 200
+        assert 'dates' in first.get_json()
+        assert second.status_code == 304
+
+    @pytest.mark.integration
+    def test_trends_page(self, dashboard_client):
+        """Test the trends page renders with a window selector"""
+        response = dashboard_client.get('/trends?days=90')
+
+        assert response.status_code == 200
+        assert b'last 90 days' in response.data
+
+
+class TestFlakyIndex:
+    """Integration tests for flip-rate statistics and failure clusters"""
+
+    def ingest(self, run_id, statuses):
+        results = [{'test_name': name, 'status': status, 'duration': 0.1,
+                    'error_message': f'AssertionError: assert {len(run_id)}0{i} == 200' if status == 'failed' else None}
+                   for i, (name, status) in enumerate(statuses.items())]
+        return ingest_run(run_id, results)[0]
+
+    def test_normalize_error_masks_volatile_parts(self):
+        """Test numbers, addresses and quoted values do not split clusters"""
+        a = normalize_error("KeyError: 'abc' at 0x7f3a in /tmp/x/y.py line 12")
+        b = normalize_error("KeyError: 'xyz' at 0x7f99 in /tmp/q/z.py line 99\nmore")
+
+        assert a == b
+
+    @pytest.mark.integration
+    def test_flips_are_counted_incrementally(self, dashboard_app):
+        """Test each ingested run updates flips without rescanning"""
+        for i, status in enumerate(['passed', 'failed', 'passed', 'passed', 'failed', 'passed']):
+            self.ingest(f'run-{i}', {'t::flaky': status, 't::stable': 'passed'})
+
+        stats = {s.test_name: s for s in TestStats.query}
+        assert (stats['t::flaky'].runs, stats['t::flaky'].failures, stats['t::flaky'].flips) == (6, 2, 4)
+        assert stats['t::flaky'].flip_rate == 80.0
+        assert stats['t::stable'].flips == 0
+        assert [t.test_name for t in flaky_tests()] == ['t::flaky']
+
+    @pytest.mark.integration
+    def test_failures_cluster_by_signature(self, dashboard_app):
+        """Test failures with the same normalized message share a cluster"""
+        self.ingest('run-a', {'t::one': 'failed', 't::two': 'failed'})
+        self.ingest('run-bb', {'t::one': 'failed'})
+
+        clusters = largest_clusters()
+        assert len(clusters) == 1
+        assert clusters[0].occurrences == 3
+        assert clusters[0].normalized == 'AssertionError: assert N == N'
+
+    @pytest.mark.integration
+    def test_rebuild_matches_incremental(self, dashboard_app):
+        """Test a rebuild from history gives the same statistics"""
+        for i, status in enumerate(['passed', 'failed', 'passed']):
+            self.ingest(f'run-{i}', {'t::flaky': status})
+        before = [(s.test_name, s.runs, s.failures, s.flips) for s in TestStats.query]
+
+        rebuild()
+
+        assert [(s.test_name, s.runs, s.failures, s.flips) for s in TestStats.query] == before
+        assert FailureCluster.query.one().occurrences == 1
+
+    @pytest.mark.integration
+    def test_flaky_page(self, dashboard_client):
+        """Test the page lists flaky tests and clusters"""
+        for i, status in enumerate(['passed', 'failed'] * 3):
+            self.ingest(f'run-{i}', {'tests/test_x.py::test_flaky': status})
+        response = dashboard_client.get('/flaky')
+
+        assert response.status_code == 200
+        assert b'test_flaky' in response.data
+        assert b'AssertionError: assert N == N' in response.data
+
+
+class TestModuleCoverage:
+    """Integration tests for per-module coverage and deltas"""
+
+    def modules(self, missing):
+        return [{'module': 'app/a.py', 'statements': 100, 'missing': missing},
+                {'module': 'app/b.py', 'statements': 50, 'missing': 0}]
+
+    @pytest.mark.integration
+    def test_module_coverage_from_coverage_data(self, tmp_path):
+        """Test counts come from coverage data for files under the source dir"""
+        coverage = pytest.importorskip('coverage')
+        source = tmp_path / 'pkg'
+        source.mkdir()
+        (source / 'mod.py').write_text('def f(x):\n    if x:\n        return 1\n    return 2\n')
+
+        cov = coverage.Coverage(data_file=None)
+        cov.start()
+        namespace = {}
+        exec(compile((source / 'mod.py').read_text(), str(source / 'mod.py'), 'exec'), namespace)
+        namespace['f'](True)
+        cov.stop()
+
+        assert module_coverage(cov, str(source), str(tmp_path)) == [
+            {'module': 'pkg/mod.py', 'statements': 4, 'missing': 1}]
+
+    @pytest.mark.integration
+    def test_ingest_saves_modules_and_total(self, dashboard_app):
+        """Test modules are stored and the run total is weighted by statements"""
+        test_run, _ = ingest_run('cov-1', [], modules=self.modules(missing=30))
+
+        assert test_run.coverage == 80.0
+        assert {c.module_name: c.coverage_percent for c in CoverageReport.query} == {
+            'app/a.py': 70.0, 'app/b.py': 100.0}
+
+    @pytest.mark.integration
+    def test_api_coverage_deltas(self, dashboard_client):
+        """Test deltas are computed against the previous run with coverage"""
+        first, _ = ingest_run('cov-1', [], modules=self.modules(missing=30))
+        second, _ = ingest_run('cov-2', [], modules=self.modules(missing=10) + [
+            {'module': 'app/c.py', 'statements': 10, 'missing': 5}])
+        data = dashboard_client.get(f'/api/coverage?run={second.id}').get_json()
+
+        assert {m['module']: m['delta'] for m in data} == {'app/a.py': 20.0, 'app/b.py': 0.0, 'app/c.py': None}
+        assert coverage_delta(second) == round(second.coverage - first.coverage, 2)
+
+
+class TestImpactSelection:
+    """Integration tests for coverage-based test impact selection"""
+
+    TESTS = ['tests/unit/test_a.py::test_login', 'tests/unit/test_a.py::test_transfer',
+             'tests/unit/test_b.py::test_report', 'tests/unit/test_new.py::test_unmapped']
+
+    def record(self):
+        ingest_run('impact-1', [], impact={
+            'tests/unit/test_a.py::test_login': {'app/routes/auth.py': [1, 2, 3]},
+            'tests/unit/test_a.py::test_transfer': {'app/routes/auth.py': [1],
+                                                    'app/routes/transactions.py': [10, 11]},
+            'tests/unit/test_b.py::test_report': {'app/routes/reports.py': [5]},
+        })
+
+    @pytest.mark.integration
+    def test_selects_tests_that_touched_changed_files(self, dashboard_app):
+        """Test only tests covering the change, plus unmapped tests, are selected"""
+        self.record()
+
+        selected, reason = impacted_tests(self.TESTS, ['app/routes/transactions.py'])
+
+        assert reason is None
+        assert selected == ['tests/unit/test_a.py::test_transfer', 'tests/unit/test_new.py::test_unmapped']
+
+    @pytest.mark.integration
+    def test_changed_test_module_and_unmapped_files(self, dashboard_app):
+        """Test changed test modules run in full and other changes select everything"""
+        self.record()
+
+        selected, _ = impacted_tests(self.TESTS, ['tests/unit/test_b.py'])
+        assert selected == ['tests/unit/test_b.py::test_report', 'tests/unit/test_new.py::test_unmapped']
+
+        selected, reason = impacted_tests(self.TESTS, ['tests/conftest.py'])
+        assert selected == self.TESTS
+        assert 'tests/conftest.py' in reason
+
+    @pytest.mark.integration
+    def test_template_change_selects_everything(self, dashboard_app):
+        """Test a template change, which coverage never records, runs the full suite"""
+        self.record()
+
+        selected, reason = impacted_tests(self.TESTS, ['app/routes/auth.py', 'app/templates/dashboard/index.html'])
+
+        assert selected == self.TESTS
+        assert 'app/templates/dashboard/index.html' in reason
+
+    @pytest.mark.integration
+    def test_new_module_selects_everything(self, dashboard_app):
+        """Test a source module without coverage rows yet runs the full suite"""
+        self.record()
+
+        selected, reason = impacted_tests(self.TESTS, ['app/services/new_feature.py'])
+
+        assert selected == self.TESTS
+        assert 'app/services/new_feature.py' in reason
+
+    @pytest.mark.integration
+    def test_map_is_updated_incrementally(self, dashboard_app):
+        """Test only the tests in a later run replace their rows"""
+        self.record()
+        ingest_run('impact-2', [], impact={
+            'tests/unit/test_a.py::test_login': {'app/routes/admin.py': [7, 8, 9]}})
+
+        rows = {(r.test_name, r.file_path): r.lines for r in TestImpact.query}
+        assert rows[('tests/unit/test_a.py::test_login', 'app/routes/admin.py')] == '7-9'
+        assert ('tests/unit/test_a.py::test_login', 'app/routes/auth.py') not in rows
+        assert ('tests/unit/test_b.py::test_report', 'app/routes/reports.py') in rows
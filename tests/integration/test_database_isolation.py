@@ -0,0 +1,39 @@
+import pytest
+from app import db
+from app.models.user import User
+
+
+class TestDatabaseIsolation:
+    """Tests for the transactional test database fixtures"""
+
+    @pytest.mark.integration
+    def test_commit_inside_test(self, app):
+        """Test a commit in a test only releases a savepoint"""
+        user = User(username='isolated', email='isolated@example.com', role='customer')
+        user.password_hash = 'x'
+        db.session.add(user)
+        db.session.commit()
+
+        assert User.query.filter_by(username='isolated').count() == 1
+
+    @pytest.mark.integration
+    def test_previous_commit_rolled_back(self, app):
+        """Test rows committed by an earlier test are gone"""
+        assert User.query.filter_by(username='isolated').count() == 0
+
+    @pytest.mark.integration
+    def test_rollback_keeps_fixture_rows(self, app, test_user):
+        """Test a rollback in the code under test stops at its own savepoint"""
+        user = User(username='discarded', email='discarded@example.com', role='customer')
+        user.password_hash = 'x'
+        db.session.add(user)
+        db.session.rollback()
+
+        assert User.query.filter_by(username='testuser').count() == 1
+        assert User.query.filter_by(username='discarded').count() == 0
+
+    @pytest.mark.integration
+    def test_fixture_credentials_log_in(self, authenticated_client):
+        """Test pre-hashed fixture passwords are accepted at login"""
+        response = authenticated_client.get('/', follow_redirects=True)
+        assert b'Please log in' not in response.data
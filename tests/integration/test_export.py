@@ -0,0 +1,106 @@
+import csv
+import io
+import pytest
+from datetime import datetime
+from app import db
+from app.models.transaction import Transaction
+from app.services.export import ExportFilters, export_chunks
+
+
+class TestExport:
+    """Integration tests for streaming transaction exports"""
+
+    @pytest.fixture
+    def transactions(self, app, test_account, second_account):
+        for i, (account, transaction_type, amount, day) in enumerate([
+            (test_account, 'deposit', 100.0, 1),
+            (test_account, 'withdrawal', 40.0, 2),
+            (second_account, 'deposit', 25.0, 2),
+            (second_account, 'withdrawal', 10.0, 5),
+        ]):
+            transaction = Transaction(account_id=account.id, transaction_type=transaction_type, amount=amount,
+                                      description=f'Export {i}')
+            transaction.timestamp = datetime(2026, 3, day, 12)
+            db.session.add(transaction)
+        db.session.commit()
+
+    def read_csv(self, data):
+        return list(csv.DictReader(io.StringIO(data.decode('utf-8'))))
+
+    @pytest.mark.integration
+    def test_csv_is_streamed_in_chunks(self, app, transactions):
+        """Test every chunk is encoded separately and the header comes once"""
+        chunks = list(export_chunks(ExportFilters(), 'csv', chunk_size=1))
+
+        assert len(chunks) == 4
+        rows = self.read_csv(b''.join(chunks))
+        assert [row['description'] for row in rows] == ['Export 0', 'Export 1', 'Export 2', 'Export 3']
+        assert rows[1]['balance_change'] == '-40.0'
+        assert rows[0]['timestamp'] == '2026-03-01 12:00:00'
+
+    @pytest.mark.integration
+    def test_filters(self, app, transactions):
+        """Test date range, type and account filters"""
+        filters = ExportFilters.from_strings('2026-03-02', '2026-03-02', 'deposit', '987654321098')
+        rows = self.read_csv(b''.join(export_chunks(filters)))
+
+        assert [row['description'] for row in rows] == ['Export 2']
+
+    @pytest.mark.integration
+    def test_invalid_filters(self, app):
+        """Test bad dates and formats are rejected"""
+        with pytest.raises(ValueError):
+            ExportFilters.from_strings('03/01/2026')
+        with pytest.raises(ValueError):
+            ExportFilters.from_strings('2026-03-05', '2026-03-01')
+        with pytest.raises(ValueError):
+            export_chunks(ExportFilters(), 'xlsx')
+
+    @pytest.mark.integration
+    def test_parquet_row_group_per_chunk(self, app, transactions):
+        """Test Parquet output has one row group per chunk and typed columns"""
+        parquet = pytest.importorskip('pyarrow.parquet')
+
+        data = b''.join(export_chunks(ExportFilters(), 'parquet', chunk_size=3))
+        file = parquet.ParquetFile(io.BytesIO(data))
+
+        assert file.metadata.num_rows == 4
+        assert file.metadata.num_row_groups == 2
+        table = file.read()
+        assert table.column('amount').to_pylist() == [100.0, 40.0, 25.0, 10.0]
+        assert table.column('timestamp').to_pylist()[0] == datetime(2026, 3, 1, 12)
+
+    @pytest.mark.integration
+    def test_admin_export_download(self, admin_client, transactions):
+        """Test the admin endpoint streams an attachment"""
+        response = admin_client.get('/admin/transactions/export?format=csv&type=withdrawal')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        assert 'attachment' in response.headers['Content-Disposition']
+        assert [row['description'] for row in self.read_csv(response.data)] == ['Export 1', 'Export 3']
+
+    @pytest.mark.integration
+    def test_admin_export_bad_date(self, admin_client):
+        """Test a bad filter redirects back with a message"""
+        response = admin_client.get('/admin/transactions/export?start=yesterday', follow_redirects=True)
+
+        assert response.status_code == 200
+        assert b'Dates must be YYYY-MM-DD' in response.data
+
+    @pytest.mark.integration
+    def test_export_requires_admin(self, authenticated_client):
+        """Test customers cannot export"""
+        response = authenticated_client.get('/admin/transactions/export')
+
+        assert response.status_code in (302, 403)
+
+    @pytest.mark.integration
+    def test_cli_export(self, app, runner, transactions, tmp_path):
+        """Test flask ledger export writes the file"""
+        output = tmp_path / 'march.csv'
+        result = runner.invoke(args=['ledger', 'export', '--output', str(output), '--start', '2026-03-02'])
+
+        assert result.exit_code == 0, result.output
+        assert '3 transactions' in result.output
+        assert len(self.read_csv(output.read_bytes())) == 3
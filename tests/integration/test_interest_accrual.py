@@ -0,0 +1,100 @@
+import pytest
+from datetime import date, datetime, timedelta
+from app import db
+from app.models.account import Account
+from app.models.interest import InterestAccrual
+from app.models.transaction import Transaction
+from app.services.interest import accrue_interest
+
+
+class TestInterestAccrual:
+    """Integration tests for the daily interest accrual job"""
+
+    DAY = date(2026, 3, 1)
+
+    def accounts(self, test_user):
+        rows = [('100000000001', 'savings', 36_500.0, 'active'),
+                ('100000000002', 'checking', 36_500.0, 'active'),
+                ('100000000003', 'savings', 36_500.0, 'closed'),
+                ('100000000004', 'savings', 0.0, 'active'),
+                ('100000000005', 'savings', 3_650.0, 'active')]
+        accounts = [Account(user_id=test_user.id, account_number=number, account_type=kind,
+                            balance=balance, status=status)
+                    for number, kind, balance, status in rows]
+        db.session.add_all(accounts)
+        db.session.commit()
+        return accounts
+
+    @pytest.mark.integration
+    def test_accrues_eligible_accounts(self, app, test_user):
+        """Test only active, positive, interest-bearing accounts are credited"""
+        savings, checking, closed, empty, small = self.accounts(test_user)
+
+        job = accrue_interest(self.DAY, chunk_size=2)
+
+        db.session.expire_all()
+        # 10k at 2.0%, 26.5k at 2.5% over 365 days
+        assert savings.balance == pytest.approx(36_500 + 2.36)
+        assert checking.balance == pytest.approx(36_500 + 0.10)
+        assert small.balance == pytest.approx(3_650 + 0.20)
+        assert closed.balance == 36_500.0 and empty.balance == 0.0
+        assert job.accounts == 3
+        assert job.total_interest == pytest.approx(2.66)
+        assert job.completed_at is not None
+        assert Transaction.query.filter_by(transaction_type='interest').count() == 3
+
+    @pytest.mark.integration
+    def test_backfill_posts_on_accrual_date(self, app, test_user):
+        """Test interest for a past date is dated that day, not when the job ran"""
+        savings = self.accounts(test_user)[0]
+        accrue_interest(self.DAY)
+
+        posting = Transaction.query.filter_by(account_id=savings.id).one()
+        assert posting.timestamp == datetime(2026, 3, 1, 23, 59, 59)
+
+    @pytest.mark.integration
+    def test_rerun_is_noop(self, app, test_user):
+        """Test a completed date is never credited twice"""
+        savings = self.accounts(test_user)[0]
+        accrue_interest(self.DAY)
+        accrue_interest(self.DAY)
+
+        db.session.expire_all()
+        assert savings.balance == pytest.approx(36_500 + 2.36)
+        assert Transaction.query.filter_by(account_id=savings.id).count() == 1
+
+    @pytest.mark.integration
+    def test_resumes_after_checkpoint(self, app, test_user):
+        """Test an interrupted job continues after the last committed account"""
+        savings, checking, _, _, small = self.accounts(test_user)
+        job = InterestAccrual(self.DAY)
+        job.last_account_id = checking.id
+        db.session.add(job)
+        db.session.commit()
+
+        accrue_interest(self.DAY)
+
+        db.session.expire_all()
+        assert savings.balance == 36_500.0
+        assert small.balance == pytest.approx(3_650 + 0.20)
+        assert Transaction.query.filter_by(transaction_type='interest').count() == 1
+
+    @pytest.mark.integration
+    def test_cli_accrue(self, runner, test_user):
+        """Test the accrue command reports the job"""
+        self.accounts(test_user)
+        result = runner.invoke(args=['interest', 'accrue', '--date', '2026-03-01'])
+
+        assert result.exit_code == 0
+        assert '3 accounts credited' in result.output
+
+    @pytest.mark.integration
+    def test_cli_defaults_to_last_complete_day(self, runner, test_user):
+        """Test the accrue command never accrues a day that has not finished"""
+        self.accounts(test_user)
+        result = runner.invoke(args=['interest', 'accrue'])
+
+        assert result.exit_code == 0
+        yesterday = datetime.utcnow().date() - timedelta(days=1)
+        assert result.output.startswith(f'{yesterday}:')
+        assert InterestAccrual.query.one().accrual_date == yesterday
@@ -0,0 +1,69 @@
+import pytest
+from app.utils.metrics import Histogram, RequestMetrics
+
+
+class TestMetrics:
+    """Tests for request/SQL metrics and the Prometheus endpoint"""
+
+    @pytest.mark.integration
+    def test_metrics_requires_admin(self, authenticated_client):
+        """Test regular users cannot read metrics"""
+        response = authenticated_client.get('/admin/metrics', follow_redirects=True)
+        assert b'Admin privileges required' in response.data
+
+    @pytest.mark.integration
+    def test_metrics_prometheus_format(self, admin_client):
+        """Test admins get latency, status and SQL metrics"""
+        admin_client.get('/')
+        response = admin_client.get('/admin/metrics')
+        body = response.get_data(as_text=True)
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        assert '# TYPE bank_http_request_duration_seconds histogram' in body
+        assert 'bank_http_request_duration_seconds_bucket{endpoint="dashboard.index",le="+Inf"}' in body
+        assert 'bank_http_requests_total{endpoint="dashboard.index",method="GET",status="200"}' in body
+        assert 'bank_sql_statements_total{endpoint="dashboard.index"}' in body
+
+    @pytest.mark.integration
+    def test_sql_statements_counted_per_request(self, admin_client, app):
+        """Test SQL statements are attributed to the endpoint that ran them"""
+        admin_client.get('/admin/users')
+        metrics = app.extensions['metrics']
+
+        assert metrics.sql_count['admin.list_users'] >= 1
+        assert metrics.sql_per_request['admin.list_users'].count == 1
+
+    @pytest.mark.integration
+    def test_failed_statement_leaves_no_timer(self, app):
+        """Test a statement that raises leaves nothing behind on the pooled connection"""
+        from sqlalchemy import text
+        from sqlalchemy.exc import OperationalError
+        from app import db
+
+        connection = db.session.connection()
+        with pytest.raises(OperationalError):
+            connection.execute(text('SELECT * FROM no_such_table'))
+        db.session.rollback()
+
+        assert not any(key in db.session.connection().info for key in ('metrics_start', 'slow_query_start'))
+
+    @pytest.mark.unit
+    def test_histogram_cumulative_buckets(self):
+        """Test histogram buckets are exported cumulatively"""
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value)
+
+        assert list(histogram.cumulative()) == [(0.1, 1), (1.0, 3), ('+Inf', 4)]
+        assert histogram.count == 4
+
+    @pytest.mark.unit
+    def test_record_request_status_codes(self):
+        """Test responses are counted per status code"""
+        metrics = RequestMetrics()
+        metrics.record_request('auth.login', 'POST', 302, 0.01, 2, 0.001)
+        metrics.record_request('auth.login', 'POST', 200, 0.01, 2, 0.001)
+
+        assert metrics.responses[('auth.login', 'POST', 302)] == 1
+        assert metrics.sql_count['auth.login'] == 4
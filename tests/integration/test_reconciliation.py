@@ -0,0 +1,94 @@
+import csv
+import pytest
+from datetime import datetime, timedelta
+from app import db
+from app.models.account import Account
+from app.models.reconciliation import ReconciliationDiscrepancy, ReconciliationRun
+from app.models.transaction import Transaction
+from app.services.reconciliation import reconcile
+
+
+class TestReconciliation:
+    """Integration tests for ledger reconciliation"""
+
+    @pytest.fixture
+    def ledger(self, app, test_account, second_account, post_transaction):
+        # Balances are 1000 and 500; their transactions add up to the same
+        post_transaction(test_account, 'deposit', 1200.0)
+        post_transaction(test_account, 'withdrawal', 100.0)
+        post_transaction(test_account, 'transfer', -100.0)
+        post_transaction(second_account, 'deposit', 400.0)
+        post_transaction(second_account, 'transfer', 100.0)
+        # Last touched well before any run
+        db.session.execute(Account.__table__.update().values(updated_at=datetime.utcnow() - timedelta(days=1)))
+        db.session.commit()
+        return test_account, second_account
+
+    def edit_balance(self, account, balance):
+        """A change outside the posting routes (e.g. a manual edit)"""
+        db.session.execute(Account.__table__.update().where(Account.id == account.id).values(
+            balance=balance, updated_at=datetime.utcnow()))
+        db.session.commit()
+
+    @pytest.mark.integration
+    def test_balanced_ledger(self, app, ledger, tmp_path):
+        """Test a full run over balanced accounts finds nothing"""
+        run = reconcile(str(tmp_path))
+
+        assert (run.mode, run.accounts, run.transactions, run.discrepancy_count) == ('full', 2, 5, 0)
+        assert run.max_transaction_id == db.session.query(db.func.max(Transaction.id)).scalar()
+        with open(run.report_path, newline='') as f:
+            assert len(list(csv.reader(f))) == 1  # header only
+
+    @pytest.mark.integration
+    def test_drift_reported(self, app, ledger, tmp_path):
+        """Test an account whose balance drifted from its ledger is reported"""
+        test_account, _ = ledger
+        self.edit_balance(test_account, 1025.5)
+
+        run = reconcile(str(tmp_path))
+
+        discrepancy = ReconciliationDiscrepancy.query.one()
+        assert (discrepancy.account_id, discrepancy.ledger_balance, discrepancy.difference) == \
+            (test_account.id, 1000.0, 25.5)
+        with open(run.report_path, newline='') as f:
+            rows = list(csv.reader(f))
+        assert rows[1] == [str(test_account.id), test_account.account_number, '1025.50', '1000.00', '25.50', '3']
+
+    @pytest.mark.integration
+    def test_incremental_checks_changed_accounts(self, app, ledger, tmp_path, post_transaction):
+        """Test later runs only check accounts changed since the checkpoint"""
+        test_account, second_account = ledger
+        reconcile(str(tmp_path))
+        # Backdate the checkpoint so only the changes below are newer
+        ReconciliationRun.query.one().started_at -= timedelta(hours=1)
+        db.session.commit()
+
+        assert reconcile(str(tmp_path)).accounts == 0
+
+        post_transaction(second_account, 'deposit', 50.0)  # posted without updating the balance
+        db.session.commit()
+        run = reconcile(str(tmp_path))
+        assert (run.mode, run.accounts, run.discrepancy_count) == ('incremental', 1, 1)
+
+        # Still out of balance, so checked again even though nothing changed
+        assert reconcile(str(tmp_path)).accounts == 1
+
+    @pytest.mark.integration
+    def test_full_flag(self, app, ledger, tmp_path):
+        """Test --full checks every account after an earlier run"""
+        reconcile(str(tmp_path))
+
+        assert reconcile(str(tmp_path), full=True).accounts == 2
+
+    @pytest.mark.integration
+    def test_cli_reconcile(self, runner, ledger, tmp_path):
+        """Test the command summarises the run and fails on discrepancies"""
+        result = runner.invoke(args=['ledger', 'reconcile', '--workers', '1', '--output', str(tmp_path)])
+        assert result.exit_code == 0, result.output
+        assert 'Full run: 2 accounts, 5 transactions' in result.output
+
+        self.edit_balance(ledger[0], 0.0)
+        result = runner.invoke(args=['ledger', 'reconcile', '--workers', '1', '--full', '--output', str(tmp_path)])
+        assert result.exit_code == 1
+        assert '1 discrepancies' in result.output
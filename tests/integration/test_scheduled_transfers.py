@@ -0,0 +1,188 @@
+import pytest
+from datetime import datetime, timedelta
+from app import db
+from app.models.account import Account
+from app.models.scheduled_transfer import ScheduledTransfer
+from app.models.transaction import Transaction
+from app.services.scheduler import RETRY_DELAY, TransferScheduler
+
+
+NOW = datetime(2026, 3, 1, 9)
+
+
+def make_schedule(account, to_account, amount=100.0, frequency='monthly', start_at=NOW, **kwargs):
+    schedule = ScheduledTransfer(account.user_id, account.id, to_account.account_number, amount,
+                                 start_at, frequency=frequency, description='Rent', **kwargs)
+    db.session.add(schedule)
+    db.session.commit()
+    return schedule
+
+
+class TestTransferScheduler:
+    """Integration tests for executing scheduled transfers"""
+
+    @pytest.mark.integration
+    def test_due_transfer_executes_and_recurs(self, app, test_account, second_account):
+        """Test a due monthly transfer posts both sides and moves to next month"""
+        schedule = make_schedule(test_account, second_account)
+
+        outcomes = TransferScheduler().tick(NOW)
+
+        assert outcomes == {'completed': 1}
+        balances = [db.session.get(Account, a.id).balance for a in (test_account, second_account)]
+        assert balances == [900.0, 600.0]
+        assert Transaction.query.filter_by(transaction_type='transfer').count() == 2
+        assert schedule.next_run_at == datetime(2026, 4, 1, 9)
+        assert (schedule.runs, schedule.status) == (1, 'active')
+
+    @pytest.mark.integration
+    def test_future_transfer_waits_in_heap(self, app, test_account, second_account):
+        """Test a transfer due within the lookahead is queued, then runs when due"""
+        make_schedule(test_account, second_account, start_at=NOW + timedelta(minutes=2))
+        scheduler = TransferScheduler()
+
+        assert scheduler.tick(NOW) == {}
+        assert len(scheduler.heap) == 1
+        assert scheduler.tick(NOW + timedelta(minutes=2)) == {'completed': 1}
+        assert scheduler.heap == []
+
+    @pytest.mark.integration
+    def test_insufficient_funds_retried_then_skipped(self, app, test_account, second_account):
+        """Test a failing occurrence is retried, then skipped until the next date"""
+        schedule = make_schedule(test_account, second_account, amount=5_000.0)
+        scheduler = TransferScheduler(max_attempts=2)
+
+        assert scheduler.tick(NOW) == {'retrying': 1}
+        assert schedule.next_run_at == NOW + RETRY_DELAY
+        assert schedule.last_result == 'retrying: insufficient funds'
+
+        assert scheduler.tick(NOW + RETRY_DELAY) == {'skipped': 1}
+        assert (schedule.status, schedule.attempts) == ('active', 0)
+        assert schedule.next_run_at == datetime(2026, 4, 1, 9)
+        assert Transaction.query.count() == 0
+
+    @pytest.mark.integration
+    def test_inactive_recipient_fails(self, app, test_account, second_account):
+        """Test a transfer to a closed account fails the schedule for good"""
+        schedule = make_schedule(test_account, second_account, frequency='once')
+        second_account.status = 'closed'
+        db.session.commit()
+
+        assert TransferScheduler().tick(NOW) == {'failed': 1}
+        assert schedule.status == 'failed'
+        assert schedule.next_run_at is None
+
+    @pytest.mark.integration
+    def test_one_off_completes(self, app, test_account, second_account):
+        """Test a one-off transfer is completed after it runs"""
+        schedule = make_schedule(test_account, second_account, frequency='once')
+
+        TransferScheduler().tick(NOW)
+
+        assert schedule.status == 'completed'
+        assert TransferScheduler().tick(NOW + timedelta(days=40)) == {}
+
+    @pytest.mark.integration
+    def test_batches_share_accounts(self, app, test_account, second_account):
+        """Test several transfers from one account in a batch see each other's debits"""
+        for _ in range(4):
+            make_schedule(test_account, second_account, amount=300.0, frequency='once')
+
+        outcomes = TransferScheduler(batch_size=3).tick(NOW)
+
+        assert outcomes == {'completed': 3, 'retrying': 1}
+        assert db.session.get(Account, test_account.id).balance == 100.0
+
+
+    @pytest.mark.integration
+    def test_error_rolls_back_batch(self, app, test_account, second_account, monkeypatch):
+        """Test an unexpected error undoes the batch and only sets that schedule aside"""
+        from app.services import scheduler as scheduler_module
+        good = make_schedule(test_account, second_account, frequency='once')
+        bad = make_schedule(test_account, second_account, frequency='once', start_at=NOW + timedelta(seconds=1))
+        post_transfer = scheduler_module.post_transfer
+
+        def flaky(schedule, *args):
+            if schedule.id == bad.id:
+                raise RuntimeError('boom')
+            return post_transfer(schedule, *args)
+        monkeypatch.setattr(scheduler_module, 'post_transfer', flaky)
+        scheduler = TransferScheduler()
+
+        assert scheduler.tick(NOW + timedelta(seconds=1)) == {'retrying': 1}
+        assert Transaction.query.count() == 0
+        assert scheduler.tick(NOW + timedelta(seconds=2)) == {'completed': 1}
+        assert (good.status, bad.last_result) == ('completed', 'retrying: error')
+
+    @pytest.mark.integration
+    def test_velocity_rules_apply(self, app, test_account, second_account):
+        """Test scheduled transfers count towards the burst rule and are retried when it blocks"""
+        for _ in range(6):
+            make_schedule(test_account, second_account, amount=10.0, frequency='once')
+
+        outcomes = TransferScheduler().tick(NOW)
+
+        assert outcomes == {'completed': 5, 'retrying': 1}
+        assert 'per minute' in ScheduledTransfer.query.filter_by(status='active').one().last_result
+
+    @pytest.mark.integration
+    def test_rolled_back_batch_releases_velocity(self, app, test_account, second_account, monkeypatch):
+        """Test transfers undone with their batch do not use up the burst rule"""
+        from app.services import scheduler as scheduler_module
+        for i in range(6):
+            make_schedule(test_account, second_account, amount=10.0, frequency='once',
+                          start_at=NOW + timedelta(seconds=i))
+        post_transfer = scheduler_module.post_transfer
+        calls = []
+
+        def flaky(schedule, *args):
+            calls.append(schedule.id)
+            if len(calls) == 6:
+                raise RuntimeError('boom')
+            return post_transfer(schedule, *args)
+        monkeypatch.setattr(scheduler_module, 'post_transfer', flaky)
+        engine = app.extensions['velocity']
+
+        assert TransferScheduler().tick(NOW + timedelta(seconds=5)) == {'retrying': 1}
+        assert engine.check(test_account.id, 10.0).action == 'allow'
+        assert Transaction.query.count() == 0
+
+
+class TestScheduledTransferRoutes:
+    """Integration tests for the scheduled transfer pages"""
+
+    @pytest.mark.integration
+    def test_create_and_cancel(self, authenticated_client, test_account, second_account):
+        """Test users can schedule a standing order and cancel it"""
+        start = (datetime.utcnow() + timedelta(days=3)).date()
+        response = authenticated_client.post('/transactions/scheduled', data={
+            'from_account_id': test_account.id,
+            'to_account_number': second_account.account_number,
+            'amount': '750.00',
+            'frequency': 'monthly',
+            'start_date': start.isoformat(),
+            'description': 'Rent'
+        }, follow_redirects=True)
+
+        assert b'Scheduled a monthly transfer of $750.00' in response.data
+        schedule = ScheduledTransfer.query.one()
+        assert schedule.next_run_at == datetime.combine(start, datetime.min.time())
+
+        response = authenticated_client.post(f'/transactions/scheduled/{schedule.id}/cancel',
+                                             follow_redirects=True)
+        assert b'Scheduled transfer cancelled' in response.data
+        assert schedule.status == 'cancelled'
+
+    @pytest.mark.integration
+    def test_rejects_past_start(self, authenticated_client, test_account, second_account):
+        """Test a start date in the past is rejected"""
+        response = authenticated_client.post('/transactions/scheduled', data={
+            'from_account_id': test_account.id,
+            'to_account_number': second_account.account_number,
+            'amount': '10.00',
+            'frequency': 'once',
+            'start_date': '2000-01-01'
+        }, follow_redirects=True)
+
+        assert b'Start date cannot be in the past' in response.data
+        assert ScheduledTransfer.query.count() == 0
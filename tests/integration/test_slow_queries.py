@@ -0,0 +1,98 @@
+import pytest
+from app.utils.slow_queries import normalize_statement, parameters_shape, top_offenders
+
+
+class TestSlowQueryLog:
+    """Tests for the slow-query recorder and admin page"""
+
+    @pytest.mark.unit
+    def test_normalize_statement(self):
+        """Test literals and IN-lists are normalized"""
+        sql = "SELECT * FROM transactions WHERE account_id IN (?, ?, ?) AND amount > 10.5 AND type = 'deposit'"
+        assert normalize_statement(sql) == \
+            'SELECT * FROM transactions WHERE account_id IN (?...) AND amount > ? AND type = ?'
+
+    @pytest.mark.unit
+    def test_parameters_shape_hides_values(self):
+        """Test only parameter types are recorded"""
+        assert parameters_shape((1, 'secret', 2.5)) == ['int', 'str', 'float']
+        assert parameters_shape([(1,), (2,)], executemany=True) == {'rows': 2, 'row': ['int']}
+
+    @pytest.mark.unit
+    def test_top_offenders_aggregates(self):
+        """Test entries are grouped by normalized statement and ranked by total time"""
+        entries = [
+            {'normalized': 'A', 'duration_ms': 10, 'timestamp': 't1', 'endpoint': 'x.a', 'plan': ['p1']},
+            {'normalized': 'A', 'duration_ms': 30, 'timestamp': 't2', 'endpoint': 'x.b', 'plan': ['p2']},
+            {'normalized': 'B', 'duration_ms': 25, 'timestamp': 't3', 'endpoint': None},
+        ]
+        ranked = top_offenders(entries)
+
+        assert [g['normalized'] for g in ranked] == ['A', 'B']
+        assert ranked[0]['count'] == 2
+        assert ranked[0]['avg_ms'] == 20
+        assert ranked[0]['plan'] == ['p2']
+        assert ranked[0]['endpoints'] == ['x.a', 'x.b']
+
+    @pytest.mark.integration
+    def test_slow_queries_logged_with_plan(self, admin_client, app):
+        """Test statements above the threshold reach the admin page with their plan"""
+        app.config['SLOW_QUERY_THRESHOLD_MS'] = 0
+        admin_client.get('/admin/users')
+        app.config['SLOW_QUERY_THRESHOLD_MS'] = 100
+
+        response = admin_client.get('/admin/slow-queries')
+
+        assert response.status_code == 200
+        assert b'FROM users' in response.data
+        assert b'admin.list_users' in response.data
+        assert b'SCAN' in response.data or b'SEARCH' in response.data
+
+    @pytest.mark.integration
+    def test_slow_queries_requires_admin(self, authenticated_client):
+        """Test regular users cannot open the slow-query page"""
+        response = authenticated_client.get('/admin/slow-queries', follow_redirects=True)
+        assert b'Admin privileges required' in response.data
+
+    @pytest.mark.integration
+    def test_apps_keep_separate_logs(self, tmp_path):
+        """Test an app's slow queries never reach another app's log file"""
+        from sqlalchemy import text
+        from app import create_app, db
+
+        apps = [create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / f'{name}.db'}",
+            'SLOW_QUERY_THRESHOLD_MS': 0,
+            'SLOW_QUERY_LOG': str(tmp_path / f'{name}.log'),
+            'METRICS_ENABLED': False,
+            'VELOCITY_ENABLED': False,
+        }) for name in ('first', 'second')]
+        for app in apps:
+            app.extensions['slow_queries'].handlers[0].flush()
+        first_size = (tmp_path / 'first.log').stat().st_size
+
+        with apps[1].app_context():
+            db.session.execute(text('SELECT 42 AS second_app'))
+            db.session.remove()
+        for app in apps:
+            app.extensions['slow_queries'].handlers[0].close()
+
+        assert 'second_app' in (tmp_path / 'second.log').read_text()
+        assert (tmp_path / 'first.log').stat().st_size == first_size
+
+    @pytest.mark.integration
+    def test_apps_share_handler_per_path(self, tmp_path):
+        """Test apps logging to the same file reuse one handler instead of opening another"""
+        from app import create_app
+
+        apps = [create_app({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / f'{name}.db'}",
+            'SLOW_QUERY_THRESHOLD_MS': 0,
+            'SLOW_QUERY_LOG': str(tmp_path / 'shared.log'),
+            'METRICS_ENABLED': False,
+            'VELOCITY_ENABLED': False,
+        }) for name in ('first', 'second')]
+        handlers = [app.extensions['slow_queries'].handlers for app in apps]
+
+        assert handlers[0] == handlers[1] and len(handlers[0]) == 1
+        assert apps[0].extensions['slow_queries'] is not apps[1].extensions['slow_queries']
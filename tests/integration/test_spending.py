@@ -0,0 +1,128 @@
+import pytest
+from datetime import date, datetime
+from app import db
+from app.models.account import Account
+from app.models.spending import SpendingRollup
+from app.models.transaction import Transaction
+from app.services.interest import accrue_interest
+from app.services.spending import monthly_spending, rebuild_rollup
+
+
+class TestSpendingRollup:
+    """Integration tests for the monthly spending rollup"""
+
+    def rollup(self):
+        return {(r.account_id, r.month, r.transaction_type): (round(r.money_in, 2), round(r.money_out, 2), r.count)
+                for r in SpendingRollup.query.all()}
+
+    def month(self):
+        return f'{datetime.utcnow():%Y-%m}'
+
+    @pytest.mark.integration
+    def test_postings_update_rollup(self, authenticated_client, test_account, second_account):
+        """Test deposits, withdrawals and both sides of a transfer are rolled up"""
+        account_id, second_id = test_account.id, second_account.id
+        authenticated_client.post('/transactions/deposit', data={
+            'account_id': account_id, 'amount': '250.00', 'description': 'Pay'})
+        authenticated_client.post('/transactions/deposit', data={
+            'account_id': account_id, 'amount': '50.00', 'description': 'Gift'})
+        authenticated_client.post('/transactions/withdraw', data={
+            'account_id': account_id, 'amount': '80.00', 'description': 'ATM'})
+        authenticated_client.post('/transactions/transfer', data={
+            'from_account_id': account_id, 'to_account_number': '987654321098', 'amount': '100.00',
+            'description': 'Rent'})
+
+        month = self.month()
+        assert self.rollup() == {
+            (account_id, month, 'deposit'): (300.0, 0.0, 2),
+            (account_id, month, 'withdrawal'): (0.0, 80.0, 1),
+            (account_id, month, 'transfer'): (0.0, 100.0, 1),
+            (second_id, month, 'transfer'): (100.0, 0.0, 1),
+        }
+        assert {r.user_id for r in SpendingRollup.query} == {db.session.get(Account, account_id).user_id}
+
+    @pytest.mark.integration
+    def test_rolled_back_posting_is_not_counted(self, app, test_account):
+        """Test the rollup is written in the posting's transaction"""
+        db.session.add(Transaction(account_id=test_account.id, transaction_type='deposit', amount=10.0))
+        db.session.flush()
+        assert SpendingRollup.query.count() == 1
+        db.session.rollback()
+
+        assert SpendingRollup.query.count() == 0
+
+    @pytest.mark.integration
+    def test_interest_accrual_updates_rollup(self, app, test_account):
+        """Test bulk-inserted interest postings are rolled up in the accrual month"""
+        accrue_interest(date(2026, 3, 1))
+        accrue_interest(date(2026, 3, 2))
+
+        (key, (money_in, money_out, count)), = self.rollup().items()
+        assert key == (test_account.id, '2026-03', 'interest')
+        assert count == 2 and money_out == 0.0
+        assert money_in == round(sum(t.amount for t in Transaction.query.filter_by(transaction_type='interest')), 2)
+
+    @pytest.mark.integration
+    def test_rebuild_matches_incremental(self, app, test_account, second_account, post_transaction):
+        """Test a rebuild reproduces the incrementally maintained rows"""
+        post_transaction(test_account, 'deposit', 100.0, datetime(2026, 1, 5))
+        post_transaction(test_account, 'withdrawal', 30.0, datetime(2026, 1, 9))
+        post_transaction(second_account, 'deposit', 20.0, datetime(2026, 2, 1))
+        db.session.commit()
+        incremental = self.rollup()
+
+        assert rebuild_rollup() == 3
+        assert self.rollup() == incremental
+        assert incremental[(test_account.id, '2026-01', 'withdrawal')] == (0.0, 30.0, 1)
+
+    @pytest.mark.integration
+    def test_monthly_spending(self, app, test_account, post_transaction):
+        """Test months are filled in oldest first and totals summed across types"""
+        post_transaction(test_account, 'deposit', 200.0, datetime(2026, 3, 2))
+        post_transaction(test_account, 'withdrawal', 50.0, datetime(2026, 3, 4))
+        post_transaction(test_account, 'deposit', 10.0, datetime(2025, 12, 1))
+        db.session.commit()
+
+        months = monthly_spending(test_account.user_id, months=3, now=datetime(2026, 3, 20))
+
+        assert [m['month'] for m in months] == ['2026-01', '2026-02', '2026-03']
+        assert months[2]['money_in'] == 200.0 and months[2]['money_out'] == 50.0 and months[2]['net'] == 150.0
+        assert months[2]['types']['withdrawal'] == {'money_in': 0.0, 'money_out': 50.0, 'count': 1}
+        assert months[0]['count'] == 0
+
+    @pytest.mark.integration
+    def test_dashboard_widget_and_api(self, authenticated_client, test_account):
+        """Test the dashboard and JSON endpoint show the current month"""
+        authenticated_client.post('/transactions/deposit', data={
+            'account_id': test_account.id, 'amount': '75.00', 'description': 'Pay'})
+
+        page = authenticated_client.get('/')
+        assert b'Monthly Spending' in page.data
+        assert b'$75.00' in page.data
+
+        data = authenticated_client.get('/api/spending?months=2').get_json()
+        assert len(data['months']) == 2
+        assert data['months'][-1]['types']['deposit']['money_in'] == 75.0
+
+    @pytest.mark.integration
+    def test_api_rejects_other_users_account(self, authenticated_client, admin_user):
+        """Test an account filter must be one of the user's accounts"""
+        account = Account(user_id=admin_user.id, account_number='555555555555', account_type='checking')
+        db.session.add(account)
+        db.session.commit()
+
+        assert authenticated_client.get(f'/api/spending?account={account.id}').status_code == 404
+
+    @pytest.mark.integration
+    def test_cli_rebuild(self, app, runner, test_account):
+        """Test flask ledger rebuild-spending"""
+        db.session.add(Transaction(account_id=test_account.id, transaction_type='deposit', amount=5.0))
+        db.session.commit()
+        db.session.execute(SpendingRollup.__table__.delete())
+        db.session.commit()
+
+        result = runner.invoke(args=['ledger', 'rebuild-spending'])
+
+        assert result.exit_code == 0, result.output
+        assert 'Rebuilt 1 rollup rows' in result.output
+        assert SpendingRollup.query.count() == 1
@@ -0,0 +1,77 @@
+import csv
+import os
+import pytest
+from datetime import datetime
+from app import db
+from app.models.statement import StatementBatch, StatementRun
+from app.services.statements import generate_batch, generate_statements, get_or_create_run, period_bounds
+
+
+def read_statement(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+
+class TestStatements:
+    """Integration tests for month-end statement generation"""
+
+    @pytest.fixture
+    def history(self, app, test_account, second_account, post_transaction):
+        # test_account ends at 1000: 900 before March, +200 -50 in March, -50 in April
+        post_transaction(test_account, 'deposit', 200.0, datetime(2026, 3, 5, 9, 0))
+        post_transaction(test_account, 'withdrawal', 50.0, datetime(2026, 3, 20, 12, 0))
+        post_transaction(test_account, 'transfer', -50.0, datetime(2026, 4, 2, 8, 0))
+        post_transaction(test_account, 'deposit', 999.0, datetime(2026, 2, 27, 8, 0))
+        db.session.commit()
+        return test_account, second_account
+
+    @pytest.mark.unit
+    def test_period_bounds(self):
+        """Test a period covers its calendar month, including December"""
+        assert period_bounds('2026-03') == (datetime(2026, 3, 1), datetime(2026, 4, 1))
+        assert period_bounds('2026-12')[1] == datetime(2027, 1, 1)
+
+    @pytest.mark.integration
+    def test_running_balances(self, app, history, tmp_path):
+        """Test opening, running and closing balances of a statement"""
+        summary = generate_statements('2026-03', str(tmp_path))
+        rows = read_statement(tmp_path / '2026-03' / '123456789012.csv')
+
+        assert summary['accounts'] == 2 and summary['transactions'] == 2
+        assert rows[0] == ['account', '123456789012', 'savings', '2026-03']
+        assert rows[2][2:] == ['opening balance', '', '', '900.00']
+        assert [(r[2], r[4], r[5]) for r in rows[3:5]] == [('deposit', '200.00', '1100.00'),
+                                                           ('withdrawal', '-50.00', '1050.00')]
+        assert rows[5][2:] == ['closing balance', '', '', '1050.00']
+
+    @pytest.mark.integration
+    def test_accounts_without_activity_get_statement(self, app, history, tmp_path):
+        """Test an account with no transactions in the period still gets a statement"""
+        generate_statements('2026-03', str(tmp_path))
+        rows = read_statement(tmp_path / '2026-03' / '987654321098.csv')
+
+        assert rows[2][5] == rows[3][5] == '500.00'
+
+    @pytest.mark.integration
+    def test_resume_skips_finished_batches(self, app, history, tmp_path):
+        """Test a run restarted after a crash only processes unfinished batches"""
+        run = get_or_create_run('2026-03', str(tmp_path), batch_size=1)
+        first = StatementBatch.query.filter_by(run_id=run.id).order_by(StatementBatch.id).first()
+        generate_batch(first.id)  # the crash happened after the first batch
+
+        summary = generate_statements('2026-03', str(tmp_path))
+
+        assert summary['skipped_batches'] == 1 and summary['batches'] == 1
+        assert len(os.listdir(tmp_path / '2026-03')) == 2
+        assert StatementRun.query.one().completed_at is not None
+        assert generate_statements('2026-03', str(tmp_path))['batches'] == 0
+
+    @pytest.mark.integration
+    def test_cli_generate(self, runner, history, tmp_path):
+        """Test the generate command reports throughput"""
+        result = runner.invoke(args=['statements', 'generate', '--period', '2026-03',
+                                     '--workers', '1', '--output', str(tmp_path)])
+
+        assert result.exit_code == 0, result.output
+        assert '2 statements, 2 transactions' in result.output
+        assert 'accounts/s' in result.output
@@ -0,0 +1,68 @@
+import gzip
+import re
+import pytest
+from app.utils.compression import choose_encoding
+
+
+class TestStaticAssets:
+    """Integration tests for self-hosted assets and response compression"""
+
+    @pytest.mark.integration
+    def test_pages_link_fingerprinted_assets(self, client):
+        """Test base.html links local assets instead of the CDN"""
+        response = client.get('/auth/login')
+        html = response.get_data(as_text=True)
+
+        assert 'cdn.jsdelivr.net' not in html
+        assert re.search(r'/assets/vendor/bootstrap/bootstrap\.min\.[0-9a-f]{10}\.css', html)
+
+    @pytest.mark.integration
+    def test_fingerprinted_asset_is_immutable(self, client, app):
+        """Test hashed asset URLs get far-future cache headers"""
+        hashed = app.extensions['asset_manifest'].hashed['vendor/bootstrap/bootstrap.min.css']
+        response = client.get(f'/assets/{hashed}')
+
+        assert response.status_code == 200
+        assert 'immutable' in response.headers['Cache-Control']
+        assert 'max-age=31536000' in response.headers['Cache-Control']
+        assert response.mimetype == 'text/css'
+
+    @pytest.mark.integration
+    def test_fingerprinted_asset_gzip(self, client, app):
+        """Test assets are served pre-compressed when accepted"""
+        hashed = app.extensions['asset_manifest'].hashed['vendor/bootstrap/bootstrap.min.css']
+        plain = client.get(f'/assets/{hashed}')
+        compressed = client.get(f'/assets/{hashed}', headers={'Accept-Encoding': 'gzip'})
+
+        assert compressed.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(compressed.get_data()) == plain.get_data()
+
+    @pytest.mark.integration
+    def test_unknown_asset_404(self, client):
+        """Test unknown asset names are not served"""
+        response = client.get('/assets/vendor/missing.0000000000.css')
+        assert response.status_code == 404
+
+    @pytest.mark.integration
+    def test_html_compressed_above_threshold(self, client):
+        """Test large HTML responses are gzip compressed"""
+        response = client.get('/auth/register', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert b'Register' in gzip.decompress(response.get_data())
+
+    @pytest.mark.integration
+    def test_small_response_not_compressed(self, client, app):
+        """Test responses below COMPRESS_MIN_SIZE are sent as-is"""
+        app.config['COMPRESS_MIN_SIZE'] = 10 ** 7
+        response = client.get('/auth/login', headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in response.headers
+
+    @pytest.mark.unit
+    def test_choose_encoding(self):
+        """Test Accept-Encoding negotiation"""
+        assert choose_encoding('gzip, deflate') == 'gzip'
+        assert choose_encoding('gzip;q=0') is None
+        assert choose_encoding('') is None
@@ -0,0 +1,84 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from app import db
+from app.models.transaction import Transaction
+from app.utils.velocity import init_velocity
+
+
+class TestVelocityRoutes:
+    """Integration tests for velocity checks on withdrawals and transfers"""
+
+    def withdraw(self, client, account, amount='10.00'):
+        return client.post('/transactions/withdraw', data={
+            'account_id': account.id, 'amount': amount, 'description': 'ATM'
+        }, follow_redirects=True)
+
+    @pytest.mark.integration
+    def test_burst_of_withdrawals_blocked(self, authenticated_client, test_account):
+        """Test the sixth withdrawal within a minute is rejected"""
+        for _ in range(5):
+            assert b'Successfully withdrew' in self.withdraw(authenticated_client, test_account).data
+
+        response = self.withdraw(authenticated_client, test_account)
+
+        assert b'exceeds the limit of 5 withdrawals and transfers per minute' in response.data
+        assert Transaction.query.filter_by(account_id=test_account.id).count() == 5
+
+    @pytest.mark.integration
+    def test_rejected_posting_releases_reservation(self, authenticated_client, app, test_account, monkeypatch):
+        """Test withdrawals stopped by the daily limit do not use up the burst rule"""
+        monkeypatch.setitem(app.config, 'DAILY_LIMITS', {'customer': {'savings': {'withdrawal': 15}}})
+        assert b'Successfully withdrew' in self.withdraw(authenticated_client, test_account).data
+        for _ in range(5):
+            assert b'daily withdrawal limit' in self.withdraw(authenticated_client, test_account).data
+
+        assert b'Successfully withdrew' in self.withdraw(authenticated_client, test_account, '5.00').data
+
+    @pytest.mark.integration
+    def test_large_transfer_flagged(self, authenticated_client, app, test_account, second_account, monkeypatch):
+        """Test a posting over a flag rule goes through marked for review"""
+        engine = app.extensions['velocity']
+        monkeypatch.setattr(engine, 'rules', [
+            rule._replace(max_amount=100) if rule.name == 'hourly_amount' else rule for rule in engine.rules])
+        response = authenticated_client.post('/transactions/transfer', data={
+            'from_account_id': test_account.id,
+            'to_account_number': second_account.account_number,
+            'amount': '150.00',
+            'description': 'Rent'
+        }, follow_redirects=True)
+
+        assert b'Successfully transferred' in response.data
+        outgoing = Transaction.query.filter(Transaction.amount < 0).one()
+        assert outgoing.status == 'flagged'
+
+    @pytest.mark.integration
+    def test_admin_lists_flagged(self, admin_client, test_account):
+        """Test admins can filter the transaction list to flagged postings"""
+        for status in ('flagged', 'completed'):
+            transaction = Transaction(account_id=test_account.id, transaction_type='withdrawal',
+                                      amount=1.0, description=f'{status} posting', status=status)
+            db.session.add(transaction)
+        db.session.commit()
+
+        response = admin_client.get('/admin/transactions?status=flagged')
+
+        assert b'flagged posting' in response.data
+        assert b'completed posting' not in response.data
+
+    @pytest.mark.integration
+    def test_counters_warm_from_recent_transactions(self, app, test_account, monkeypatch):
+        """Test startup loads the last 24 hours of outgoing postings"""
+        now = datetime.utcnow()
+        for minutes, transaction_type, amount in ((0, 'withdrawal', 100.0), (30, 'transfer', -50.0),
+                                                  (10, 'deposit', 500.0), (60 * 25, 'withdrawal', 70.0)):
+            transaction = Transaction(account_id=test_account.id, transaction_type=transaction_type,
+                                      amount=amount)
+            transaction.timestamp = now - timedelta(minutes=minutes)
+            db.session.add(transaction)
+        db.session.commit()
+
+        monkeypatch.setitem(app.extensions, 'velocity', app.extensions['velocity'])
+        engine = init_velocity(app)
+
+        later = now.replace(tzinfo=timezone.utc).timestamp() + 1
+        assert engine.accounts[test_account.id]['24h'].totals(later) == (2, 150.0)
@@ -0,0 +1,25 @@
+import pytest
+from test_dashboard.impact import context_test_name, decode_lines, encode_lines
+
+
+class TestImpactEncoding:
+    """Unit tests for the test impact line encoding"""
+
+    @pytest.mark.unit
+    def test_encode_collapses_ranges(self):
+        """Test consecutive lines become ranges"""
+        assert encode_lines([9, 1, 2, 3, 7, 10, 2]) == '1-3,7,9-10'
+        assert encode_lines([]) == ''
+
+    @pytest.mark.unit
+    def test_decode_round_trip(self):
+        """Test decoding restores the sorted unique lines"""
+        lines = [1, 2, 3, 7, 9, 10, 42]
+        assert decode_lines(encode_lines(lines)) == lines
+        assert decode_lines('') == []
+
+    @pytest.mark.unit
+    def test_context_test_name(self):
+        """Test the setup/run/teardown phase is stripped from pytest-cov contexts"""
+        assert context_test_name('tests/unit/test_a.py::test_x|run') == 'tests/unit/test_a.py::test_x'
+        assert context_test_name('tests/unit/test_a.py::test_x|setup') == 'tests/unit/test_a.py::test_x'
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from datetime import date
+from app.services.interest import chunk_interest, daily_interest, interest_references
+
+
+class TestInterestCalculation:
+    """Unit tests for the vectorized interest calculation"""
+
+    TIERS = ((0, 0.0365), (10_000, 0.073))
+
+    @pytest.mark.unit
+    def test_marginal_tiers(self):
+        """Test each part of a balance earns its own tier's rate"""
+        interest = daily_interest([1_000, 10_000, 20_000, 0, -50], self.TIERS)
+
+        # 1000 * 3.65% / 365 = 0.10; above 10k earns 7.3% / 365
+        assert interest.tolist() == [0.10, 1.00, 3.00, 0.0, 0.0]
+
+    @pytest.mark.unit
+    def test_chunk_uses_rates_by_type(self):
+        """Test accounts of each type get their type's tiers and others get nothing"""
+        tiers = {'savings': self.TIERS, 'checking': ((0, 0.00365),)}
+        interest = chunk_interest(np.array(['savings', 'checking', 'business']),
+                                  np.array([1_000.0, 1_000.0, 1_000.0]), tiers)
+
+        assert interest.tolist() == [0.10, 0.01, 0.0]
+
+    @pytest.mark.unit
+    def test_reference_is_deterministic(self):
+        """Test the reference fits the column and identifies the day and account"""
+        references = interest_references(date(2026, 3, 1), [42, 7])
+
+        assert references == ['INT20260301000000042', 'INT20260301000000007']
+        assert all(len(reference) <= 20 for reference in references)
@@ -0,0 +1,53 @@
+import pytest
+from datetime import date, datetime
+from types import SimpleNamespace
+from app.services.scheduler import add_months, advance, next_occurrence
+
+
+def schedule(frequency, start_at, end_date=None):
+    return SimpleNamespace(frequency=frequency, start_at=start_at, due_at=start_at, next_run_at=start_at,
+                           end_date=end_date, attempts=0, status='active')
+
+
+class TestOccurrences:
+    """Unit tests for scheduled transfer dates"""
+
+    @pytest.mark.unit
+    def test_add_months_clamps_to_month_end(self):
+        """Test a day past the end of the month uses the month's last day"""
+        jan31 = datetime(2026, 1, 31, 9)
+        assert add_months(jan31, 1, 31) == datetime(2026, 2, 28, 9)
+        assert add_months(jan31, 2, 31) == datetime(2026, 3, 31, 9)
+        assert add_months(jan31, 11, 31) == datetime(2026, 12, 31, 9)
+        assert add_months(jan31, 13, 31) == datetime(2027, 2, 28, 9)
+
+    @pytest.mark.unit
+    def test_monthly_keeps_anchor_day(self):
+        """Test a monthly order on the 31st returns to the 31st after short months"""
+        rent = schedule('monthly', datetime(2026, 1, 31))
+        assert next_occurrence(rent, datetime(2026, 1, 31)) == datetime(2026, 2, 28)
+        assert next_occurrence(rent, datetime(2026, 2, 28)) == datetime(2026, 3, 31)
+        assert next_occurrence(rent, datetime(2025, 6, 1)) == datetime(2026, 1, 31)
+
+    @pytest.mark.unit
+    def test_daily_and_weekly(self):
+        """Test fixed-interval schedules stay on their start time"""
+        start = datetime(2026, 3, 2, 8, 30)
+        assert next_occurrence(schedule('daily', start), datetime(2026, 3, 5, 8, 30)) == datetime(2026, 3, 6, 8, 30)
+        assert next_occurrence(schedule('weekly', start), datetime(2026, 3, 10)) == datetime(2026, 3, 16, 8, 30)
+        assert next_occurrence(schedule('once', start), start) is None
+
+    @pytest.mark.unit
+    def test_advance_skips_missed_occurrences(self):
+        """Test an overdue schedule moves to its next future date, not every missed one"""
+        daily = schedule('daily', datetime(2026, 3, 1, 6))
+        advance(daily, datetime(2026, 3, 10, 12))
+        assert daily.due_at == daily.next_run_at == datetime(2026, 3, 11, 6)
+
+    @pytest.mark.unit
+    def test_advance_completes_at_end_date(self):
+        """Test a schedule with no occurrence left is completed"""
+        weekly = schedule('weekly', datetime(2026, 3, 2), end_date=date(2026, 3, 8))
+        advance(weekly, datetime(2026, 3, 2))
+        assert weekly.status == 'completed'
+        assert weekly.next_run_at is None
@@ -0,0 +1,47 @@
+import pytest
+from test_dashboard.sharding import compare_plans, estimate, plan_by_file, plan_lpt
+
+
+class TestSharding:
+    """Unit tests for the history-driven shard planner"""
+
+    def suite(self):
+        # One slow e2e file and many fast unit files
+        estimates = {f'tests/e2e/test_flows.py::test_flow_{i}': 10.0 for i in range(4)}
+        estimates.update({f'tests/unit/test_m{i}.py::test_{j}': 0.1 for i in range(6) for j in range(10)})
+        return estimates
+
+    @pytest.mark.unit
+    def test_lpt_assigns_every_test_once(self):
+        """Test shards partition the suite"""
+        estimates = self.suite()
+        assignment, loads = plan_lpt(estimates, 3)
+
+        assigned = [name for shard in assignment for name in shard]
+        assert sorted(assigned) == sorted(estimates)
+        assert sum(loads) == pytest.approx(sum(estimates.values()))
+
+    @pytest.mark.unit
+    def test_lpt_beats_split_by_file(self):
+        """Test slow tests are spread instead of landing in one shard"""
+        result = compare_plans(self.suite(), 4)
+
+        assert result['naive_makespan'] == pytest.approx(41.0)  # e2e file + one unit file
+        assert result['lpt_makespan'] == pytest.approx(11.5)
+        assert result['speedup'] > 3
+
+    @pytest.mark.unit
+    def test_plan_by_file_keeps_files_together(self):
+        """Test the naive plan never splits a file"""
+        assignment, _ = plan_by_file(self.suite(), 3)
+
+        files = [{name.split('::')[0] for name in shard} for shard in assignment]
+        assert not files[0] & files[1] and not files[1] & files[2]
+
+    @pytest.mark.unit
+    def test_estimate_fills_missing_history_with_median(self):
+        """Test tests without history get the median known duration"""
+        estimates = estimate(['a', 'b', 'c', 'new'], {'a': 1.0, 'b': 2.0, 'c': 9.0})
+
+        assert estimates['new'] == 2.0
+        assert estimate(['x'], {}) == {'x': 1.0}
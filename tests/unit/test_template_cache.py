@@ -0,0 +1,46 @@
+import os
+import pytest
+from app.utils.templates import init_template_cache, precompile_templates
+
+
+class TestTemplateCache:
+    """Unit tests for the Jinja bytecode cache and precompilation"""
+
+    @pytest.mark.unit
+    def test_precompile_loads_all_templates(self, app):
+        """Test every page template is compiled"""
+        names = precompile_templates(app)
+
+        assert 'base.html' in names
+        assert 'transactions/history.html' in names
+        cached = {key[1] for key in app.jinja_env.cache.keys()}
+        assert set(names) <= cached
+
+    @pytest.mark.unit
+    def test_bytecode_written_to_cache_dir(self, app, tmp_path):
+        """Test precompiling fills the on-disk bytecode cache"""
+        cache_dir = tmp_path / 'jinja_cache'
+        app.config['TEMPLATE_CACHE_DIR'] = str(cache_dir)
+        init_template_cache(app)
+        app.jinja_env.cache.clear()
+
+        names = precompile_templates(app)
+
+        assert len(os.listdir(cache_dir)) == len(names)
+
+    @pytest.mark.unit
+    def test_cache_disabled(self, app):
+        """Test no bytecode cache is attached when the directory is unset"""
+        app.jinja_env.bytecode_cache = None
+        app.config['TEMPLATE_CACHE_DIR'] = None
+
+        assert init_template_cache(app) is None
+        assert app.jinja_env.bytecode_cache is None
+
+    @pytest.mark.unit
+    def test_precompile_cli(self, runner):
+        """Test the precompile CLI command"""
+        result = runner.invoke(args=['templates', 'precompile'])
+
+        assert result.exit_code == 0
+        assert 'Compiled' in result.output
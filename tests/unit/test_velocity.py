@@ -0,0 +1,92 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from app.utils.velocity import SlidingWindow, VelocityEngine
+
+
+class TestSlidingWindow:
+    """Unit tests for the bucketed sliding-window counter"""
+
+    @pytest.mark.unit
+    def test_counts_within_window(self):
+        """Test postings are summed until their bucket leaves the window"""
+        window = SlidingWindow(60, 12)  # 5 s buckets
+        window.add(1000.0, 10.0)
+        window.add(1030.0, 5.0)
+
+        assert window.totals(1050.0) == (2, 15.0)
+        assert window.totals(1062.0) == (1, 5.0)
+        assert window.totals(2000.0) == (0, 0.0)
+
+    @pytest.mark.unit
+    def test_ignores_postings_older_than_window(self):
+        """Test a late posting outside the window is not counted"""
+        window = SlidingWindow(60, 12)
+        window.add(1000.0, 1.0)
+        window.add(900.0, 1.0)
+
+        assert window.totals(1000.0) == (1, 1.0)
+
+
+class TestVelocityEngine:
+    """Unit tests for velocity rules"""
+
+    RULES = [
+        {'name': 'burst', 'window': '1m', 'max_count': 2, 'action': 'block'},
+        {'name': 'hourly', 'window': '1h', 'max_amount': 100, 'action': 'flag'},
+    ]
+
+    @pytest.mark.unit
+    def test_block_and_flag(self):
+        """Test flag rules let postings through and block rules stop them"""
+        engine = VelocityEngine(self.RULES)
+
+        assert engine.check(1, 60, now=0).action == 'allow'
+        engine.record(1, 60, now=0)
+        decision = engine.check(1, 60, now=10)
+        assert decision.flagged and decision.rule == 'hourly'
+        engine.record(1, 60, now=10)
+
+        decision = engine.check(1, 1, now=20)
+        assert decision.blocked and decision.rule == 'burst'
+        assert 'per minute' in decision.message
+        assert engine.check(1, 1, now=90).flagged
+        assert engine.check(2, 1, now=20).action == 'allow'
+
+    @pytest.mark.unit
+    def test_reserve_counts_under_the_check_lock(self):
+        """Test concurrent reservations cannot all pass a block rule"""
+        engine = VelocityEngine(self.RULES)
+        with ThreadPoolExecutor(8) as pool:
+            decisions = list(pool.map(lambda _: engine.reserve(1, 1, now=0), range(20)))
+
+        assert sum(not d.blocked for d in decisions) == 2
+        assert all(d.reserved_at == 0 for d in decisions if not d.blocked)
+        assert all(d.reserved_at is None for d in decisions if d.blocked)
+
+    @pytest.mark.unit
+    def test_release_frees_the_reservation(self):
+        """Test a failed posting gives its slot back"""
+        engine = VelocityEngine(self.RULES)
+        first = engine.reserve(1, 10, now=0)
+        engine.reserve(1, 10, now=5)
+        assert engine.reserve(1, 10, now=6).blocked
+
+        engine.release(1, 10, first.reserved_at)
+
+        assert not engine.reserve(1, 10, now=7).blocked
+        assert engine.accounts[1]['1h'].totals(7) == (2, 20.0)
+
+    @pytest.mark.unit
+    def test_tracked_accounts_are_bounded(self):
+        """Test the least recently active accounts are dropped"""
+        engine = VelocityEngine(self.RULES, max_accounts=2)
+        for account_id in (1, 2, 1, 3):
+            engine.record(account_id, 1, now=0)
+
+        assert list(engine.accounts) == [1, 3]
+
+    @pytest.mark.unit
+    def test_unknown_window_rejected(self):
+        """Test rules must use a configured window"""
+        with pytest.raises(ValueError):
+            VelocityEngine([{'name': 'x', 'window': '5m', 'max_count': 1}])